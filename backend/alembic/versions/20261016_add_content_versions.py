@@ -0,0 +1,27 @@
+"""
+Add version counters to courses, modules and lessons (ETag source)
+
+Revision ID: 20261016_add_content_versions
+Revises: course_counters_20261016
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'content_versions_20261016'
+down_revision = 'course_counters_20261016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('courses', 'modules', 'lessons'):
+        op.add_column(table, sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    for table in ('lessons', 'modules', 'courses'):
+        op.drop_column(table, 'version')
@@ -0,0 +1,84 @@
+"""
+Add conversations inbox summary table
+
+Revision ID: 20261016_add_conversations
+Revises: message_indexes_20261016
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'conversations_20261016'
+down_revision = 'message_indexes_20261016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'conversations',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('user_a_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('profiles.id'), nullable=False),
+        sa.Column('user_b_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('profiles.id'), nullable=False),
+        sa.Column('last_message_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('messages.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('last_message_preview', sa.String(), nullable=True),
+        sa.Column('last_message_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_sender_id', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('unread_a', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('unread_b', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.UniqueConstraint('user_a_id', 'user_b_id', name='uq_conversations_pair'),
+    )
+    op.create_index('ix_conversations_user_a_last_message', 'conversations', ['user_a_id', 'last_message_at', 'id'])
+    op.create_index('ix_conversations_user_b_last_message', 'conversations', ['user_b_id', 'last_message_at', 'id'])
+    # Fold in existing messages, as tools/rebuild_conversations.py does
+    if op.get_bind().dialect.name == "sqlite":
+        # UUIDs are stored as their 36-character text form
+        random_hex = "hex(randomblob(16))"
+        new_id = (
+            "lower(substr(h, 1, 8) || '-' || substr(h, 9, 4) || '-' || substr(h, 13, 4)"
+            " || '-' || substr(h, 17, 4) || '-' || substr(h, 21))"
+        )
+    else:
+        random_hex = "md5(random()::text || clock_timestamp()::text)"
+        new_id = "h::uuid"
+    user_a = "CASE WHEN sender_id <= recipient_id THEN sender_id ELSE recipient_id END"
+    user_b = "CASE WHEN sender_id <= recipient_id THEN recipient_id ELSE sender_id END"
+    op.execute(f"""
+        INSERT INTO conversations (
+            id, user_a_id, user_b_id, last_message_id, last_message_preview,
+            last_message_at, last_sender_id, unread_a, unread_b
+        )
+        SELECT {new_id}, user_a_id, user_b_id, last_message_id, last_message_preview,
+               last_message_at, last_sender_id, unread_a, unread_b
+        FROM (
+            SELECT {user_a} AS user_a_id,
+                   {user_b} AS user_b_id,
+                   id AS last_message_id,
+                   substr(content, 1, 200) AS last_message_preview,
+                   created_at AS last_message_at,
+                   sender_id AS last_sender_id,
+                   SUM(CASE WHEN recipient_id = {user_a} AND sender_id <> recipient_id AND NOT is_read
+                            THEN 1 ELSE 0 END) OVER (PARTITION BY {user_a}, {user_b}) AS unread_a,
+                   SUM(CASE WHEN recipient_id = {user_b} AND sender_id <> recipient_id AND NOT is_read
+                            THEN 1 ELSE 0 END) OVER (PARTITION BY {user_a}, {user_b}) AS unread_b,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY {user_a}, {user_b} ORDER BY created_at DESC, id DESC
+                   ) AS rank,
+                   {random_hex} AS h
+            FROM messages
+        ) AS ranked
+        WHERE rank = 1
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_conversations_user_b_last_message', table_name='conversations')
+    op.drop_index('ix_conversations_user_a_last_message', table_name='conversations')
+    op.drop_table('conversations')
@@ -0,0 +1,37 @@
+"""
+Add composite indexes for keyset-paginated course catalog
+
+Revision ID: 20261016_add_course_catalog_indexes
+Revises: add_doc_url_20251103
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'course_catalog_idx_20261016'
+down_revision = 'add_doc_url_20251103'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Catalog is ordered by (created_at, id); filters on category / is_featured
+    # lead the index so filtered pages are served by a single range scan
+    op.execute("CREATE INDEX IF NOT EXISTS ix_courses_created_at_id ON courses (created_at, id)")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_courses_category_created_at_id "
+        "ON courses (category, created_at, id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_courses_is_featured_created_at_id "
+        "ON courses (is_featured, created_at, id)"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_courses_is_featured_created_at_id")
+    op.execute("DROP INDEX IF EXISTS ix_courses_category_created_at_id")
+    op.execute("DROP INDEX IF EXISTS ix_courses_created_at_id")
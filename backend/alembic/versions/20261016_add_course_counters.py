@@ -0,0 +1,42 @@
+"""
+Add denormalized module_count / lesson_count counters to courses
+
+Revision ID: 20261016_add_course_counters
+Revises: course_catalog_idx_20261016
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'course_counters_20261016'
+down_revision = 'course_catalog_idx_20261016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('courses', sa.Column('module_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('courses', sa.Column('lesson_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill from existing modules / lessons
+    op.execute(
+        """
+        UPDATE courses SET
+            module_count = (
+                SELECT COUNT(*) FROM modules WHERE modules.course_id = courses.id
+            ),
+            lesson_count = (
+                SELECT COUNT(*) FROM lessons
+                JOIN modules ON lessons.module_id = modules.id
+                WHERE modules.course_id = courses.id
+            )
+        """
+    )
+
+
+def downgrade():
+    op.drop_column('courses', 'lesson_count')
+    op.drop_column('courses', 'module_count')
@@ -0,0 +1,28 @@
+"""
+Add a course index on enrollments for broadcasts
+
+Revision ID: 20261016_add_enrollment_course_index
+Revises: message_history_index_20261016
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'enrollment_course_index_20261016'
+down_revision = 'message_history_index_20261016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_enrollments_course_id_user_id "
+        "ON enrollments (course_id, user_id)"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_enrollments_course_id_user_id")
@@ -0,0 +1,47 @@
+"""
+Add content-addressed upload tables (file_blobs, stored_files)
+
+Revision ID: 20261016_add_file_dedup_tables
+Revises: content_versions_20261016
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'file_dedup_20261016'
+down_revision = 'content_versions_20261016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'file_blobs',
+        sa.Column('sha256', sa.String(64), primary_key=True),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_table(
+        'stored_files',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('bucket', sa.String(), nullable=False),
+        sa.Column('filename', sa.String(), nullable=False),
+        sa.Column('blob_sha256', sa.String(64), sa.ForeignKey('file_blobs.sha256'), nullable=False),
+        sa.Column('original_filename', sa.String(), nullable=True),
+        sa.Column('content_type', sa.String(), nullable=True),
+        sa.Column('owner_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('profiles.id'), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint('bucket', 'filename', name='uq_stored_files_bucket_filename'),
+    )
+    op.create_index('ix_stored_files_blob_sha256', 'stored_files', ['blob_sha256'])
+
+
+def downgrade():
+    op.drop_index('ix_stored_files_blob_sha256', table_name='stored_files')
+    op.drop_table('stored_files')
+    op.drop_table('file_blobs')
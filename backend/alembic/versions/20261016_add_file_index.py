@@ -0,0 +1,63 @@
+"""
+Add file_references and storage_usage (file index), video_jobs.output_size
+
+Revision ID: 20261016_add_file_index
+Revises: video_jobs_20261016
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'file_index_20261016'
+down_revision = 'video_jobs_20261016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'file_references',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('stored_file_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('stored_files.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('referrer_type', sa.String(16), nullable=False),
+        sa.Column('referrer_id', postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column('field', sa.String(32), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint('stored_file_id', 'referrer_id', 'field', name='uq_file_references_file_referrer_field'),
+    )
+    op.create_index('ix_file_references_referrer_id', 'file_references', ['referrer_id'])
+
+    op.create_table(
+        'storage_usage',
+        sa.Column('bucket', sa.String(), primary_key=True),
+        sa.Column('file_count', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('total_bytes', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.add_column('video_jobs', sa.Column('output_size', sa.BigInteger(), nullable=True))
+
+    # Seed the counters; references are filled in by tools/rebuild_file_index.py
+    op.execute(
+        """
+        INSERT INTO storage_usage (bucket, file_count, total_bytes)
+        SELECT stored_files.bucket, count(*), coalesce(sum(file_blobs.size), 0)
+        FROM stored_files JOIN file_blobs ON file_blobs.sha256 = stored_files.blob_sha256
+        GROUP BY stored_files.bucket
+        UNION ALL
+        SELECT '.blobs', count(*), coalesce(sum(size), 0) FROM file_blobs
+        UNION ALL
+        SELECT 'course-image-variants', count(*), coalesce(sum(size), 0) FROM image_variants
+        """
+    )
+
+
+def downgrade():
+    op.drop_column('video_jobs', 'output_size')
+    op.drop_table('storage_usage')
+    op.drop_index('ix_file_references_referrer_id', table_name='file_references')
+    op.drop_table('file_references')
@@ -0,0 +1,40 @@
+"""
+Add image_variants table and courses.image_variants
+
+Revision ID: 20261016_add_image_variants
+Revises: file_dedup_20261016
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'image_variants_20261016'
+down_revision = 'file_dedup_20261016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'image_variants',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('source_sha256', sa.String(64), sa.ForeignKey('file_blobs.sha256'), nullable=False),
+        sa.Column('width', sa.Integer(), nullable=False),
+        sa.Column('height', sa.Integer(), nullable=False),
+        sa.Column('format', sa.String(16), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint('source_sha256', 'width', 'format', name='uq_image_variants_source_width_format'),
+    )
+    op.create_index('ix_image_variants_source_sha256', 'image_variants', ['source_sha256'])
+    op.add_column('courses', sa.Column('image_variants', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('courses', 'image_variants')
+    op.drop_index('ix_image_variants_source_sha256', table_name='image_variants')
+    op.drop_table('image_variants')
@@ -0,0 +1,35 @@
+"""
+Extend the sender/recipient message index with id for history keysets
+
+Revision ID: 20261016_add_message_history_index
+Revises: conversations_20261016
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'message_history_index_20261016'
+down_revision = 'conversations_20261016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Conversation history pages walk each direction backwards by
+    # (created_at, id); the id column breaks ties between equal timestamps
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_messages_sender_recipient_created_at_id "
+        "ON messages (sender_id, recipient_id, created_at, id)"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_messages_sender_recipient_created_at")
+
+
+def downgrade():
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_messages_sender_recipient_created_at "
+        "ON messages (sender_id, recipient_id, created_at)"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_messages_sender_recipient_created_at_id")
@@ -0,0 +1,35 @@
+"""
+Add composite indexes for the messaging contact list
+
+Revision ID: 20261016_add_message_indexes
+Revises: file_index_20261016
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'message_indexes_20261016'
+down_revision = 'file_index_20261016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Sent messages are found by sender (then recipient, newest first),
+    # received ones and their unread counts by recipient
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_messages_sender_recipient_created_at "
+        "ON messages (sender_id, recipient_id, created_at)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_messages_recipient_is_read "
+        "ON messages (recipient_id, is_read)"
+    )
+
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS ix_messages_recipient_is_read")
+    op.execute("DROP INDEX IF EXISTS ix_messages_sender_recipient_created_at")
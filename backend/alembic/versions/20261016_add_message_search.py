@@ -0,0 +1,56 @@
+"""
+Add full-text search over message content
+
+Revision ID: 20261016_add_message_search
+Revises: enrollment_course_index_20261016
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'message_search_20261016'
+down_revision = 'enrollment_course_index_20261016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "sqlite":
+        # External-content FTS5 table over messages, kept in sync by triggers
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5("
+            "content, content='messages', content_rowid='rowid', tokenize='porter unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN "
+            "INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN "
+            "INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.rowid, old.content); END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF content ON messages BEGIN "
+            "INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.rowid, old.content); "
+            "INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content); END"
+        )
+        # Index the messages written before the table existed
+        op.execute("INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')")
+        return
+    # Must match the expression the search query uses (app.models.message)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_messages_content_search "
+        "ON messages USING gin (to_tsvector('english', content))"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "sqlite":
+        for trigger in ("messages_fts_insert", "messages_fts_delete", "messages_fts_update"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS messages_fts")
+        return
+    op.execute("DROP INDEX IF EXISTS ix_messages_content_search")
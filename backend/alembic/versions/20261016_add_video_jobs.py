@@ -0,0 +1,46 @@
+"""
+Add video_jobs table and lessons.hls_url
+
+Revision ID: 20261016_add_video_jobs
+Revises: image_variants_20261016
+Create Date: 2026-10-16
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'video_jobs_20261016'
+down_revision = 'image_variants_20261016'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'video_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('source_sha256', sa.String(64), sa.ForeignKey('file_blobs.sha256'), nullable=False, unique=True),
+        sa.Column('status', sa.String(16), nullable=False, server_default='queued'),
+        sa.Column('progress', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('duration_seconds', sa.Float(), nullable=True),
+        sa.Column('renditions', sa.String(), nullable=True),
+        sa.Column('run_after', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('locked_until', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('worker_id', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('ix_video_jobs_status_run_after', 'video_jobs', ['status', 'run_after'])
+    op.add_column('lessons', sa.Column('hls_url', sa.String(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('lessons', 'hls_url')
+    op.drop_index('ix_video_jobs_status_run_after', table_name='video_jobs')
+    op.drop_table('video_jobs')
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, files, courses, users, storage, messages
+from app.api.v1.endpoints import auth, files, courses, users, storage, messages, videos
 
 api_router = APIRouter()
 
@@ -7,5 +7,6 @@ api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(files.router, prefix="/files", tags=["file-upload"])
 api_router.include_router(courses.router, prefix="/courses", tags=["courses"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
+api_router.include_router(videos.router, prefix="/videos", tags=["videos"])
 api_router.include_router(storage.router, prefix="/storage", tags=["storage"])
 api_router.include_router(messages.router, prefix="/messages", tags=["messages"])
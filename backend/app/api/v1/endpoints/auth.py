@@ -1,10 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.core.database import get_db, get_async_db
-from app.core.security import verify_password, get_password_hash, create_access_token, get_user_from_token
+from app.core.database import get_async_db
+from app.core.security import create_access_token, get_user_from_token, get_cached_profile, password_hasher
 from app.models.user import User, Profile
 from app.schemas.user import UserCreate, UserLogin, Token, ProfileResponse
 from datetime import timedelta
@@ -17,17 +16,19 @@ router = APIRouter()
 security = HTTPBearer()
 
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> ProfileResponse:
-    """Get current authenticated user."""
+    """Get current authenticated user.
+    
+    Shares the request's async session with the endpoint and usually skips
+    the query entirely thanks to the short-lived profile cache.
+    """
     try:
         user_data = get_user_from_token(credentials.credentials)
         
-        # Get user profile from database
-        result = db.execute(select(Profile).where(Profile.id == user_data["id"]))
-        profile = result.scalar_one_or_none()
+        profile = await get_cached_profile(db, user_data["id"])
         
         if not profile:
             raise HTTPException(
@@ -35,7 +36,7 @@ def get_current_user(
                 detail="User profile not found"
             )
         
-        return ProfileResponse.from_orm(profile)
+        return profile
     except HTTPException:
         raise
     except Exception as e:
@@ -46,9 +47,9 @@ def get_current_user(
 
 
 @router.post("/register", response_model=Token)
-def register(
+async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Register a new user."""
     logger.info(f"DEBUG: Received user_data.role = {user_data.role}")
@@ -56,7 +57,7 @@ def register(
     logger.info(f"DEBUG: user_data.role value = {user_data.role.value if hasattr(user_data.role, 'value') else 'no value attr'}")
     
     # Check if user already exists
-    result = db.execute(select(User).where(User.email == user_data.email))
+    result = await db.execute(select(User).where(User.email == user_data.email))
     existing_user = result.scalar_one_or_none()
     
     if existing_user:
@@ -66,13 +67,14 @@ def register(
         )
     
     # Create user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     user = User(
         email=user_data.email,
         hashed_password=hashed_password
     )
     db.add(user)
-    db.flush()  # Get the user ID
+    await db.flush()  # Get the user ID
+    user_id, email = user.id, user.email
     
     # Create profile
     logger.info(f"DEBUG: About to create profile with role = {user_data.role}")
@@ -85,14 +87,16 @@ def register(
     logger.info(f"DEBUG: Created profile object with role = {profile.role}")
     db.add(profile)
     logger.info(f"DEBUG: Added profile to session, role = {profile.role}")
-    db.flush()
+    await db.flush()
     logger.info(f"DEBUG: After flush, profile.role = {profile.role}")
-    db.commit()
+    await db.commit()
+    # Reload the server-generated columns (created_at) expired by the commit
+    await db.refresh(profile)
     
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.id), "email": user.email, "role": profile.role},
+        data={"sub": str(user_id), "email": email, "role": profile.role},
         expires_delta=access_token_expires
     )
     
@@ -125,15 +129,32 @@ async def login(
     result = await db.execute(select(User).where(User.email == user_credentials.email))
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    valid, new_hash = await password_hasher.verify_and_update(
+        user_credentials.password, user.hashed_password
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    user_id, email = user.id, user.email
+    
+    # Hashing parameters changed since this hash was made; store an upgraded one
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+    
     # Get user profile
-    result = await db.execute(select(Profile).where(Profile.id == user.id))
+    result = await db.execute(select(Profile).where(Profile.id == user_id))
     profile = result.scalar_one_or_none()
     
     if not profile:
@@ -145,7 +166,7 @@ async def login(
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.id), "email": user.email, "role": profile.role},
+        data={"sub": str(user_id), "email": email, "role": profile.role},
         expires_delta=access_token_expires
     )
     
@@ -168,6 +189,12 @@ async def logout():
     return {"message": "Successfully logged out"}
 
 
+@router.get("/hasher/stats")
+async def password_hasher_stats():
+    """Queue depth and throughput of the password hashing pool (per process)."""
+    return password_hasher.stats()
+
+
 @router.get("/health")
 async def auth_health():
     """Lightweight health check for the auth service."""
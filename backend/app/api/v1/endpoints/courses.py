@@ -1,27 +1,252 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, update, delete, and_, or_, func
+from sqlalchemy.orm import selectinload, undefer_group
 from app.core.database import get_async_db
+from app.core.cache import response_cache, cached_json
+from app.core.fields import parse_fields, load_fields, pick_fields, sparse_json
+from app.core.http_cache import make_etag, make_collection_etag, etag_matches, cache_headers, not_modified
+from app.core.pagination import encode_cursor, decode_cursor, keyset_before, keyset_timestamp
 from app.models.course import Course, Module, Lesson, Enrollment, LessonProgress  # Updated import
+from app.models.file import FileBlob, FileReference, ImageVariant, StoredFile, VideoJob, VideoJobStatus
 from app.models.user import Profile
 from app.schemas.course import (
-    CourseCreate, CourseUpdate, CourseResponse,
+    CourseCreate, CourseUpdate, CourseResponse, CoursePage,
     ModuleCreate, ModuleUpdate, ModuleResponse,
-    LessonCreate, LessonUpdate, LessonResponse,
+    LessonCreate, LessonUpdate, LessonResponse, LessonSummary, CourseTreeResponse, CourseImport,
     EnrollmentCreate, EnrollmentResponse,
     LessonProgressCreate, LessonProgressResponse,
     UserActivityResponse
 )
 from app.api.v1.endpoints.simple_auth import get_current_user
 from app.schemas.user import ProfileResponse
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
 from uuid import UUID
 from datetime import datetime
+import math
 import uuid
 
 router = APIRouter()
 
+# Response cache keys. Catalog queries share a namespace so any change to a
+# course (including its counters) drops every cached catalog page at once.
+CATALOG_NAMESPACE = "catalog"
+
+
+def _course_key(course_id) -> str:
+    return f"course:{course_id}"
+
+
+def _course_modules_key(course_id) -> str:
+    return f"course:{course_id}:modules"
+
+
+def _module_lessons_keys(module_id) -> List[str]:
+    return [f"module:{module_id}:lessons:full", f"module:{module_id}:lessons:summary"]
+
+
+def _course_tree_keys(course_id) -> List[str]:
+    return [f"course:{course_id}:tree:full", f"course:{course_id}:tree:summary"]
+
+
+def _in_sequence(items):
+    """Order modules/lessons by sequence_order, unsequenced items last."""
+    return sorted(items, key=lambda item: (item.sequence_order is None, item.sequence_order or 0))
+
+
+# Course and lesson columns that may hold /uploads URLs; the file index
+# (file_references) records which stored files they point at
+COURSE_FILE_FIELDS = ("image_url",)
+LESSON_FILE_FIELDS = (
+    "video_url", "pdf_url", "slides_url", "audio_url",
+    "document_url", "interactive_url", "downloadable_url",
+)
+
+
+def upload_location(url: Optional[str], bucket: Optional[str] = None) -> Optional[Tuple[str, str]]:
+    """(bucket, filename) of an uploaded file's URL, absolute or relative.
+    
+    With ``bucket``, URLs of files in other buckets give None.
+    """
+    if not url or len(url) > 2048:
+        return None
+    parts = urlparse(url).path.split("/")
+    if len(parts) != 4 or parts[1] != "uploads" or not parts[2] or not parts[3]:
+        return None
+    if bucket is not None and parts[2] != bucket:
+        return None
+    return parts[2], parts[3]
+
+
+async def sync_file_references(
+    db: AsyncSession,
+    referrer_type: str,
+    referrers: Iterable[Tuple[UUID, Dict[str, Optional[str]]]],
+) -> None:
+    """Replace the file index entries of courses or lessons; does not commit.
+    
+    ``referrers`` pairs each course/lesson id with its current values of
+    the URL fields. URLs that are not uploads (or name no stored file) are
+    ignored.
+    """
+    referrers = list(referrers)
+    await drop_file_references(db, [referrer_id for referrer_id, _ in referrers])
+    
+    wanted = [
+        (referrer_id, field, location)
+        for referrer_id, urls in referrers
+        for field, url in urls.items()
+        if (location := upload_location(url)) is not None
+    ]
+    if not wanted:
+        return
+    
+    locations = {location for _, _, location in wanted}
+    result = await db.execute(
+        select(StoredFile.id, StoredFile.bucket, StoredFile.filename)
+        .where(or_(*(
+            and_(StoredFile.bucket == bucket, StoredFile.filename == filename)
+            for bucket, filename in locations
+        )))
+    )
+    file_ids = {(bucket, filename): file_id for file_id, bucket, filename in result.all()}
+    db.add_all(
+        FileReference(
+            stored_file_id=file_ids[location],
+            referrer_type=referrer_type,
+            referrer_id=referrer_id,
+            field=field,
+        )
+        for referrer_id, field, location in wanted
+        if location in file_ids
+    )
+
+
+async def drop_file_references(db: AsyncSession, referrer_ids: List[UUID]) -> None:
+    """Remove the file index entries of deleted courses or lessons; does not commit."""
+    if referrer_ids:
+        await db.execute(delete(FileReference).where(FileReference.referrer_id.in_(referrer_ids)))
+
+
+def _file_fields(obj, fields: Tuple[str, ...]) -> Dict[str, Optional[str]]:
+    return {field: getattr(obj, field, None) for field in fields}
+
+
+def _course_image_location(image_url: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(bucket, filename) of an uploaded course image URL, absolute or relative."""
+    return upload_location(image_url, "course-images")
+
+
+async def _image_variants_for(db: AsyncSession, image_url: Optional[str]) -> Optional[List[dict]]:
+    """Responsive variants already generated for an uploaded course image."""
+    location = _course_image_location(image_url)
+    if location is None:
+        return None
+    result = await db.execute(
+        select(ImageVariant)
+        .join(StoredFile, StoredFile.blob_sha256 == ImageVariant.source_sha256)
+        .where(StoredFile.bucket == location[0], StoredFile.filename == location[1])
+        .order_by(ImageVariant.format, ImageVariant.width)
+    )
+    return [variant.to_dict() for variant in result.scalars().all()] or None
+
+
+async def refresh_course_image_variants(db: AsyncSession, sha256: str) -> None:
+    """Copy an image blob's variants onto every course using that image.
+    
+    Called by the image pipeline once variants exist, since a course may
+    have been saved with the image before they were generated.
+    """
+    filenames = (await db.scalars(
+        select(StoredFile.filename)
+        .where(StoredFile.blob_sha256 == sha256, StoredFile.bucket == "course-images")
+    )).all()
+    if not filenames:
+        return
+    
+    variants = (await db.scalars(
+        select(ImageVariant)
+        .where(ImageVariant.source_sha256 == sha256)
+        .order_by(ImageVariant.format, ImageVariant.width)
+    )).all()
+    course_ids = (await db.scalars(
+        update(Course)
+        .where(or_(*(Course.image_url.endswith(f"/uploads/course-images/{name}") for name in filenames)))
+        .values(image_variants=[variant.to_dict() for variant in variants] or None)
+        .returning(Course.id)
+    )).all()
+    await db.commit()
+    
+    if course_ids:
+        await response_cache.invalidate(*(
+            key for course_id in course_ids
+            for key in (_course_key(course_id), *_course_tree_keys(course_id))
+        ))
+        await response_cache.bump(CATALOG_NAMESPACE)
+
+
+def _video_values(job: Optional[VideoJob], size: Optional[int]) -> dict:
+    """Lesson columns derived from an uploaded video and its transcode."""
+    values = {"file_size": str(size) if size is not None else None, "hls_url": None}
+    if job is not None and job.status == VideoJobStatus.SUCCEEDED.value:
+        values["hls_url"] = job.hls_url
+        if job.duration_seconds:
+            values["duration"] = math.ceil(job.duration_seconds / 60)
+    return values
+
+
+async def _lesson_video_values(db: AsyncSession, video_url: Optional[str]) -> dict:
+    """Size, duration and HLS stream of a lesson's video, where already known."""
+    location = upload_location(video_url, "course-videos")
+    if location is None:
+        return {"hls_url": None}
+    row = (await db.execute(
+        select(FileBlob.size, VideoJob)
+        .select_from(StoredFile)
+        .join(FileBlob, FileBlob.sha256 == StoredFile.blob_sha256)
+        .outerjoin(VideoJob, VideoJob.source_sha256 == StoredFile.blob_sha256)
+        .where(StoredFile.bucket == location[0], StoredFile.filename == location[1])
+    )).first()
+    if row is None:
+        return {"hls_url": None}
+    return _video_values(row.VideoJob, row.size)
+
+
+async def refresh_lesson_videos(db: AsyncSession, sha256: str) -> None:
+    """Copy a video blob's size, duration and HLS stream onto its lessons.
+    
+    Called by the video worker when a transcode finishes, since lessons are
+    usually saved with the upload's URL long before that.
+    """
+    filenames = (await db.scalars(
+        select(StoredFile.filename)
+        .where(StoredFile.blob_sha256 == sha256, StoredFile.bucket == "course-videos")
+    )).all()
+    if not filenames:
+        return
+    
+    job = await db.scalar(select(VideoJob).where(VideoJob.source_sha256 == sha256))
+    size = await db.scalar(select(FileBlob.size).where(FileBlob.sha256 == sha256))
+    module_ids = (await db.scalars(
+        update(Lesson)
+        .where(or_(*(Lesson.video_url.endswith(f"/uploads/course-videos/{name}") for name in filenames)))
+        .values(**_video_values(job, size))
+        .returning(Lesson.module_id)
+    )).all()
+    await db.commit()
+    
+    module_ids = {module_id for module_id in module_ids if module_id is not None}
+    if module_ids:
+        course_ids = (await db.scalars(
+            select(Module.course_id).where(Module.id.in_(module_ids))
+        )).all()
+        await response_cache.invalidate(
+            *(key for module_id in module_ids for key in _module_lessons_keys(module_id)),
+            *(key for course_id in set(course_ids) for key in _course_tree_keys(course_id)),
+        )
+
+
 @router.get("/health")
 async def courses_health():
     """Lightweight health check for the courses service."""
@@ -37,73 +262,206 @@ async def create_course(
     """Create a new course."""
     course = Course(
         **course_data.dict(),
+        image_variants=await _image_variants_for(db, course_data.image_url),
         author_id=current_user.id
     )
     db.add(course)
+    await db.flush()
+    await sync_file_references(db, "course", [(course.id, _file_fields(course, COURSE_FILE_FIELDS))])
     await db.commit()
     await db.refresh(course)
+    await response_cache.bump(CATALOG_NAMESPACE)
     
     return CourseResponse.from_orm(course)
 
 
+@router.post("/import", response_model=CourseTreeResponse)
+async def import_course(
+    course_data: CourseImport,
+    current_user: ProfileResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a course with all of its modules and lessons in one transaction.
+    
+    Modules and lessons are written with one multi-row INSERT ... RETURNING
+    each; if anything fails nothing is committed.
+    """
+    modules = course_data.modules
+    
+    try:
+        course_id = await db.scalar(
+            insert(Course)
+            .values(
+                **course_data.dict(exclude={"modules"}),
+                image_variants=await _image_variants_for(db, course_data.image_url),
+                author_id=current_user.id,
+                module_count=len(modules),
+                lesson_count=sum(len(module.lessons) for module in modules),
+            )
+            .returning(Course.id)
+        )
+        
+        if modules:
+            module_rows = [
+                {
+                    **module.dict(exclude={"lessons"}),
+                    "sequence_order": module.sequence_order if module.sequence_order is not None else index,
+                    "course_id": course_id,
+                }
+                for index, module in enumerate(modules)
+            ]
+            module_ids = (await db.scalars(
+                insert(Module).returning(Module.id, sort_by_parameter_order=True),
+                module_rows
+            )).all()
+            
+            lesson_rows = []
+            for module_id, module in zip(module_ids, modules):
+                for index, lesson in enumerate(module.lessons):
+                    row = {k: v for k, v in lesson.dict().items() if hasattr(Lesson, k)}
+                    if row.get("sequence_order") is None:
+                        row["sequence_order"] = index
+                    # Stored as text on the model
+                    if row.get("file_size") is not None:
+                        row["file_size"] = str(row["file_size"])
+                    row["module_id"] = module_id
+                    lesson_rows.append(row)
+            
+            if lesson_rows:
+                lesson_ids = (await db.scalars(
+                    insert(Lesson).returning(Lesson.id, sort_by_parameter_order=True),
+                    lesson_rows
+                )).all()
+                await sync_file_references(db, "lesson", (
+                    (lesson_id, {field: row.get(field) for field in LESSON_FILE_FIELDS})
+                    for lesson_id, row in zip(lesson_ids, lesson_rows)
+                ))
+        
+        await sync_file_references(db, "course", [(course_id, {"image_url": course_data.image_url})])
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Failed to import course: {str(e)}"
+        )
+    
+    await response_cache.bump(CATALOG_NAMESPACE)
+    
+    return await _load_course_tree(db, course_id, include_content=False)
+
+
+def _catalog_query(category: Optional[str], featured: Optional[bool]):
+    """Catalog select with filters, in stable (created_at, id) order."""
+    query = select(Course).order_by(
+        keyset_timestamp(Course.created_at).desc(), Course.id.desc()
+    )
+    
+    if category:
+        query = query.where(Course.category == category)
+    
+    if featured is not None:
+        query = query.where(Course.is_featured == featured)
+    
+    return query
+
+
 @router.get("/", response_model=List[CourseResponse])
 async def get_courses(
     skip: int = 0,
     limit: int = 100,
     category: Optional[str] = None,
     featured: Optional[bool] = None,
+    fields: Optional[str] = None,
     db: AsyncSession = Depends(get_async_db)
 ):
     """Get all courses with optional filtering."""
-    query = select(Course).options(
-        selectinload(Course.modules).selectinload(Module.lessons)
-    )
-    
-    if category:
-        query = query.where(Course.category == category)
+    selected = parse_fields(fields, CourseResponse)
+    query = _catalog_query(category, featured).offset(skip).limit(limit)
     
-    if featured is not None:
-        query = query.where(Course.is_featured == featured)
+    if selected:
+        result = await db.execute(query.options(load_fields(Course, selected)))
+        return sparse_json([pick_fields(course, selected, CourseResponse) for course in result.scalars().all()])
     
-    query = query.offset(skip).limit(limit)
-    result = await db.execute(query)
-    courses = result.scalars().all()
+    async def build():
+        result = await db.execute(query)
+        courses = result.scalars().all()
+        return [CourseResponse.from_orm(course) for course in courses]
     
-    responses: List[CourseResponse] = []
-    for course in courses:
-        # Compute counts via explicit queries to avoid lazy loads in async context
-        module_count_result = await db.execute(
-            select(func.count(Module.id)).where(Module.course_id == course.id)
-        )
-        module_count = module_count_result.scalar() or 0
+    namespace = await response_cache.namespace(CATALOG_NAMESPACE)
+    return await cached_json(f"{namespace}:list:{skip}:{limit}:{category}:{featured}", build)
 
-        lesson_count_result = await db.execute(
-            select(func.count(Lesson.id))
-            .join(Module, Lesson.module_id == Module.id)
-            .where(Module.course_id == course.id)
-        )
-        lesson_count = lesson_count_result.scalar() or 0
 
-        base = CourseResponse.from_orm(course)
-        data = base.dict()
-        data["module_count"] = module_count
-        data["lesson_count"] = lesson_count
-        responses.append(CourseResponse(**data))
+@router.get("/page", response_model=CoursePage)
+async def get_courses_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    category: Optional[str] = None,
+    featured: Optional[bool] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a page of courses using keyset (cursor) pagination.
+    
+    Pass the returned ``next_cursor`` back as ``cursor`` to fetch the
+    following page; cost per page stays flat however deep the client pages.
+    """
+    selected = parse_fields(fields, CourseResponse)
+    query = _catalog_query(category, featured)
     
-    return responses
+    if cursor:
+        created_at, course_id = decode_cursor(cursor)
+        query = query.where(keyset_before(Course.created_at, Course.id, created_at, course_id))
+    
+    if selected:
+        # created_at is always loaded for the cursor, but only returned if selected
+        query = query.options(load_fields(Course, selected, Course.created_at))
+    
+    async def build():
+        # Fetch one extra row to find out whether another page exists
+        result = await db.execute(query.limit(limit + 1))
+        courses = result.scalars().all()
+        
+        next_cursor = None
+        if len(courses) > limit:
+            courses = courses[:limit]
+            last = courses[-1]
+            next_cursor = encode_cursor(last.created_at, last.id)
+        
+        if selected:
+            return {"items": [pick_fields(course, selected, CourseResponse) for course in courses], "next_cursor": next_cursor}
+        
+        return CoursePage(
+            items=[CourseResponse.from_orm(course) for course in courses],
+            next_cursor=next_cursor
+        )
+    
+    if selected:
+        return sparse_json(await build())
+    
+    namespace = await response_cache.namespace(CATALOG_NAMESPACE)
+    return await cached_json(f"{namespace}:page:{cursor}:{limit}:{category}:{featured}", build)
 
 
 @router.get("/my-courses", response_model=List[CourseResponse])
 async def get_my_courses(
+    fields: Optional[str] = None,
     current_user: ProfileResponse = Depends(get_current_user),
     db: AsyncSession = Depends(get_async_db)
 ):
     """Get courses enrolled by current user."""
-    result = await db.execute(
+    selected = parse_fields(fields, CourseResponse)
+    query = (
         select(Course)
         .join(Enrollment)
         .where(Enrollment.user_id == current_user.id)
     )
+    
+    if selected:
+        result = await db.execute(query.options(load_fields(Course, selected)))
+        return sparse_json([pick_fields(course, selected, CourseResponse) for course in result.scalars().all()])
+    
+    result = await db.execute(query)
     courses = result.scalars().all()
     
     return [CourseResponse.from_orm(course) for course in courses]
@@ -165,46 +523,112 @@ async def recent_activity(
 @router.get("/{course_id}", response_model=CourseResponse)
 async def get_course(
     course_id: UUID,
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_async_db)
 ):
     """Get course by ID."""
-    # Use selectinload to eagerly load related data
-    result = await db.execute(
-        select(Course)
-        .where(Course.id == course_id)
-        .options(selectinload(Course.modules).selectinload(Module.lessons))
-    )
-    course = result.scalar_one_or_none()
+    selected = parse_fields(fields, CourseResponse)
     
-    if not course:
+    # Only the version is needed to answer a conditional request
+    version = await db.scalar(select(Course.version).where(Course.id == course_id))
+    
+    if version is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Course not found"
         )
     
-    # Calculate module and lesson counts via explicit queries to avoid lazy loads
-    module_count_result = await db.execute(
-        select(func.count(Module.id)).where(Module.course_id == course.id)
+    etag = make_etag("course", course_id, version, selected)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    if selected:
+        result = await db.execute(
+            select(Course).where(Course.id == course_id).options(load_fields(Course, selected))
+        )
+        return sparse_json(pick_fields(result.scalar_one(), selected, CourseResponse), headers=cache_headers(etag))
+    
+    async def build():
+        result = await db.execute(select(Course).where(Course.id == course_id))
+        return CourseResponse.from_orm(result.scalar_one())
+    
+    return await cached_json(_course_key(course_id), build, headers=cache_headers(etag))
+
+
+async def _load_full_lesson(db: AsyncSession, lesson_id) -> Lesson:
+    """Load (or re-load, after a write) a lesson including its deferred text bodies."""
+    result = await db.execute(
+        select(Lesson)
+        .where(Lesson.id == lesson_id)
+        .options(undefer_group("body"))
+        .execution_options(populate_existing=True)
     )
-    module_count = module_count_result.scalar() or 0
+    return result.scalar_one()
 
-    lesson_count_result = await db.execute(
-        select(func.count(Lesson.id))
-        .join(Module, Lesson.module_id == Module.id)
-        .where(Module.course_id == course.id)
+
+async def _load_course_tree(db: AsyncSession, course_id, include_content: bool) -> dict:
+    """Course with ordered modules and lessons, loaded in one selectinload chain."""
+    lessons_loader = selectinload(Course.modules).selectinload(Module.lessons)
+    if include_content:
+        lessons_loader = lessons_loader.options(undefer_group("body"))
+    result = await db.execute(
+        select(Course).where(Course.id == course_id).options(lessons_loader)
+    )
+    course = result.scalar_one()
+    
+    lesson_schema = LessonResponse if include_content else LessonSummary
+    data = CourseResponse.from_orm(course).dict()
+    data["modules"] = [
+        {
+            **ModuleResponse.from_orm(module).dict(),
+            "lessons": [lesson_schema.from_orm(lesson).dict() for lesson in _in_sequence(module.lessons)],
+        }
+        for module in _in_sequence(course.modules)
+    ]
+    return data
+
+
+@router.get("/{course_id}/tree", response_model=CourseTreeResponse)
+async def get_course_tree(
+    course_id: UUID,
+    include_content: bool = False,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get a course with its ordered modules and lessons in one response.
+    
+    Lessons are summaries unless ``include_content`` is set, in which case
+    their content/transcript/notes/completion_criteria bodies are included.
+    """
+    versions = await db.execute(
+        select(Course.version, Module.id, Module.version, Lesson.id, Lesson.version)
+        .outerjoin(Module, Module.course_id == Course.id)
+        .outerjoin(Lesson, Lesson.module_id == Module.id)
+        .where(Course.id == course_id)
     )
-    lesson_count = lesson_count_result.scalar() or 0
+    rows = versions.all()
     
-    # Create response with properly formatted data
-    response_data = CourseResponse.from_orm(course)
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Course not found"
+        )
     
-    # Add additional fields expected by frontend
-    response_dict = response_data.dict()
-    response_dict["module_count"] = module_count
-    response_dict["lesson_count"] = lesson_count
+    etag = make_etag(
+        "course-tree", course_id, include_content, rows[0][0],
+        *sorted(f"{m_id}:{m_version}:{l_id}:{l_version}" for _, m_id, m_version, l_id, l_version in rows)
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    async def build():
+        return await _load_course_tree(db, course_id, include_content)
     
-    # Return enhanced response
-    return CourseResponse(**response_dict)
+    full_key, summary_key = _course_tree_keys(course_id)
+    return await cached_json(
+        full_key if include_content else summary_key, build, headers=cache_headers(etag)
+    )
 
 
 @router.get("/{course_id}/progress", response_model=dict)
@@ -289,9 +713,14 @@ async def update_course(
     update_data = course_update.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(course, field, value)
+    if "image_url" in update_data:
+        course.image_variants = await _image_variants_for(db, course.image_url)
+        await sync_file_references(db, "course", [(course.id, _file_fields(course, COURSE_FILE_FIELDS))])
     
     await db.commit()
     await db.refresh(course)
+    await response_cache.invalidate(_course_key(course_id), *_course_tree_keys(course_id))
+    await response_cache.bump(CATALOG_NAMESPACE)
     
     return CourseResponse.from_orm(course)
 
@@ -319,8 +748,21 @@ async def delete_course(
             detail="Not authorized to delete this course"
         )
     
+    # Modules (and their lessons) are removed by the cascade
+    module_ids_result = await db.execute(select(Module.id).where(Module.course_id == course_id))
+    module_ids = module_ids_result.scalars().all()
+    lesson_ids = (await db.scalars(select(Lesson.id).where(Lesson.module_id.in_(module_ids)))).all()
+    
+    await drop_file_references(db, [course_id, *lesson_ids])
     await db.delete(course)
     await db.commit()
+    await response_cache.invalidate(
+        _course_key(course_id),
+        _course_modules_key(course_id),
+        *_course_tree_keys(course_id),
+        *(key for module_id in module_ids for key in _module_lessons_keys(module_id)),
+    )
+    await response_cache.bump(CATALOG_NAMESPACE)
     
     return {"message": "Course deleted successfully"}
 
@@ -355,8 +797,17 @@ async def create_module(
         course_id=course_id
     )
     db.add(module)
+    await db.execute(
+        update(Course)
+        .where(Course.id == course_id)
+        .values(module_count=Course.module_count + 1)
+    )
     await db.commit()
     await db.refresh(module)
+    await response_cache.invalidate(
+        _course_key(course_id), _course_modules_key(course_id), *_course_tree_keys(course_id)
+    )
+    await response_cache.bump(CATALOG_NAMESPACE)
     
     return ModuleResponse.from_orm(module)
 
@@ -364,17 +815,39 @@ async def create_module(
 @router.get("/{course_id}/modules", response_model=List[ModuleResponse])
 async def get_course_modules(
     course_id: UUID,
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_async_db)
 ):
     """Get all modules for a course."""
-    result = await db.execute(
+    selected = parse_fields(fields, ModuleResponse)
+    
+    versions = await db.execute(
+        select(Module.id, Module.version).where(Module.course_id == course_id)
+    )
+    etag = make_collection_etag(f"{_course_modules_key(course_id)}:{selected}", versions.all())
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    query = (
         select(Module)
         .where(Module.course_id == course_id)
         .order_by(Module.sequence_order)
     )
-    modules = result.scalars().all()
     
-    return [ModuleResponse.from_orm(module) for module in modules]
+    if selected:
+        result = await db.execute(query.options(load_fields(Module, selected)))
+        return sparse_json(
+            [pick_fields(module, selected, ModuleResponse) for module in result.scalars().all()],
+            headers=cache_headers(etag)
+        )
+    
+    async def build():
+        result = await db.execute(query)
+        modules = result.scalars().all()
+        return [ModuleResponse.from_orm(module) for module in modules]
+    
+    return await cached_json(_course_modules_key(course_id), build, headers=cache_headers(etag))
 
 
 @router.put("/{course_id}/modules/{module_id}", response_model=ModuleResponse)
@@ -410,6 +883,7 @@ async def update_module(
             setattr(module, field, value)
     await db.commit()
     await db.refresh(module)
+    await response_cache.invalidate(_course_modules_key(course_id), *_course_tree_keys(course_id))
     return ModuleResponse.from_orm(module)
 
 
@@ -439,8 +913,27 @@ async def delete_module(
     if course.author_id != current_user.id and current_user.role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to delete this module")
 
+    # Lessons go with the module (cascade), so take them off the course counter too
+    module_lesson_ids = (await db.scalars(select(Lesson.id).where(Lesson.module_id == module_id))).all()
+    module_lesson_count = len(module_lesson_ids)
+    await drop_file_references(db, module_lesson_ids)
     await db.delete(module)
+    await db.execute(
+        update(Course)
+        .where(Course.id == course_id)
+        .values(
+            module_count=Course.module_count - 1,
+            lesson_count=Course.lesson_count - (module_lesson_count or 0),
+        )
+    )
     await db.commit()
+    await response_cache.invalidate(
+        _course_key(course_id),
+        _course_modules_key(course_id),
+        *_module_lessons_keys(module_id),
+        *_course_tree_keys(course_id),
+    )
+    await response_cache.bump(CATALOG_NAMESPACE)
     return {"message": "Module deleted successfully"}
 
 
@@ -473,6 +966,8 @@ async def create_lesson(
             detail="Not authorized to create lessons for this module"
         )
     
+    course_id = module.course_id
+    
     # Only pass attributes that exist on the Lesson model to avoid constructor errors
     incoming = lesson_data.dict(exclude_unset=True)
     safe_kwargs = {k: v for k, v in incoming.items() if hasattr(Lesson, k)}
@@ -496,14 +991,25 @@ async def create_lesson(
         if key in safe_kwargs:
             safe_kwargs[key] = coerce_int(safe_kwargs[key])
 
+    if safe_kwargs.get("video_url"):
+        safe_kwargs.update(await _lesson_video_values(db, safe_kwargs["video_url"]))
+
     try:
+        lesson_id = uuid.uuid4()
         lesson = Lesson(
             **safe_kwargs,
+            id=lesson_id,
             module_id=module_id
         )
         db.add(lesson)
+        await sync_file_references(db, "lesson", [(lesson_id, _file_fields(lesson, LESSON_FILE_FIELDS))])
+        await db.execute(
+            update(Course)
+            .where(Course.id == course_id)
+            .values(lesson_count=Course.lesson_count + 1)
+        )
         await db.commit()
-        await db.refresh(lesson)
+        lesson = await _load_full_lesson(db, lesson_id)
     except Exception as e:
         # Roll back and surface a clear error for easier debugging
         await db.rollback()
@@ -512,44 +1018,97 @@ async def create_lesson(
             detail=f"Failed to create lesson: {str(e)}"
         )
     
+    await response_cache.invalidate(
+        _course_key(course_id), *_module_lessons_keys(module_id), *_course_tree_keys(course_id)
+    )
+    await response_cache.bump(CATALOG_NAMESPACE)
+    
     return LessonResponse.from_orm(lesson)
 
 
-@router.get("/modules/{module_id}/lessons", response_model=List[LessonResponse])
+@router.get("/modules/{module_id}/lessons", response_model=List[LessonSummary])
 async def get_module_lessons(
     module_id: UUID,
+    include_content: bool = False,
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all lessons for a module."""
-    result = await db.execute(
+    """Get all lessons for a module.
+    
+    Returns lesson summaries; ``include_content`` adds the deferred text
+    bodies, and ``fields`` (comma-separated) returns only the named fields.
+    """
+    selected = parse_fields(fields, LessonResponse)
+    
+    versions = await db.execute(
+        select(Lesson.id, Lesson.version).where(Lesson.module_id == module_id)
+    )
+    # Each representation (summary, full, field selection) gets its own ETag
+    variant = selected or ("full" if include_content else "summary")
+    etag = make_collection_etag(f"module:{module_id}:lessons:{variant}", versions.all())
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    query = (
         select(Lesson)
         .where(Lesson.module_id == module_id)
         .order_by(Lesson.sequence_order)
     )
-    lessons = result.scalars().all()
     
-    return [LessonResponse.from_orm(lesson) for lesson in lessons]
+    if selected:
+        # Load exactly the requested columns, deferred bodies included
+        result = await db.execute(query.options(load_fields(Lesson, selected)))
+        return sparse_json(
+            [pick_fields(lesson, selected, LessonResponse) for lesson in result.scalars().all()],
+            headers=cache_headers(etag)
+        )
+    
+    async def build():
+        if include_content:
+            result = await db.execute(query.options(undefer_group("body")))
+            return [LessonResponse.from_orm(lesson) for lesson in result.scalars().all()]
+        result = await db.execute(query)
+        return [LessonSummary.from_orm(lesson) for lesson in result.scalars().all()]
+    
+    full_key, summary_key = _module_lessons_keys(module_id)
+    return await cached_json(
+        full_key if include_content else summary_key, build, headers=cache_headers(etag)
+    )
 
 
 @router.get("/lessons/{lesson_id}", response_model=LessonResponse)
 async def get_lesson(
     lesson_id: UUID,
+    response: Response,
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific lesson by ID."""
-    result = await db.execute(
-        select(Lesson)
-        .options(selectinload(Lesson.module).selectinload(Module.course))
-        .where(Lesson.id == lesson_id)
-    )
-    lesson = result.scalar_one_or_none()
+    selected = parse_fields(fields, LessonResponse)
 
-    if not lesson:
+    version = await db.scalar(select(Lesson.version).where(Lesson.id == lesson_id))
+
+    if version is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Lesson not found"
         )
 
+    etag = make_etag("lesson", lesson_id, version, selected)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    if selected:
+        result = await db.execute(
+            select(Lesson).where(Lesson.id == lesson_id).options(load_fields(Lesson, selected))
+        )
+        return sparse_json(pick_fields(result.scalar_one(), selected, LessonResponse), headers=cache_headers(etag))
+
+    lesson = await _load_full_lesson(db, lesson_id)
+
+    response.headers.update(cache_headers(etag))
     return LessonResponse.from_orm(lesson)
 
 
@@ -662,12 +1221,20 @@ async def update_lesson(
         )
     
     # Update lesson fields
-    for field, value in lesson_data.dict(exclude_unset=True).items():
+    updates = lesson_data.dict(exclude_unset=True)
+    if "video_url" in updates and updates["video_url"] != lesson.video_url:
+        updates.update(await _lesson_video_values(db, updates["video_url"]))
+    for field, value in updates.items():
         if hasattr(Lesson, field):
             setattr(lesson, field, value)
+    if any(field in updates for field in LESSON_FILE_FIELDS):
+        await sync_file_references(db, "lesson", [(lesson.id, _file_fields(lesson, LESSON_FILE_FIELDS))])
+    
+    course_id = lesson.module.course_id
     
     await db.commit()
-    await db.refresh(lesson)
+    lesson = await _load_full_lesson(db, lesson_id)
+    await response_cache.invalidate(*_module_lessons_keys(lesson.module_id), *_course_tree_keys(course_id))
     
     return LessonResponse.from_orm(lesson)
 
@@ -698,8 +1265,21 @@ async def delete_lesson(
             detail="Not authorized to delete this lesson"
         )
     
+    course_id = lesson.module.course_id
+    module_id = lesson.module_id
+    
+    await drop_file_references(db, [lesson_id])
     await db.delete(lesson)
+    await db.execute(
+        update(Course)
+        .where(Course.id == course_id)
+        .values(lesson_count=Course.lesson_count - 1)
+    )
     await db.commit()
+    await response_cache.invalidate(
+        _course_key(course_id), *_module_lessons_keys(module_id), *_course_tree_keys(course_id)
+    )
+    await response_cache.bump(CATALOG_NAMESPACE)
     
     return {"message": "Lesson deleted successfully"}
 
@@ -1,15 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import AsyncSessionLocal, get_async_db
 from app.core.config import settings
+from app.core.images import VARIANT_FORMATS, image_jobs, render_variants
+from app.core.storage import storage
+from app.models.file import FileBlob, StoredFile, ImageVariant, VideoJob, FileReference, StorageUsage
+from app.api.v1.endpoints.courses import refresh_course_image_variants
 from app.api.v1.endpoints.simple_auth import get_current_user
 from app.schemas.user import ProfileResponse
+from app.schemas.file import (
+    UploadSessionCreate, UploadSessionResponse, UploadComplete, UploadByHash,
+    DirectUploadCreate, DirectUploadResponse, DirectUploadComplete,
+)
+from datetime import datetime, timedelta, timezone
+from jose import JWTError, jwt
 import aiofiles
+import hashlib
+import json
 import os
+import shutil
+import tempfile
+import time
 import uuid
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 import mimetypes
 
 router = APIRouter()
@@ -21,6 +39,32 @@ UPLOAD_DIR.mkdir(exist_ok=True)
 (UPLOAD_DIR / "course-videos").mkdir(exist_ok=True)
 (UPLOAD_DIR / "course-content").mkdir(exist_ok=True)
 
+# In-progress resumable uploads: one directory per session holding
+# session.json and the received chunks ("<index>.chunk")
+UPLOAD_SESSIONS_DIR = UPLOAD_DIR / ".upload-sessions"
+UPLOAD_SESSIONS_DIR.mkdir(exist_ok=True)
+
+# Content-addressed store: each distinct upload is kept once, under the
+# storage key .blobs/<first two hex digits>/<sha256>. With local storage,
+# bucket files are hard links to it; with S3 they exist only as
+# stored_files rows and are served from the blob.
+BLOBS_DIR = UPLOAD_DIR / ".blobs"
+# Local scratch space for uploads being received, whatever the backend
+BLOBS_TMP_DIR = BLOBS_DIR / "tmp"
+BLOBS_TMP_DIR.mkdir(parents=True, exist_ok=True)
+
+BUCKETS = ["course-images", "course-videos", "course-content"]
+
+# Generated WebP/AVIF copies of course images, <sha256>-<width>.<format>
+IMAGE_VARIANTS_BUCKET = "course-image-variants"
+
+# storage_usage row for the deduplicated blob store itself
+BLOBS_USAGE_KEY = ".blobs"
+
+# HLS transcodes of course videos, <sha256>/master.m3u8 and one directory
+# of segments per rendition (written by video_worker.py)
+VIDEO_HLS_BUCKET = "course-video-hls"
+
 
 def get_file_extension(filename: str) -> str:
     """Get file extension from filename."""
@@ -33,29 +77,422 @@ def is_allowed_file_type(filename: str, allowed_types: list) -> bool:
     return extension in allowed_types
 
 
-async def save_uploaded_file(file: UploadFile, bucket: str) -> str:
-    """Save uploaded file and return the file path."""
-    # Generate unique filename
-    file_extension = get_file_extension(file.filename)
-    unique_filename = f"{uuid.uuid4()}{file_extension}"
+def allowed_types_for_bucket(bucket: str) -> list:
+    """File extensions accepted by a bucket."""
+    if bucket == "course-images":
+        return settings.allowed_image_types_list
+    if bucket == "course-videos":
+        return settings.allowed_video_types_list
+    return (
+        settings.allowed_document_types_list
+        + settings.allowed_image_types_list
+        + settings.allowed_audio_types_list
+    )
+
+
+def max_upload_size(bucket: str) -> int:
+    """Largest accepted upload, in bytes, for a bucket."""
+    if bucket == "course-videos":
+        return settings.max_video_file_size_bytes
+    return settings.max_file_size_bytes
+
+
+def file_too_large(bucket: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File exceeds the maximum upload size of {max_upload_size(bucket)} bytes"
+    )
+
+
+def blob_key(sha256: str) -> str:
+    return f".blobs/{sha256[:2]}/{sha256}"
+
+
+def temp_blob_path() -> Path:
+    """Scratch file on the blob store's filesystem, so it can be moved into place."""
+    return BLOBS_TMP_DIR / f"{uuid.uuid4().hex}.part"
+
+
+async def adjust_storage_usage(db: AsyncSession, bucket: str, files: int, size: int) -> None:
+    """Add to a bucket's usage counters (negative to subtract); does not commit."""
+    result = await db.execute(
+        update(StorageUsage)
+        .where(StorageUsage.bucket == bucket)
+        .values(file_count=StorageUsage.file_count + files, total_bytes=StorageUsage.total_bytes + size)
+    )
+    if result.rowcount:
+        return
+    
+    try:
+        async with db.begin_nested():
+            db.add(StorageUsage(bucket=bucket, file_count=files, total_bytes=size))
+    except IntegrityError:
+        # First write to this bucket happened concurrently
+        await db.execute(
+            update(StorageUsage)
+            .where(StorageUsage.bucket == bucket)
+            .values(file_count=StorageUsage.file_count + files, total_bytes=StorageUsage.total_bytes + size)
+        )
+
+
+async def _add_blob_reference(db: AsyncSession, sha256: str, size: int) -> None:
+    """Take a reference on a blob row, creating it for new content."""
+    result = await db.execute(
+        update(FileBlob)
+        .where(FileBlob.sha256 == sha256)
+        .values(ref_count=FileBlob.ref_count + 1)
+    )
+    if result.rowcount:
+        return
+    
+    try:
+        async with db.begin_nested():
+            db.add(FileBlob(sha256=sha256, size=size, ref_count=1))
+    except IntegrityError:
+        # The same content was registered concurrently
+        await db.execute(
+            update(FileBlob)
+            .where(FileBlob.sha256 == sha256)
+            .values(ref_count=FileBlob.ref_count + 1)
+        )
+    else:
+        await adjust_storage_usage(db, BLOBS_USAGE_KEY, 1, size)
+
+
+async def _reference_owned_blob(db: AsyncSession, sha256: str, owner_id) -> bool:
+    """Take a reference on a blob the user already has a file of, by hash alone.
+    
+    A hash is no proof of holding the content, so only the user's own
+    uploads can be reused this way; other content has to be sent (and is
+    still deduplicated once it arrives). Rolls back and returns False when
+    the user has no such file.
+    """
+    owned = (
+        select(StoredFile.id)
+        .where(StoredFile.blob_sha256 == sha256, StoredFile.owner_id == owner_id)
+        .exists()
+    )
+    result = await db.execute(
+        update(FileBlob)
+        .where(FileBlob.sha256 == sha256, owned)
+        .values(ref_count=FileBlob.ref_count + 1)
+    )
+    if result.rowcount and await storage.exists(blob_key(sha256)):
+        return True
+    await db.rollback()
+    return False
+
+
+async def _enqueue_video_job(db: AsyncSession, sha256: str) -> None:
+    """Queue an HLS transcode for a video blob, once per distinct content."""
+    if await db.scalar(select(VideoJob.id).where(VideoJob.source_sha256 == sha256)) is not None:
+        return
+    try:
+        async with db.begin_nested():
+            db.add(VideoJob(source_sha256=sha256))
+    except IntegrityError:
+        # Queued concurrently by another upload of the same content
+        pass
+
+
+async def _create_stored_file(
+    db: AsyncSession,
+    sha256: str,
+    bucket: str,
+    original_filename: str,
+    content_type: Optional[str],
+    owner_id,
+) -> str:
+    """Link a new bucket file to an existing blob and commit; returns its URL path."""
+    unique_filename = f"{uuid.uuid4()}{get_file_extension(original_filename)}"
+    file_key = f"{bucket}/{unique_filename}"
+    
+    if storage.is_local:
+        await storage.link(blob_key(sha256), file_key)
+    try:
+        db.add(StoredFile(
+            bucket=bucket,
+            filename=unique_filename,
+            blob_sha256=sha256,
+            original_filename=original_filename,
+            content_type=content_type,
+            owner_id=owner_id,
+        ))
+        size = await db.scalar(select(FileBlob.size).where(FileBlob.sha256 == sha256))
+        await adjust_storage_usage(db, bucket, 1, size or 0)
+        if bucket == "course-videos":
+            await _enqueue_video_job(db, sha256)
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        if storage.is_local:
+            await storage.delete(file_key)
+        raise
+    
+    if bucket == "course-images":
+        submit_image_variants(sha256)
+    return f"/uploads/{bucket}/{unique_filename}"
+
+
+async def store_blob_file(
+    db: AsyncSession,
+    temp_path: Path,
+    sha256: str,
+    size: int,
+    bucket: str,
+    original_filename: str,
+    content_type: Optional[str],
+    owner_id,
+) -> str:
+    """Register a fully written temp file as a bucket file; returns its URL path.
+    
+    Content already in the store is not kept twice: the temp file is
+    dropped and the new bucket file links to the existing blob.
+    """
+    try:
+        await _add_blob_reference(db, sha256, size)
+        if await storage.exists(blob_key(sha256)):
+            temp_path.unlink(missing_ok=True)
+        else:
+            await storage.put(blob_key(sha256), temp_path, content_type)
+    except BaseException:
+        await db.rollback()
+        temp_path.unlink(missing_ok=True)
+        raise
+    
+    return await _create_stored_file(db, sha256, bucket, original_filename, content_type, owner_id)
+
+
+async def release_stored_file(db: AsyncSession, stored: StoredFile, only_if_unreferenced: bool = False) -> bool:
+    """Delete a bucket file and drop its blob once nothing references it.
+    
+    With ``only_if_unreferenced`` the row is deleted only if no
+    file_references row names it when the DELETE runs; otherwise nothing
+    changes and False is returned.
+    """
+    sha256 = stored.blob_sha256
+    bucket = stored.bucket
+    file_key = f"{bucket}/{stored.filename}"
+    
+    if only_if_unreferenced:
+        result = await db.execute(
+            delete(StoredFile)
+            .where(
+                StoredFile.id == stored.id,
+                ~select(FileReference.id).where(FileReference.stored_file_id == StoredFile.id).exists(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if not result.rowcount:
+            await db.rollback()
+            return False
+        db.expunge(stored)
+    else:
+        await db.delete(stored)
+    remaining, size = (await db.execute(
+        update(FileBlob)
+        .where(FileBlob.sha256 == sha256)
+        .values(ref_count=FileBlob.ref_count - 1)
+        .returning(FileBlob.ref_count, FileBlob.size)
+    )).first() or (None, 0)
+    await adjust_storage_usage(db, bucket, -1, -size)
+    orphaned = remaining is not None and remaining <= 0
+    variants = []
+    if orphaned:
+        variants = (await db.scalars(
+            select(ImageVariant).where(ImageVariant.source_sha256 == sha256)
+        )).all()
+        if variants:
+            await adjust_storage_usage(
+                db, IMAGE_VARIANTS_BUCKET, -len(variants), -sum(variant.size for variant in variants)
+            )
+        hls_size = await db.scalar(
+            select(VideoJob.output_size).where(VideoJob.source_sha256 == sha256, VideoJob.output_size.isnot(None))
+        )
+        if hls_size is not None:
+            await adjust_storage_usage(db, VIDEO_HLS_BUCKET, -1, -hls_size)
+        await db.execute(delete(ImageVariant).where(ImageVariant.source_sha256 == sha256))
+        await db.execute(delete(VideoJob).where(VideoJob.source_sha256 == sha256))
+        await db.execute(delete(FileBlob).where(FileBlob.sha256 == sha256, FileBlob.ref_count <= 0))
+        await adjust_storage_usage(db, BLOBS_USAGE_KEY, -1, -size)
+    await db.commit()
+    
+    if storage.is_local:
+        await storage.delete(file_key)
+    if orphaned:
+        await storage.delete(blob_key(sha256))
+        for variant in variants:
+            await storage.delete(f"{IMAGE_VARIANTS_BUCKET}/{variant.filename}")
+        await storage.delete_prefix(f"{VIDEO_HLS_BUCKET}/{sha256}/")
+    return True
+
+
+async def collect_unreferenced_files(
+    db: AsyncSession,
+    grace: Optional[timedelta] = None,
+    limit: Optional[int] = None,
+    dry_run: bool = False,
+) -> dict:
+    """Delete uploads that nothing references, oldest first.
+    
+    Candidates come from the file index (stored files with no
+    file_references row, older than the grace period), so a run costs a
+    few indexed queries rather than a walk over the upload directories or
+    the content tables; tools/rebuild_file_index.py repairs index drift.
+    Blobs go with their last file, as on any delete.
+    """
+    grace = grace if grace is not None else timedelta(hours=settings.STORAGE_GC_GRACE_HOURS)
+    cutoff = datetime.now(timezone.utc) - grace
+    candidates = (await db.execute(
+        select(StoredFile.id, StoredFile.bucket, StoredFile.filename)
+        .where(
+            StoredFile.bucket.in_(BUCKETS),
+            StoredFile.created_at < cutoff,
+            ~select(FileReference.id).where(FileReference.stored_file_id == StoredFile.id).exists(),
+        )
+        .order_by(StoredFile.created_at)
+        .limit(limit or settings.STORAGE_GC_BATCH_SIZE)
+    )).all()
+    
+    report = {"candidates": len(candidates), "deleted": [], "dry_run": dry_run}
+    for file_id, bucket, filename in candidates:
+        path = f"/uploads/{bucket}/{filename}"
+        if dry_run:
+            report["deleted"].append(path)
+            continue
+        # The candidate list is stale by now: lock the row, so a course or
+        # lesson saved meanwhile either committed its reference (seen by the
+        # re-check in the DELETE) or waits on the lock and then fails its
+        # foreign key instead of pointing at a deleted file
+        stored = await db.scalar(
+            select(StoredFile)
+            .where(StoredFile.id == file_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        if stored is None:
+            await db.rollback()
+            continue
+        if await release_stored_file(db, stored, only_if_unreferenced=True):
+            report["deleted"].append(path)
+    return report
+
+
+async def generate_image_variants(sha256: str) -> None:
+    """Render, store and record the responsive variants of an image blob."""
+    async with AsyncSessionLocal() as db:
+        existing = await db.scalar(
+            select(func.count()).select_from(ImageVariant).where(ImageVariant.source_sha256 == sha256)
+        )
+        if existing:
+            await refresh_course_image_variants(db, sha256)
+            return
     
-    # Create file path
-    file_path = UPLOAD_DIR / bucket / unique_filename
+    work_dir = Path(tempfile.mkdtemp(dir=BLOBS_TMP_DIR))
+    try:
+        if storage.is_local:
+            source = storage.path(blob_key(sha256))
+        else:
+            source = work_dir / "source"
+            async with aiofiles.open(source, 'wb') as f:
+                async for data in storage.stream(blob_key(sha256), settings.UPLOAD_CHUNK_SIZE):
+                    await f.write(data)
+        
+        rendered = await image_jobs.render(
+            render_variants,
+            str(source),
+            str(work_dir),
+            settings.image_variant_widths_list,
+            settings.image_variant_formats_list,
+            settings.IMAGE_VARIANT_QUALITY,
+        )
+        
+        variants = [
+            ImageVariant(
+                source_sha256=sha256,
+                width=item["width"],
+                height=item["height"],
+                format=item["format"],
+                size=item["size"],
+            )
+            for item in rendered
+        ]
+        for variant, item in zip(variants, rendered):
+            await storage.put(
+                f"{IMAGE_VARIANTS_BUCKET}/{variant.filename}",
+                Path(item["path"]),
+                VARIANT_FORMATS[variant.format][1],
+            )
+        
+        async with AsyncSessionLocal() as db:
+            try:
+                db.add_all(variants)
+                await adjust_storage_usage(
+                    db, IMAGE_VARIANTS_BUCKET, len(variants), sum(variant.size for variant in variants)
+                )
+                await db.commit()
+            except IntegrityError:
+                # The blob was deleted meanwhile, or another worker got there first
+                await db.rollback()
+                if await db.scalar(select(FileBlob.sha256).where(FileBlob.sha256 == sha256)) is None:
+                    for variant in variants:
+                        await storage.delete(f"{IMAGE_VARIANTS_BUCKET}/{variant.filename}")
+                    return
+            await refresh_course_image_variants(db, sha256)
+    finally:
+        await run_in_threadpool(shutil.rmtree, work_dir, True)
+
+
+def submit_image_variants(sha256: str) -> None:
+    """Queue variant generation for a course image blob."""
+    image_jobs.submit(("image-variants", sha256), lambda: generate_image_variants(sha256))
+
+
+async def save_uploaded_file(
+    file: UploadFile,
+    bucket: str,
+    db: AsyncSession,
+    current_user: ProfileResponse
+) -> str:
+    """Save uploaded file and return the file path.
+    
+    By the time this runs Starlette has already spooled the whole part to
+    a temporary file (UploadSizeLimitMiddleware caps how much it accepts).
+    It is copied from there in ``UPLOAD_CHUNK_SIZE`` pieces, so memory use
+    is bounded whatever the file size, checked against the bucket's exact
+    limit, hashed on the way and stored content-addressed, so re-uploading
+    a file costs no extra disk.
+    """
+    partial_path = temp_blob_path()
+    limit = max_upload_size(bucket)
+    digest = hashlib.sha256()
     
     # Save file
-    async with aiofiles.open(file_path, 'wb') as f:
-        content = await file.read()
-        await f.write(content)
+    size = 0
+    try:
+        async with aiofiles.open(partial_path, 'wb') as f:
+            while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > limit:
+                    raise file_too_large(bucket)
+                digest.update(chunk)
+                await f.write(chunk)
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
     
     # Return relative path for URL
-    return f"/uploads/{bucket}/{unique_filename}"
+    return await store_blob_file(
+        db, partial_path, digest.hexdigest(), size, bucket,
+        file.filename, file.content_type, current_user.id
+    )
 
 
 @router.post("/upload/course-image")
 async def upload_course_image(
     file: UploadFile = File(...),
     current_user: ProfileResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload course image."""
     if not file.filename:
@@ -72,7 +509,7 @@ async def upload_course_image(
         )
     
     try:
-        file_path = await save_uploaded_file(file, "course-images")
+        file_path = await save_uploaded_file(file, "course-images", db, current_user)
         
         return JSONResponse(content={
             "message": "File uploaded successfully",
@@ -80,6 +517,8 @@ async def upload_course_image(
             "filename": file.filename,
             "content_type": file.content_type
         })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -91,7 +530,7 @@ async def upload_course_image(
 async def upload_course_video(
     file: UploadFile = File(...),
     current_user: ProfileResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload course video."""
     if not file.filename:
@@ -108,7 +547,7 @@ async def upload_course_video(
         )
     
     try:
-        file_path = await save_uploaded_file(file, "course-videos")
+        file_path = await save_uploaded_file(file, "course-videos", db, current_user)
         
         return JSONResponse(content={
             "message": "Video uploaded successfully",
@@ -116,6 +555,8 @@ async def upload_course_video(
             "filename": file.filename,
             "content_type": file.content_type
         })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -127,7 +568,7 @@ async def upload_course_video(
 async def upload_course_content(
     file: UploadFile = File(...),
     current_user: ProfileResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload course content file."""
     if not file.filename:
@@ -137,11 +578,7 @@ async def upload_course_content(
         )
     
     # Check file type
-    allowed_types = (
-        settings.allowed_document_types_list
-        + settings.allowed_image_types_list
-        + settings.allowed_audio_types_list
-    )
+    allowed_types = allowed_types_for_bucket("course-content")
     if not is_allowed_file_type(file.filename, allowed_types):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -149,7 +586,7 @@ async def upload_course_content(
         )
     
     try:
-        file_path = await save_uploaded_file(file, "course-content")
+        file_path = await save_uploaded_file(file, "course-content", db, current_user)
         
         return JSONResponse(content={
             "message": "File uploaded successfully",
@@ -157,6 +594,8 @@ async def upload_course_content(
             "filename": file.filename,
             "content_type": file.content_type
         })
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -164,31 +603,44 @@ async def upload_course_content(
         )
 
 
+@router.get("/image-jobs/stats")
+async def image_job_stats():
+    """Queued, running, completed and failed image variant jobs (this process)."""
+    return image_jobs.stats()
+
+
 @router.delete("/delete/{bucket}/{filename}")
 async def delete_file(
     bucket: str,
     filename: str,
     current_user: ProfileResponse = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete uploaded file."""
     # Validate bucket
-    if bucket not in ["course-images", "course-videos", "course-content"]:
+    if bucket not in BUCKETS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid bucket"
         )
     
-    file_path = UPLOAD_DIR / bucket / filename
+    file_key = f"{bucket}/{filename}"
+    stored = await db.scalar(
+        select(StoredFile).where(StoredFile.bucket == bucket, StoredFile.filename == filename)
+    )
     
-    if not file_path.exists():
+    if stored is None and not await storage.exists(file_key):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="File not found"
         )
     
     try:
-        file_path.unlink()
+        if stored is not None:
+            await release_stored_file(db, stored)
+        else:
+            # Uploaded before content addressing; not reference-counted
+            await storage.delete(file_key)
         return JSONResponse(content={
             "message": "File deleted successfully",
             "filename": filename
@@ -198,3 +650,531 @@ async def delete_file(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error deleting file: {str(e)}"
         )
+
+
+@router.post("/upload/by-hash")
+async def upload_by_hash(
+    upload: UploadByHash,
+    current_user: ProfileResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a file from content the user uploaded before, without sending it.
+    
+    Clients that can hash locally try this first; a 404 means the user
+    holds no file with that content, and it has to be uploaded normally.
+    """
+    if upload.bucket not in BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid bucket"
+        )
+    
+    allowed_types = allowed_types_for_bucket(upload.bucket)
+    if not is_allowed_file_type(upload.filename, allowed_types):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File type not allowed. Allowed types: {', '.join(allowed_types)}"
+        )
+    
+    sha256 = upload.sha256.lower()
+    if not await _reference_owned_blob(db, sha256, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Content not found; upload the file"
+        )
+    
+    content_type = upload.content_type or mimetypes.guess_type(upload.filename)[0]
+    file_path = await _create_stored_file(
+        db, sha256, upload.bucket, upload.filename, content_type, current_user.id
+    )
+    
+    return JSONResponse(content={
+        "message": "File uploaded successfully",
+        "file_path": file_path,
+        "filename": upload.filename,
+        "content_type": content_type,
+        "sha256": sha256
+    })
+
+
+# Direct uploads
+#
+# POST /direct-uploads            presigned PUT for the file's blob key
+#                                 (or the stored file at once if the user
+#                                 already uploaded the content)
+# PUT  <url>                      client sends the bytes to the store
+# POST /direct-uploads/complete   verify the object and register the file
+
+# A large upload may still be in flight when its URL expires
+DIRECT_UPLOAD_TOKEN_GRACE = timedelta(hours=24)
+
+
+def _upload_token_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid or expired upload token"
+    )
+
+
+async def _object_sha256(key: str) -> str:
+    """SHA-256 of a stored object, as checked by the store when it keeps one."""
+    sha256 = await storage.stored_sha256(key)
+    if sha256 is None:
+        # Stores that keep no checksum (local, moto, older MinIO): hash it here
+        digest = hashlib.sha256()
+        async for data in storage.stream(key, settings.UPLOAD_CHUNK_SIZE):
+            digest.update(data)
+        sha256 = digest.hexdigest()
+    return sha256
+
+
+@router.post("/direct-uploads", response_model=DirectUploadResponse)
+async def create_direct_upload(
+    upload: DirectUploadCreate,
+    current_user: ProfileResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Issue a presigned URL so the client uploads straight to storage.
+    
+    The URL only accepts a body of the declared size and SHA-256, written
+    to the content's blob key. Content the user has uploaded before needs
+    no upload: the file is created immediately and ``file_path`` returned.
+    """
+    if upload.bucket not in BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid bucket"
+        )
+    
+    allowed_types = allowed_types_for_bucket(upload.bucket)
+    if not is_allowed_file_type(upload.filename, allowed_types):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File type not allowed. Allowed types: {', '.join(allowed_types)}"
+        )
+    
+    if upload.size < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid file size"
+        )
+    if upload.size > max_upload_size(upload.bucket):
+        raise file_too_large(upload.bucket)
+    
+    sha256 = upload.sha256.lower()
+    if len(sha256) != 64 or any(c not in "0123456789abcdef" for c in sha256):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="sha256 must be a hex SHA-256 digest"
+        )
+    content_type = upload.content_type or mimetypes.guess_type(upload.filename)[0]
+    
+    if await _reference_owned_blob(db, sha256, current_user.id):
+        file_path = await _create_stored_file(
+            db, sha256, upload.bucket, upload.filename, content_type, current_user.id
+        )
+        return DirectUploadResponse(file_path=file_path)
+    
+    expires_in = settings.STORAGE_PRESIGN_EXPIRE_SECONDS
+    request = storage.presign_put(blob_key(sha256), upload.size, sha256, content_type, expires_in)
+    token = jwt.encode(
+        {
+            "sub": str(current_user.id),
+            "scope": "direct-upload",
+            "bucket": upload.bucket,
+            "filename": upload.filename,
+            "content_type": content_type,
+            "size": upload.size,
+            "sha256": sha256,
+            "exp": datetime.utcnow() + timedelta(seconds=expires_in) + DIRECT_UPLOAD_TOKEN_GRACE,
+        },
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM,
+    )
+    
+    return DirectUploadResponse(
+        upload_token=token,
+        url=request.url,
+        method=request.method,
+        headers=request.headers,
+        expires_in=expires_in,
+    )
+
+
+@router.post("/direct-uploads/complete")
+async def complete_direct_upload(
+    completion: DirectUploadComplete,
+    current_user: ProfileResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Register a file the client has uploaded through a presigned URL."""
+    try:
+        claims = jwt.decode(completion.upload_token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        raise _upload_token_error()
+    if claims.get("scope") != "direct-upload" or claims.get("sub") != str(current_user.id):
+        raise _upload_token_error()
+    
+    sha256 = claims["sha256"]
+    key = blob_key(sha256)
+    size = await storage.size(key)
+    if size is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="File has not been uploaded"
+        )
+    
+    if size != claims["size"] or await _object_sha256(key) != sha256:
+        # Only reachable with stores that do not enforce the signed checksum
+        if await db.scalar(select(FileBlob.sha256).where(FileBlob.sha256 == sha256)) is None:
+            await storage.delete(key)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Checksum mismatch: uploaded file does not match sha256"
+        )
+    
+    try:
+        await _add_blob_reference(db, sha256, size)
+    except BaseException:
+        await db.rollback()
+        raise
+    file_path = await _create_stored_file(
+        db, sha256, claims["bucket"], claims["filename"], claims["content_type"], current_user.id
+    )
+    
+    return JSONResponse(content={
+        "message": "File uploaded successfully",
+        "file_path": file_path,
+        "filename": claims["filename"],
+        "content_type": claims["content_type"],
+        "size": size,
+        "sha256": sha256
+    })
+
+
+# Resumable uploads
+#
+# POST   /uploads                       create a session for a file of known size
+# PUT    /uploads/{id}/chunks/{index}   store one chunk (any order, in parallel)
+# GET    /uploads/{id}                  which chunks / byte ranges have arrived
+# POST   /uploads/{id}/complete         assemble into the bucket, verify SHA-256
+# DELETE /uploads/{id}                  abandon the session
+#
+# Sessions idle for UPLOAD_SESSION_EXPIRE_HOURS are expired and deleted by
+# the storage GC (tools/gc_storage.py, POST /storage/gc).
+
+# Created exclusively by the request completing a session
+COMPLETION_CLAIM = "complete.claim"
+
+
+def _session_path(upload_id: str) -> Path:
+    try:
+        return UPLOAD_SESSIONS_DIR / str(uuid.UUID(upload_id))
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload session not found"
+        )
+
+
+def _load_session(upload_id: str, current_user: ProfileResponse) -> dict:
+    """Read a session's metadata; other users' sessions are reported as missing."""
+    session_path = _session_path(upload_id)
+    try:
+        session = json.loads((session_path / "session.json").read_text())
+        if _session_expired(session_path):
+            session = None
+    except FileNotFoundError:
+        session = None
+    
+    if not session or session["owner_id"] != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload session not found"
+        )
+    return session
+
+
+def _session_expired(session_path: Path) -> bool:
+    """Idle past UPLOAD_SESSION_EXPIRE_HOURS; storing a chunk touches the directory."""
+    idle = time.time() - session_path.stat().st_mtime
+    return idle > settings.UPLOAD_SESSION_EXPIRE_HOURS * 3600
+
+
+def _ensure_not_completing(session_path: Path) -> None:
+    if (session_path / COMPLETION_CLAIM).exists():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Upload is being completed"
+        )
+
+
+def _claim_completion(session_path: Path) -> None:
+    """Make this request the only one completing the session.
+    
+    The claim file is created exclusively, so of two concurrent completions
+    one wins and the other gets 409 (or 404 once the winner has removed
+    the session).
+    """
+    try:
+        os.close(os.open(session_path / COMPLETION_CLAIM, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        _ensure_not_completing(session_path)
+    except FileNotFoundError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Upload session not found"
+        )
+
+
+def purge_expired_upload_sessions(dry_run: bool = False) -> List[str]:
+    """Delete (or with ``dry_run``, list) idle resumable upload sessions; returns their ids."""
+    expired = []
+    for session_path in UPLOAD_SESSIONS_DIR.iterdir():
+        try:
+            if not session_path.is_dir() or not _session_expired(session_path):
+                continue
+        except FileNotFoundError:
+            continue
+        expired.append(session_path.name)
+        if not dry_run:
+            shutil.rmtree(session_path, ignore_errors=True)
+    return expired
+
+
+def _total_chunks(session: dict) -> int:
+    return max(1, -(-session["size"] // session["chunk_size"]))
+
+
+def _chunk_length(session: dict, index: int) -> int:
+    return min(session["chunk_size"], session["size"] - index * session["chunk_size"])
+
+
+def _received_chunks(session_path: Path) -> List[int]:
+    return sorted(
+        int(entry.name.split(".")[0])
+        for entry in session_path.iterdir()
+        if entry.name.endswith(".chunk")
+    )
+
+
+def _session_status(upload_id: str, session: dict) -> UploadSessionResponse:
+    received = _received_chunks(_session_path(upload_id))
+    
+    # Merge consecutive chunks into [start, end) byte ranges
+    ranges: List[List[int]] = []
+    for index in received:
+        start = index * session["chunk_size"]
+        end = start + _chunk_length(session, index)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+    
+    received_set = set(received)
+    return UploadSessionResponse(
+        upload_id=upload_id,
+        filename=session["filename"],
+        bucket=session["bucket"],
+        size=session["size"],
+        chunk_size=session["chunk_size"],
+        total_chunks=_total_chunks(session),
+        received_chunks=received,
+        received_ranges=ranges,
+        missing_chunks=[i for i in range(_total_chunks(session)) if i not in received_set],
+        created_at=session["created_at"],
+    )
+
+
+@router.post("/uploads", response_model=UploadSessionResponse)
+async def create_upload_session(
+    upload: UploadSessionCreate,
+    current_user: ProfileResponse = Depends(get_current_user)
+):
+    """Start a resumable upload."""
+    if upload.bucket not in BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid bucket"
+        )
+    
+    allowed_types = allowed_types_for_bucket(upload.bucket)
+    if not is_allowed_file_type(upload.filename, allowed_types):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File type not allowed. Allowed types: {', '.join(allowed_types)}"
+        )
+    
+    if upload.size < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid file size"
+        )
+    if upload.size > max_upload_size(upload.bucket):
+        raise file_too_large(upload.bucket)
+    
+    chunk_size = upload.chunk_size or settings.UPLOAD_SESSION_CHUNK_SIZE
+    if not 0 < chunk_size <= settings.UPLOAD_SESSION_MAX_CHUNK_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"chunk_size must be between 1 and {settings.UPLOAD_SESSION_MAX_CHUNK_SIZE} bytes"
+        )
+    
+    upload_id = str(uuid.uuid4())
+    session = {
+        "owner_id": str(current_user.id),
+        "filename": upload.filename,
+        "bucket": upload.bucket,
+        "content_type": upload.content_type or mimetypes.guess_type(upload.filename)[0],
+        "size": upload.size,
+        "chunk_size": chunk_size,
+        "sha256": upload.sha256.lower() if upload.sha256 else None,
+        "created_at": datetime.utcnow().isoformat(),
+    }
+    session_path = _session_path(upload_id)
+    session_path.mkdir()
+    (session_path / "session.json").write_text(json.dumps(session))
+    
+    return _session_status(upload_id, session)
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload_session(
+    upload_id: str,
+    current_user: ProfileResponse = Depends(get_current_user)
+):
+    """Report which chunks of a resumable upload have been received."""
+    session = _load_session(upload_id, current_user)
+    return _session_status(upload_id, session)
+
+
+@router.put("/uploads/{upload_id}/chunks/{index}", response_model=UploadSessionResponse)
+async def upload_chunk(
+    upload_id: str,
+    index: int,
+    request: Request,
+    x_chunk_sha256: Optional[str] = Header(None),
+    current_user: ProfileResponse = Depends(get_current_user)
+):
+    """Store one chunk of a resumable upload; the raw request body is the chunk.
+    
+    Re-sending a chunk replaces it, so a client can simply retry failures.
+    An optional X-Chunk-SHA256 header is checked against the received bytes.
+    """
+    session = _load_session(upload_id, current_user)
+    
+    if not 0 <= index < _total_chunks(session):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Chunk index out of range"
+        )
+    
+    expected = _chunk_length(session, index)
+    session_path = _session_path(upload_id)
+    _ensure_not_completing(session_path)
+    chunk_path = session_path / f"{index}.chunk"
+    # Unique temporary name so concurrent retries of one chunk cannot interleave
+    partial_path = session_path / f"{index}.{uuid.uuid4().hex}.part"
+    digest = hashlib.sha256()
+    
+    size = 0
+    try:
+        async with aiofiles.open(partial_path, 'wb') as f:
+            async for data in request.stream():
+                size += len(data)
+                if size > expected:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Chunk {index} must be {expected} bytes"
+                    )
+                digest.update(data)
+                await f.write(data)
+        
+        if size != expected:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Chunk {index} must be {expected} bytes, got {size}"
+            )
+        if x_chunk_sha256 and x_chunk_sha256.lower() != digest.hexdigest():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Chunk {index} checksum mismatch"
+            )
+        os.replace(partial_path, chunk_path)
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+    
+    return _session_status(upload_id, session)
+
+
+@router.post("/uploads/{upload_id}/complete")
+async def complete_upload(
+    upload_id: str,
+    completion: Optional[UploadComplete] = None,
+    current_user: ProfileResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Assemble a fully received upload into its bucket and verify its SHA-256."""
+    session = _load_session(upload_id, current_user)
+    progress = _session_status(upload_id, session)
+    
+    if progress.missing_chunks:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "Upload is incomplete", "missing_chunks": progress.missing_chunks}
+        )
+    
+    bucket = session["bucket"]
+    partial_path = temp_blob_path()
+    session_path = _session_path(upload_id)
+    digest = hashlib.sha256()
+    _claim_completion(session_path)
+    
+    try:
+        async with aiofiles.open(partial_path, 'wb') as out:
+            for index in range(progress.total_chunks):
+                async with aiofiles.open(session_path / f"{index}.chunk", 'rb') as chunk:
+                    while data := await chunk.read(settings.UPLOAD_CHUNK_SIZE):
+                        digest.update(data)
+                        await out.write(data)
+        
+        expected = (completion.sha256 if completion and completion.sha256 else session["sha256"])
+        if expected and expected.lower() != digest.hexdigest():
+            # Chunks are kept so the client can re-send the bad ones and retry
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Checksum mismatch: assembled file does not match sha256"
+            )
+        
+        file_path = await store_blob_file(
+            db, partial_path, digest.hexdigest(), session["size"], bucket,
+            session["filename"], session["content_type"], current_user.id
+        )
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        # Release the claim so the client can fix the chunks and retry
+        (session_path / COMPLETION_CLAIM).unlink(missing_ok=True)
+        raise
+    await run_in_threadpool(shutil.rmtree, session_path, True)
+    
+    return JSONResponse(content={
+        "message": "File uploaded successfully",
+        "file_path": file_path,
+        "filename": session["filename"],
+        "content_type": session["content_type"],
+        "size": session["size"],
+        "sha256": digest.hexdigest()
+    })
+
+
+@router.delete("/uploads/{upload_id}")
+async def abort_upload(
+    upload_id: str,
+    current_user: ProfileResponse = Depends(get_current_user)
+):
+    """Abandon a resumable upload and discard its chunks."""
+    _load_session(upload_id, current_user)
+    _ensure_not_completing(_session_path(upload_id))
+    await run_in_threadpool(shutil.rmtree, _session_path(upload_id), True)
+    return JSONResponse(content={"message": "Upload aborted", "upload_id": upload_id})
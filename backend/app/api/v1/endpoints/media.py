@@ -0,0 +1,186 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import RedirectResponse
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.http_cache import etag_matches
+from app.core.media import MediaFileResponse, RangeNotSatisfiable, parse_range_header
+from app.core.storage import storage
+from app.core.video import HLS_MEDIA_TYPES
+from app.api.v1.endpoints.files import VIDEO_HLS_BUCKET, blob_key
+from app.models.file import StoredFile
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Optional
+import mimetypes
+import os
+
+router = APIRouter()
+
+UPLOAD_DIR = Path(settings.UPLOAD_DIR)
+MEDIA_BUCKETS = ["course-images", "course-videos", "course-content", "course-image-variants", VIDEO_HLS_BUCKET]
+
+# Strong ETags by (bucket, filename, mtime, size): the blob SHA-256 for
+# content-addressed uploads, so one DB lookup serves every later request
+_etag_cache = LRUCache(settings.MEDIA_ETAG_CACHE_SIZE, ttl=3600)
+
+
+async def _file_etag(db: AsyncSession, bucket: str, filename: str, stat: os.stat_result) -> str:
+    key = (bucket, filename, stat.st_mtime_ns, stat.st_size)
+    etag = _etag_cache.get(key)
+    if etag is None:
+        sha256 = await db.scalar(
+            select(StoredFile.blob_sha256)
+            .where(StoredFile.bucket == bucket, StoredFile.filename == filename)
+        )
+        # Files from before content addressing fall back to mtime and size
+        etag = f'"{sha256}"' if sha256 else f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        _etag_cache.set(key, etag)
+    return etag
+
+
+async def _redirect_to_object_store(db: AsyncSession, bucket: str, filename: str) -> Response:
+    """Send the client to a presigned URL; the store handles ranges itself."""
+    stored = await db.scalar(
+        select(StoredFile).where(StoredFile.bucket == bucket, StoredFile.filename == filename)
+    )
+    if stored is not None:
+        key = blob_key(stored.blob_sha256)
+        content_type = stored.content_type
+        filename = stored.original_filename or filename
+    else:
+        # Objects copied to the store as-is, outside content addressing
+        key = f"{bucket}/{filename}"
+        content_type = None
+        if not await storage.exists(key):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    url = storage.presign_get(
+        key,
+        filename=filename,
+        content_type=content_type or mimetypes.guess_type(filename)[0],
+    )
+    # The URL expires, so the redirect itself must not be cached
+    return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT, headers={"Cache-Control": "no-store"})
+
+
+def _valid_media_path(bucket: str, filename: str) -> bool:
+    """Flat names only, except the per-video directories of HLS output."""
+    parts = filename.split("/")
+    if len(parts) > 1 and bucket != VIDEO_HLS_BUCKET:
+        return False
+    return all(part and not part.startswith(".") for part in parts)
+
+
+def _media_type(filename: str) -> str:
+    return (
+        HLS_MEDIA_TYPES.get(Path(filename).suffix)
+        or mimetypes.guess_type(filename)[0]
+        or "application/octet-stream"
+    )
+
+
+async def _proxy_playlist(bucket: str, filename: str) -> Response:
+    """Serve an HLS playlist from the object store through the API.
+
+    Its segment URIs are relative, so they resolve back to this route
+    (and from there to presigned URLs) rather than to expiring store URLs.
+    """
+    key = f"{bucket}/{filename}"
+    if not await storage.exists(key):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return Response(
+        await storage.get(key),
+        media_type=_media_type(filename),
+        headers={"Cache-Control": settings.MEDIA_CACHE_CONTROL},
+    )
+
+
+def _not_modified_since(if_modified_since: Optional[str], mtime: float) -> bool:
+    try:
+        return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+
+def _range_still_valid(if_range: Optional[str], etag: str, last_modified: str) -> bool:
+    """If-Range: honour Range only if the client's copy is still current."""
+    if not if_range:
+        return True
+    if if_range.startswith(('"', "W/")):
+        return if_range == etag
+    return if_range == last_modified
+
+
+@router.api_route("/{bucket}/{filename:path}", methods=["GET", "HEAD"])
+async def serve_media(
+    bucket: str,
+    filename: str,
+    request: Request,
+    range: Optional[str] = Header(None),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Serve an uploaded file with byte ranges, conditional requests and sendfile."""
+    if bucket not in MEDIA_BUCKETS or not _valid_media_path(bucket, filename):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    if not storage.is_local:
+        if filename.endswith(".m3u8"):
+            return await _proxy_playlist(bucket, filename)
+        return await _redirect_to_object_store(db, bucket, filename)
+
+    path = UPLOAD_DIR / bucket / filename
+    try:
+        stat = await run_in_threadpool(os.stat, path)
+    except (FileNotFoundError, NotADirectoryError):
+        stat = None
+    if stat is None or not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    etag = await _file_etag(db, bucket, filename, stat)
+    last_modified = formatdate(stat.st_mtime, usegmt=True)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": settings.MEDIA_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+
+    # If-None-Match takes precedence over If-Modified-Since
+    if if_none_match is not None:
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    elif _not_modified_since(if_modified_since, stat.st_mtime):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    media_type = _media_type(filename)
+
+    if settings.MEDIA_ACCEL_REDIRECT_PREFIX:
+        # Behind nginx: it serves the bytes (ranges and sendfile included)
+        headers["X-Accel-Redirect"] = f"{settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{bucket}/{filename}"
+        return Response(headers=headers, media_type=media_type)
+
+    ranges = None
+    if _range_still_valid(if_range, etag, last_modified):
+        try:
+            ranges = parse_range_header(range, stat.st_size, settings.MEDIA_MAX_RANGES)
+        except RangeNotSatisfiable:
+            return Response(
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                headers={**headers, "Content-Range": f"bytes */{stat.st_size}"}
+            )
+
+    return MediaFileResponse(
+        path,
+        stat.st_size,
+        media_type,
+        ranges=ranges,
+        headers=headers,
+        send_body=request.method != "HEAD",
+    )
@@ -1,117 +1,392 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, WebSocket, WebSocketDisconnect, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_, and_, func, update
-from typing import List
+from sqlalchemy import select, insert, and_, or_, func, update, union_all, table, column, literal_column
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
 from uuid import UUID
+import asyncio
+import logging
+import re
+import uuid
 
-from app.core.database import get_async_db
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_async_db, is_sqlite
+from app.core.pubsub import event_broker
+from app.core.security import get_user_from_token, get_cached_profile
+from app.core.pagination import (
+    encode_cursor, decode_cursor, keyset_before, keyset_timestamp, keyset_tiebreak, keyset_tiebreak_of,
+)
 from app.api.v1.endpoints.simple_auth import get_current_user
 from app.schemas.user import ProfileResponse
 from app.schemas.message import (
     MessageCreate,
     MessageResponse,
     ContactResponse,
+    ContactPage,
     ConversationResponse,
+    MessageSearchPage,
+    BroadcastCreate,
+    BroadcastResponse,
+    InstructorMessageResponse,
 )
-from app.models.message import Message
+from app.models.course import Course, Enrollment
+from app.models.message import Message, Conversation, InstructorMessage, search_config
 from app.models.user import Profile
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
-@router.get("/contacts", response_model=List[ContactResponse])
-async def get_contacts(
-    current_user: ProfileResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_async_db)
-):
-    """Return contacts the user has messaged with, including metadata."""
-    # Find distinct user IDs that have exchanged messages with current user
-    sent_result = await db.execute(
-        select(Message.recipient_id).where(Message.sender_id == current_user.id)
-    )
-    received_result = await db.execute(
-        select(Message.sender_id).where(Message.recipient_id == current_user.id)
-    )
+# Characters of the last message kept on the conversation for the inbox
+PREVIEW_LENGTH = 200
+
+
+def user_channel(user_id) -> str:
+    """Realtime channel carrying a user's message events."""
+    return f"user:{user_id}"
 
-    recipient_ids = {row[0] for row in sent_result.all()}
-    sender_ids = {row[0] for row in received_result.all()}
-    contact_ids = (recipient_ids | sender_ids) - {current_user.id}
 
-    if not contact_ids:
-        return []
+async def publish_to_users(event: dict, *user_ids) -> None:
+    for user_id in set(user_ids):
+        await event_broker.publish(user_channel(user_id), event)
 
-    # Fetch contact profiles
-    profiles_result = await db.execute(
-        select(Profile).where(Profile.id.in_(list(contact_ids)))
+
+async def record_message(db: AsyncSession, message: Message) -> None:
+    """Fold a new (flushed) message into its conversation row; does not commit.
+    
+    Moves the conversation's last message forward and bumps the
+    recipient's unread count, creating the row for a first message.
+    """
+    user_a_id, user_b_id = Conversation.pair(message.sender_id, message.recipient_id)
+    unread = "unread_a" if message.recipient_id == user_a_id else "unread_b"
+    # Notes to self are never unread
+    increment = 0 if message.sender_id == message.recipient_id else 1
+    values = {
+        "last_message_id": message.id,
+        "last_message_preview": message.content[:PREVIEW_LENGTH],
+        "last_message_at": select(Message.created_at).where(Message.id == message.id).scalar_subquery(),
+        "last_sender_id": message.sender_id,
+    }
+    
+    pair_filter = and_(Conversation.user_a_id == user_a_id, Conversation.user_b_id == user_b_id)
+    result = await db.execute(
+        update(Conversation)
+        .where(pair_filter)
+        .values(**values, **{unread: getattr(Conversation, unread) + increment})
     )
-    profiles = profiles_result.scalars().all()
+    if result.rowcount:
+        return
+    
+    try:
+        async with db.begin_nested():
+            await db.execute(insert(Conversation).values(
+                id=uuid.uuid4(),
+                user_a_id=user_a_id,
+                user_b_id=user_b_id,
+                **{**values, "unread_a": 0, "unread_b": 0, unread: increment},
+            ))
+    except IntegrityError:
+        # The pair's first messages were sent concurrently
+        await db.execute(
+            update(Conversation)
+            .where(pair_filter)
+            .values(**values, **{unread: getattr(Conversation, unread) + increment})
+        )
 
-    contacts: List[ContactResponse] = []
-    for profile in profiles:
-        # Last message between users
-        last_message_result = await db.execute(
-            select(Message)
-            .where(
-                or_(
-                    and_(Message.sender_id == current_user.id, Message.recipient_id == profile.id),
-                    and_(Message.sender_id == profile.id, Message.recipient_id == current_user.id),
-                )
-            )
-            .order_by(Message.created_at.desc())
-            .limit(1)
+
+async def _conversation_partners(db: AsyncSession, user_id, other_ids) -> set:
+    """Which of ``other_ids`` already have a conversation with ``user_id``."""
+    result = await db.execute(
+        select(Conversation.user_b_id).where(Conversation.user_a_id == user_id, Conversation.user_b_id.in_(other_ids))
+        .union_all(
+            select(Conversation.user_a_id).where(Conversation.user_b_id == user_id, Conversation.user_a_id.in_(other_ids))
         )
-        last_message = last_message_result.scalars().first()
+    )
+    return set(result.scalars().all())
 
-        # Unread count from this contact
-        unread_result = await db.execute(
-            select(func.count(Message.id))
-            .where(
-                and_(
-                    Message.sender_id == profile.id,
-                    Message.recipient_id == current_user.id,
-                    Message.is_read == False,
-                )
-            )
+
+async def record_broadcast(db: AsyncSession, sender_id, messages: List[dict]) -> None:
+    """Fold a batch of (inserted) messages from one sender into their conversations.
+    
+    The bulk counterpart of ``record_message``: conversations the sender
+    already has are moved forward and their recipients' unread counts
+    bumped with one UPDATE per side of the pair, and the missing ones are
+    created with one multi-row INSERT. Does not commit.
+    """
+    if not messages:
+        return
+    first = messages[0]
+    recipient_ids = [message["recipient_id"] for message in messages]
+    by_recipient = {message["recipient_id"]: message for message in messages}
+    
+    while True:
+        existing = await _conversation_partners(db, sender_id, recipient_ids)
+        missing = [recipient_id for recipient_id in recipient_ids if recipient_id not in existing]
+        if not missing:
+            break
+        rows = []
+        for recipient_id in missing:
+            user_a_id, user_b_id = Conversation.pair(sender_id, recipient_id)
+            rows.append({
+                "id": uuid.uuid4(),
+                "user_a_id": user_a_id,
+                "user_b_id": user_b_id,
+                "last_message_id": by_recipient[recipient_id]["id"],
+                "last_message_preview": first["content"][:PREVIEW_LENGTH],
+                "last_message_at": first["created_at"],
+                "last_sender_id": sender_id,
+                "unread_a": 1 if recipient_id == user_a_id else 0,
+                "unread_b": 1 if recipient_id == user_b_id else 0,
+            })
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(Conversation).values(rows))
+            break
+        except IntegrityError:
+            # A concurrent first message created one of the pairs; look again
+            continue
+    
+    if not existing:
+        return
+    for mine, other, unread in (
+        (Conversation.user_a_id, Conversation.user_b_id, "unread_b"),
+        (Conversation.user_b_id, Conversation.user_a_id, "unread_a"),
+    ):
+        # Each conversation's newest message from the sender, found through
+        # the (sender, recipient, created_at, id) index
+        last_message_id = (
+            select(Message.id)
+            .where(Message.sender_id == sender_id, Message.recipient_id == other)
+            .order_by(keyset_timestamp(Message.created_at).desc(), keyset_tiebreak(Message).desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        await db.execute(
+            update(Conversation)
+            .where(mine == sender_id, other.in_(existing))
+            .values(**{
+                "last_message_id": last_message_id,
+                "last_message_preview": first["content"][:PREVIEW_LENGTH],
+                "last_message_at": first["created_at"],
+                "last_sender_id": sender_id,
+                unread: getattr(Conversation, unread) + 1,
+            })
         )
-        unread_count = unread_result.scalar() or 0
-
-        contacts.append(
-            ContactResponse(
-                id=profile.id,
-                name=profile.name,
-                avatar=profile.avatar,
-                last_message=last_message.content if last_message else None,
-                last_message_time=last_message.created_at if last_message else None,
-                unread_count=unread_count,
+
+
+def _inbox_query(user_id, limit: Optional[int] = None, before: Optional[Tuple[datetime, UUID]] = None):
+    """Conversations of a user, newest first, as contact rows.
+    
+    Each side of the pair is read through its own (user, last_message_at)
+    index and the two are merged, so a page costs ``limit`` rows per side.
+    """
+    sides = []
+    for mine, other, unread in (
+        (Conversation.user_a_id, Conversation.user_b_id, Conversation.unread_a),
+        (Conversation.user_b_id, Conversation.user_a_id, Conversation.unread_b),
+    ):
+        side = (
+            select(
+                Conversation.id.label("conversation_id"),
+                other.label("contact_id"),
+                Conversation.last_message_preview,
+                Conversation.last_message_at,
+                unread.label("unread_count"),
             )
+            .where(mine == user_id, other != user_id)
+            .order_by(keyset_timestamp(Conversation.last_message_at).desc(), Conversation.id.desc())
         )
+        if before is not None:
+            side = side.where(keyset_before(Conversation.last_message_at, Conversation.id, *before))
+        if limit is not None:
+            side = side.limit(limit)
+        sides.append(select(side.subquery()))
+    inbox = union_all(*sides).subquery()
+    
+    query = (
+        select(inbox, Profile.name, Profile.avatar)
+        .join(Profile, Profile.id == inbox.c.contact_id)
+        .order_by(keyset_timestamp(inbox.c.last_message_at).desc(), inbox.c.conversation_id.desc())
+    )
+    return query.limit(limit) if limit is not None else query
+
+
+def _contact(row) -> ContactResponse:
+    return ContactResponse(
+        id=row.contact_id,
+        name=row.name,
+        avatar=row.avatar,
+        last_message=row.last_message_preview,
+        last_message_time=row.last_message_at,
+        unread_count=row.unread_count or 0,
+    )
+
+
+@router.get("/contacts", response_model=List[ContactResponse])
+async def get_contacts(
+    current_user: ProfileResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Return contacts the user has messaged with, including metadata."""
+    result = await db.execute(_inbox_query(current_user.id))
+    return [_contact(row) for row in result.all()]
+
 
-    # Sort by last message time desc, treating None as oldest
-    def sort_key(c: ContactResponse):
-        return (c.last_message_time.timestamp() if c.last_message_time else 0)
-    contacts.sort(key=sort_key, reverse=True)
-    return contacts
+@router.get("/contacts/page", response_model=ContactPage)
+async def get_contacts_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(30, ge=1, le=100),
+    current_user: ProfileResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """A page of contacts, most recent conversation first.
+    
+    Pass the returned ``next_cursor`` back as ``cursor`` for the next page.
+    """
+    before = decode_cursor(cursor) if cursor else None
+    # One extra row tells whether another page exists
+    rows = (await db.execute(_inbox_query(current_user.id, limit + 1, before))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].last_message_at, rows[-1].conversation_id)
+    return ContactPage(items=[_contact(row) for row in rows], next_cursor=next_cursor)
+
+
+def _history_query(user_id, contact_id, limit: int, before: Optional[Tuple[datetime, UUID]] = None):
+    """Newest ``limit`` messages between two users, before an optional position.
+    
+    Each direction is read backwards through its own (sender, recipient,
+    created_at, id) index and the two are merged, so a page costs ``limit``
+    rows per direction however long the thread is. Messages sharing a
+    timestamp keep their send order (see keyset_tiebreak).
+    """
+    tiebreak = keyset_tiebreak(Message)
+    sides = []
+    for sender, recipient in ((user_id, contact_id), (contact_id, user_id)):
+        side = (
+            select(Message, tiebreak.label("tiebreak"))
+            .where(Message.sender_id == sender, Message.recipient_id == recipient)
+            .order_by(keyset_timestamp(Message.created_at).desc(), tiebreak.desc())
+            .limit(limit)
+        )
+        if before is not None:
+            created_at, message_id = before
+            side = side.where(keyset_before(
+                Message.created_at, tiebreak, created_at, keyset_tiebreak_of(Message, message_id)
+            ))
+        sides.append(select(side.subquery()))
+        if sender == recipient:
+            # Notes to self are a single direction
+            break
+    merged = union_all(*sides).subquery()
+    history = aliased(Message, merged)
+    return (
+        select(history)
+        .order_by(keyset_timestamp(history.created_at).desc(), merged.c.tiebreak.desc())
+        .limit(limit)
+    )
 
 
 @router.get("/conversation/{contact_id}", response_model=ConversationResponse)
 async def get_conversation(
     contact_id: UUID,
+    before: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
     current_user: ProfileResponse = Depends(get_current_user),
     db: AsyncSession = Depends(get_async_db)
 ):
-    """Get all messages between the current user and a contact."""
-    result = await db.execute(
-        select(Message)
-        .where(
-            or_(
-                and_(Message.sender_id == current_user.id, Message.recipient_id == contact_id),
-                and_(Message.sender_id == contact_id, Message.recipient_id == current_user.id),
-            )
+    """Messages between the current user and a contact, newest page first.
+    
+    Each page is returned oldest to newest. Pass the returned
+    ``next_cursor`` back as ``before`` to load the page of older messages.
+    """
+    position = decode_cursor(before) if before else None
+    # One extra row tells whether older messages exist
+    messages = (await db.execute(_history_query(current_user.id, contact_id, limit + 1, position))).scalars().all()
+    next_cursor = None
+    if len(messages) > limit:
+        messages = messages[:limit]
+        next_cursor = encode_cursor(messages[-1].created_at, messages[-1].id)
+    return ConversationResponse(
+        messages=[MessageResponse.from_orm(m) for m in reversed(messages)],
+        next_cursor=next_cursor,
+    )
+
+
+# FTS5 table kept in step with messages on SQLite (see app.models.message)
+messages_fts = table("messages_fts", column("rowid"))
+
+# Deepest offset a search pages to; refine the query rather than page further
+SEARCH_MAX_SKIP = 1000
+
+
+def _search_query(user_id, terms: str, contact_id: Optional[UUID] = None):
+    """The user's messages matching ``terms``, best match first.
+    
+    PostgreSQL matches against the GIN-indexed tsvector expression and
+    ranks with ts_rank_cd; SQLite matches through FTS5 and ranks with
+    bm25. Returns None when the terms contain nothing searchable.
+    """
+    if contact_id is not None:
+        scope = or_(
+            and_(Message.sender_id == user_id, Message.recipient_id == contact_id),
+            and_(Message.sender_id == contact_id, Message.recipient_id == user_id),
+        )
+    else:
+        scope = or_(Message.sender_id == user_id, Message.recipient_id == user_id)
+
+    if is_sqlite:
+        words = re.findall(r"\w+", terms)
+        if not words:
+            return None
+        # Each word quoted, so FTS5 query syntax in user input is inert
+        match = " ".join('"{}"'.format(word) for word in words)
+        return (
+            select(Message)
+            .join(messages_fts, messages_fts.c.rowid == literal_column("messages.rowid"))
+            .where(literal_column("messages_fts").op("MATCH")(match), scope)
+            .order_by(func.bm25(literal_column("messages_fts")), Message.created_at.desc(), Message.id.desc())
         )
-        .order_by(Message.created_at.asc())
+
+    document = func.to_tsvector(search_config(), Message.content)
+    query = func.websearch_to_tsquery(search_config(), terms)
+    return (
+        select(Message)
+        .where(document.bool_op("@@")(query), scope)
+        .order_by(func.ts_rank_cd(document, query).desc(), Message.created_at.desc(), Message.id.desc())
     )
-    messages = result.scalars().all()
-    return ConversationResponse(messages=[MessageResponse.from_orm(m) for m in messages])
+
+
+@router.get("/search", response_model=MessageSearchPage)
+async def search_messages(
+    q: str = Query(..., min_length=1, max_length=200),
+    contact_id: Optional[UUID] = None,
+    skip: int = Query(0, ge=0, le=SEARCH_MAX_SKIP),
+    limit: int = Query(20, ge=1, le=50),
+    current_user: ProfileResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Search the current user's messages, optionally within one conversation.
+    
+    Results are ranked by relevance. Every match is scored before the
+    first page can be cut, so results page by offset: pass the returned
+    ``next_skip`` back as ``skip``.
+    """
+    query = _search_query(current_user.id, q, contact_id)
+    if query is None:
+        return MessageSearchPage(items=[])
+    # One extra row tells whether another page exists
+    messages = (await db.execute(query.offset(skip).limit(limit + 1))).scalars().all()
+    next_skip = None
+    if len(messages) > limit:
+        messages = messages[:limit]
+        if skip + limit <= SEARCH_MAX_SKIP:
+            next_skip = skip + limit
+    return MessageSearchPage(items=[MessageResponse.from_orm(m) for m in messages], next_skip=next_skip)
 
 
 @router.post("/send", response_model=MessageResponse)
@@ -131,9 +406,14 @@ async def send_message(
         is_read=False,
     )
     db.add(message)
+    await db.flush()
+    await record_message(db, message)
     await db.commit()
     await db.refresh(message)
-    return MessageResponse.from_orm(message)
+    response = MessageResponse.from_orm(message)
+    # The sender's own channel too, so their other open tabs stay in sync
+    await publish_to_users({"type": "message", "message": response}, message.recipient_id, message.sender_id)
+    return response
 
 
 @router.post("/mark-read")
@@ -143,7 +423,7 @@ async def mark_read(
     db: AsyncSession = Depends(get_async_db)
 ):
     """Mark messages from a contact as read for the current user."""
-    await db.execute(
+    result = await db.execute(
         update(Message)
         .where(
             and_(
@@ -154,5 +434,220 @@ async def mark_read(
         )
         .values(is_read=True)
     )
+    # Recounted rather than zeroed, so a message that arrived meanwhile stays unread
+    user_a_id, user_b_id = Conversation.pair(current_user.id, contact_id)
+    unread = "unread_a" if current_user.id == user_a_id else "unread_b"
+    await db.execute(
+        update(Conversation)
+        .where(Conversation.user_a_id == user_a_id, Conversation.user_b_id == user_b_id)
+        .values(**{unread: (
+            select(func.count(Message.id))
+            .where(
+                Message.sender_id == contact_id,
+                Message.recipient_id == current_user.id,
+                Message.is_read == False,
+            )
+            .scalar_subquery()
+        )})
+    )
     await db.commit()
-    return {"status": "ok"}
\ No newline at end of file
+    if result.rowcount:
+        await publish_to_users(
+            {
+                "type": "read",
+                "reader_id": current_user.id,
+                "contact_id": contact_id,
+                "read_at": datetime.now(timezone.utc),
+            },
+            contact_id,
+            current_user.id,
+        )
+    return {"status": "ok"}
+
+
+async def course_enrollees(db: AsyncSession, course_id: UUID, exclude) -> List[UUID]:
+    result = await db.execute(
+        select(Enrollment.user_id)
+        .where(Enrollment.course_id == course_id, Enrollment.user_id.isnot(None), Enrollment.user_id != exclude)
+        .distinct()
+    )
+    return list(result.scalars().all())
+
+
+async def deliver_broadcast(db: AsyncSession, sender_id, recipient_ids: List[UUID], content: str) -> None:
+    """Insert one message per recipient and update their conversations.
+    
+    Works in batches of ``BROADCAST_BATCH_SIZE``, each a single multi-row
+    INSERT committed together with its conversation updates, so a large
+    cohort never holds one long transaction.
+    """
+    sent_at = datetime.now(timezone.utc)
+    for start in range(0, len(recipient_ids), settings.BROADCAST_BATCH_SIZE):
+        batch = [
+            {
+                "id": uuid.uuid4(),
+                "sender_id": sender_id,
+                "recipient_id": recipient_id,
+                "content": content,
+                "is_read": False,
+                "created_at": sent_at,
+            }
+            for recipient_id in recipient_ids[start:start + settings.BROADCAST_BATCH_SIZE]
+        ]
+        await db.execute(insert(Message).values(batch))
+        await record_broadcast(db, sender_id, batch)
+        await db.commit()
+        for message in batch:
+            await event_broker.publish(
+                user_channel(message["recipient_id"]),
+                {"type": "message", "message": MessageResponse(**message)},
+            )
+
+
+async def _deliver_broadcast_in_background(sender_id, recipient_ids: List[UUID], content: str) -> None:
+    # The request's session is closed by the time this runs
+    async with AsyncSessionLocal() as db:
+        try:
+            await deliver_broadcast(db, sender_id, recipient_ids, content)
+        except Exception:
+            logger.exception("Broadcast from %s to %d recipients failed", sender_id, len(recipient_ids))
+
+
+@router.post("/broadcast", response_model=BroadcastResponse)
+async def broadcast(
+    payload: BroadcastCreate,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    current_user: ProfileResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Message every enrollee of a course (course author or admin only).
+    
+    With a ``title`` the broadcast is also stored as an InstructorMessage
+    on the course. Cohorts above ``BROADCAST_INLINE_LIMIT`` are delivered
+    after the response, which is then 202 with ``queued`` set.
+    """
+    content = payload.content.strip()
+    if not content:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Content required")
+    course = await db.get(Course, payload.course_id)
+    if course is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    if course.author_id != current_user.id and current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to message this course"
+        )
+    
+    announcement_id = None
+    if payload.title is not None:
+        if not payload.title.strip():
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Title required")
+        announcement = InstructorMessage(
+            id=uuid.uuid4(),
+            instructor_id=current_user.id,
+            course_id=course.id,
+            title=payload.title.strip(),
+            content=content,
+            is_announcement=payload.is_announcement,
+        )
+        db.add(announcement)
+        announcement_id = announcement.id
+    
+    recipient_ids = await course_enrollees(db, course.id, current_user.id)
+    queued = len(recipient_ids) > settings.BROADCAST_INLINE_LIMIT
+    if queued:
+        await db.commit()
+        background_tasks.add_task(_deliver_broadcast_in_background, current_user.id, recipient_ids, content)
+        response.status_code = status.HTTP_202_ACCEPTED
+    else:
+        # Commits the announcement along with the first batch
+        await deliver_broadcast(db, current_user.id, recipient_ids, content)
+        await db.commit()
+    return BroadcastResponse(recipients=len(recipient_ids), queued=queued, announcement_id=announcement_id)
+
+
+@router.get("/announcements/{course_id}", response_model=List[InstructorMessageResponse])
+async def get_announcements(
+    course_id: UUID,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: ProfileResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """A course's instructor messages, newest first, for its enrollees and author."""
+    course = await db.get(Course, course_id)
+    if course is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+    if course.author_id != current_user.id and current_user.role != "admin":
+        enrolled = await db.scalar(
+            select(Enrollment.id).where(Enrollment.course_id == course_id, Enrollment.user_id == current_user.id).limit(1)
+        )
+        if enrolled is None:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enrolled in this course")
+    result = await db.execute(
+        select(InstructorMessage)
+        .where(InstructorMessage.course_id == course_id)
+        .order_by(InstructorMessage.created_at.desc(), InstructorMessage.id.desc())
+        .limit(limit)
+    )
+    return [InstructorMessageResponse.from_orm(m) for m in result.scalars().all()]
+
+
+async def _websocket_user(token: Optional[str]) -> Optional[ProfileResponse]:
+    if not token:
+        return None
+    try:
+        user_data = get_user_from_token(token)
+        # A short-lived session: the socket must not hold a pooled connection open
+        async with AsyncSessionLocal() as db:
+            return await get_cached_profile(db, user_data["id"])
+    except (HTTPException, ValueError):
+        return None
+
+
+@router.websocket("/ws")
+async def message_events(websocket: WebSocket, token: Optional[str] = None):
+    """Push the user's message events as they happen.
+    
+    Browsers cannot set headers on a WebSocket handshake, so the access
+    token is passed as the ``token`` query parameter. Each frame is a JSON
+    event: ``{"type": "message", "message": {...}}`` for a message sent to
+    or by the user, ``{"type": "read", "reader_id", "contact_id", "read_at"}``
+    when either side of a conversation marks it read. Text frames ``ping``
+    are answered with ``pong``. A client that falls too far behind is
+    closed with 1013 and should reload over the REST endpoints.
+    """
+    user = await _websocket_user(token)
+    if user is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+
+    channel = user_channel(user.id)
+    queue = await event_broker.subscribe(channel)
+
+    async def forward():
+        while True:
+            data = await queue.get()
+            if data is None:
+                await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+                return
+            await websocket.send_text(data)
+
+    async def receive():
+        # Also notices the disconnect, which sending alone would not
+        while True:
+            if await websocket.receive_text() == "ping":
+                await websocket.send_text("pong")
+
+    tasks = [asyncio.create_task(forward()), asyncio.create_task(receive())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        await event_broker.unsubscribe(channel, queue)
+    for result in results:
+        if isinstance(result, Exception) and not isinstance(result, (WebSocketDisconnect, asyncio.CancelledError)):
+            raise result
\ No newline at end of file
@@ -1,9 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.core.database import get_db
-from app.core.security import verify_password, get_password_hash, create_access_token, get_user_from_token
+from app.core.database import get_async_db
+from app.core.security import create_access_token, get_user_from_token, get_cached_profile, password_hasher
 from app.models.user import User, Profile
 from app.schemas.user import UserCreate, UserLogin, Token, ProfileResponse
 from datetime import timedelta
@@ -13,17 +13,19 @@ router = APIRouter()
 security = HTTPBearer()
 
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> ProfileResponse:
-    """Get current authenticated user."""
+    """Get current authenticated user.
+    
+    Shares the request's async session with the endpoint and usually skips
+    the query entirely thanks to the short-lived profile cache.
+    """
     try:
         user_data = get_user_from_token(credentials.credentials)
         
-        # Get user profile from database
-        result = db.execute(select(Profile).where(Profile.id == user_data["id"]))
-        profile = result.scalar_one_or_none()
+        profile = await get_cached_profile(db, user_data["id"])
         
         if not profile:
             raise HTTPException(
@@ -31,7 +33,7 @@ def get_current_user(
                 detail="User profile not found"
             )
         
-        return ProfileResponse.from_orm(profile)
+        return profile
     except HTTPException:
         raise
     except Exception as e:
@@ -42,13 +44,13 @@ def get_current_user(
 
 
 @router.post("/register", response_model=Token)
-def register(
+async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Register a new user."""
     # Check if user already exists
-    result = db.execute(select(User).where(User.email == user_data.email))
+    result = await db.execute(select(User).where(User.email == user_data.email))
     existing_user = result.scalar_one_or_none()
     
     if existing_user:
@@ -58,13 +60,14 @@ def register(
         )
     
     # Create user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await password_hasher.hash(user_data.password)
     user = User(
         email=user_data.email,
         hashed_password=hashed_password
     )
     db.add(user)
-    db.flush()  # Get the user ID
+    await db.flush()  # Get the user ID
+    user_id, email = user.id, user.email
     
     # Create profile
     profile = Profile(
@@ -74,12 +77,14 @@ def register(
         role=user_data.role
     )
     db.add(profile)
-    db.commit()
+    await db.commit()
+    # Reload the server-generated columns (created_at) expired by the commit
+    await db.refresh(profile)
     
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.id), "email": user.email, "role": profile.role},
+        data={"sub": str(user_id), "email": email, "role": profile.role},
         expires_delta=access_token_expires
     )
     
@@ -91,24 +96,36 @@ def register(
 
 
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     user_credentials: UserLogin,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Authenticate user and return access token."""
     # Get user
-    result = db.execute(select(User).where(User.email == user_credentials.email))
+    result = await db.execute(select(User).where(User.email == user_credentials.email))
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
+    valid, new_hash = (False, None)
+    if user:
+        valid, new_hash = await password_hasher.verify_and_update(
+            user_credentials.password, user.hashed_password
+        )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    user_id, email = user.id, user.email
+    
+    # Hashing parameters changed since this hash was made; store an upgraded one
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+    
     # Get user profile
-    result = db.execute(select(Profile).where(Profile.id == user.id))
+    result = await db.execute(select(Profile).where(Profile.id == user_id))
     profile = result.scalar_one_or_none()
     
     if not profile:
@@ -120,7 +137,7 @@ def login(
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.id), "email": user.email, "role": profile.role},
+        data={"sub": str(user_id), "email": email, "role": profile.role},
         expires_delta=access_token_expires
     )
     
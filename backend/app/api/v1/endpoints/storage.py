@@ -1,44 +1,215 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from app.api.v1.endpoints.simple_auth import get_current_user
+from app.api.v1.endpoints.files import BLOBS_USAGE_KEY, BUCKETS, collect_unreferenced_files, purge_expired_upload_sessions
 from app.schemas.user import ProfileResponse
+from app.schemas.file import BucketUsage, StoredFilePage, StoredFileResponse
 from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.media import MediaFileResponse
+from app.core.pagination import encode_cursor, decode_cursor, keyset_before, keyset_timestamp
+from app.core.storage import storage
+from app.models.file import FileReference, StorageUsage, StoredFile
+from datetime import timedelta
+from typing import Dict, Optional
+from urllib.parse import quote
+from uuid import UUID
+import mimetypes
 import os
 from pathlib import Path
 
 router = APIRouter()
 
-# Check if upload directories exist
 UPLOAD_DIR = Path(settings.UPLOAD_DIR)
-COURSE_IMAGES_DIR = UPLOAD_DIR / "course-images"
-COURSE_VIDEOS_DIR = UPLOAD_DIR / "course-videos"
+
+
+async def _usage(db: AsyncSession) -> Dict[str, BucketUsage]:
+    """Per-bucket counters from storage_usage: one small table read."""
+    rows = (await db.scalars(select(StorageUsage))).all()
+    return {row.bucket: BucketUsage(files=row.file_count, bytes=row.total_bytes) for row in rows}
+
+
+def _local_bucket_writable(bucket: str) -> bool:
+    # A permission check only: no probe file is written
+    path = UPLOAD_DIR / bucket
+    return path.is_dir() and os.access(path, os.W_OK | os.X_OK)
+
 
 @router.get("/status")
-async def check_storage_status(current_user: ProfileResponse = Depends(get_current_user)):
+async def check_storage_status(
+    current_user: ProfileResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
-    Check if storage is available and properly configured
+    Check if storage is available and properly configured, with usage per bucket
     """
-    try:
-        # Ensure directories exist
-        UPLOAD_DIR.mkdir(exist_ok=True)
-        COURSE_IMAGES_DIR.mkdir(exist_ok=True)
-        COURSE_VIDEOS_DIR.mkdir(exist_ok=True)
-        
-        # Check if directories are writable
-        test_file_path = COURSE_IMAGES_DIR / ".test_write_access"
-        with open(test_file_path, "w") as f:
-            f.write("test")
-        os.remove(test_file_path)
-        
-        return {
-            "status": "available",
-            "message": "Storage is available and properly configured",
-            "buckets": {
-                "course-images": {"status": "available"},
-                "course-videos": {"status": "available"}
-            }
+    usage = await _usage(db)
+    buckets = {}
+    for bucket in BUCKETS:
+        available = await run_in_threadpool(_local_bucket_writable, bucket) if storage.is_local else True
+        counters = usage.get(bucket, BucketUsage(files=0, bytes=0))
+        buckets[bucket] = {
+            "status": "available" if available else "unavailable",
+            "files": counters.files,
+            "bytes": counters.bytes,
         }
-    except Exception as e:
+    
+    if not all(info["status"] == "available" for info in buckets.values()):
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Storage is not properly configured: {str(e)}"
-        )
\ No newline at end of file
+            detail="Storage is not properly configured: upload directories are missing or not writable"
+        )
+    
+    stored = usage.get(BLOBS_USAGE_KEY, BucketUsage(files=0, bytes=0))
+    return {
+        "status": "available",
+        "message": "Storage is available and properly configured",
+        "backend": type(storage).__name__,
+        "buckets": buckets,
+        # After deduplication: what the uploads actually occupy
+        "stored": {"blobs": stored.files, "bytes": stored.bytes},
+    }
+
+
+@router.get("/usage", response_model=Dict[str, BucketUsage])
+async def storage_usage(
+    current_user: ProfileResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """File count and bytes per bucket, including generated files and ".blobs"."""
+    return await _usage(db)
+
+
+@router.get("/files", response_model=StoredFilePage)
+async def list_stored_files(
+    bucket: Optional[str] = None,
+    owner_id: Optional[UUID] = None,
+    unreferenced: bool = False,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: ProfileResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Page through the file index, newest first.
+    
+    Non-admins see their own uploads. ``unreferenced`` keeps only files no
+    course or lesson uses, the garbage collector's candidates.
+    """
+    if current_user.role != "admin":
+        owner_id = current_user.id
+    
+    query = (
+        select(StoredFile)
+        .options(selectinload(StoredFile.blob), selectinload(StoredFile.references))
+        .order_by(keyset_timestamp(StoredFile.created_at).desc(), StoredFile.id.desc())
+    )
+    if bucket:
+        query = query.where(StoredFile.bucket == bucket)
+    if owner_id:
+        query = query.where(StoredFile.owner_id == owner_id)
+    if unreferenced:
+        query = query.where(
+            ~select(FileReference.id).where(FileReference.stored_file_id == StoredFile.id).exists()
+        )
+    if cursor:
+        created_at, file_id = decode_cursor(cursor)
+        query = query.where(keyset_before(StoredFile.created_at, StoredFile.id, created_at, file_id))
+    
+    files = (await db.scalars(query.limit(limit + 1))).all()
+    next_cursor = None
+    if len(files) > limit:
+        files = files[:limit]
+        next_cursor = encode_cursor(files[-1].created_at, files[-1].id)
+    
+    return StoredFilePage(
+        items=[
+            StoredFileResponse(
+                id=stored.id,
+                path=f"/uploads/{stored.bucket}/{stored.filename}",
+                bucket=stored.bucket,
+                filename=stored.filename,
+                original_filename=stored.original_filename,
+                content_type=stored.content_type,
+                size=stored.blob.size,
+                sha256=stored.blob_sha256,
+                owner_id=stored.owner_id,
+                created_at=stored.created_at,
+                referenced_by=[reference.to_dict() for reference in stored.references],
+            )
+            for stored in files
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+@router.post("/gc")
+async def collect_garbage(
+    dry_run: bool = True,
+    grace_hours: Optional[int] = Query(None, ge=0),
+    current_user: ProfileResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Delete (or with ``dry_run``, list) uploads nothing references. Admins only.
+    
+    Expired resumable upload sessions are purged in the same pass.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can run storage garbage collection"
+        )
+    grace = timedelta(hours=grace_hours) if grace_hours is not None else None
+    report = await collect_unreferenced_files(db, grace=grace, dry_run=dry_run)
+    report["expired_upload_sessions"] = await run_in_threadpool(purge_expired_upload_sessions, dry_run)
+    return report
+
+
+# Presigned URL targets for the local backend, standing in for an object
+# store: the signature in the query string authorizes the request
+
+def _local_storage_request(request: Request, method: str, key: str) -> None:
+    if not storage.is_local or not storage.verify(method, key, dict(request.query_params)):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Invalid or expired signature"
+        )
+
+
+@router.put("/local/{key:path}")
+async def put_local_object(key: str, request: Request):
+    """Receive a presigned upload; the body must match the signed size and SHA-256."""
+    _local_storage_request(request, "PUT", key)
+    try:
+        await storage.receive(
+            key,
+            request.stream(),
+            int(request.query_params["size"]),
+            request.query_params["sha256"],
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return Response(status_code=status.HTTP_200_OK)
+
+
+@router.get("/local/{key:path}")
+async def get_local_object(key: str, request: Request):
+    """Serve a presigned download."""
+    _local_storage_request(request, "GET", key)
+    path = storage.path(key)
+    if not path.is_file():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    
+    filename = request.query_params.get("filename")
+    media_type = (
+        request.query_params.get("content_type")
+        or mimetypes.guess_type(filename or key)[0]
+        or "application/octet-stream"
+    )
+    headers = {"Content-Disposition": f"inline; filename*=UTF-8''{quote(filename)}"} if filename else None
+    return MediaFileResponse(path, path.stat().st_size, media_type, headers=headers)
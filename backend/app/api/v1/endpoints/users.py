@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.database import get_async_db
+from app.core.security import invalidate_cached_profile
 from app.models.user import Profile
 from app.schemas.user import ProfileUpdate, ProfileResponse
 from app.api.v1.endpoints.auth import get_current_user
@@ -33,6 +34,7 @@ async def update_profile(
     
     await db.commit()
     await db.refresh(profile)
+    invalidate_cached_profile(profile.id)
     
     return ProfileResponse.from_orm(profile)
 
@@ -0,0 +1,344 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, update, and_, or_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.core.config import settings
+from app.core.storage import storage
+from app.core.video import HLS_MEDIA_TYPES, TranscodeError, parse_ladder, probe, select_renditions, transcode_hls
+from app.models.file import StoredFile, VideoJob, VideoJobStatus
+from app.api.v1.endpoints.courses import refresh_lesson_videos, upload_location
+from app.api.v1.endpoints.files import BLOBS_TMP_DIR, VIDEO_HLS_BUCKET, adjust_storage_usage, blob_key
+from app.api.v1.endpoints.simple_auth import get_current_user
+from app.schemas.user import ProfileResponse
+from app.schemas.file import VideoJobResponse
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Optional, Tuple
+from uuid import UUID
+import aiofiles
+import asyncio
+import logging
+import os
+import shutil
+import socket
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class JobLost(Exception):
+    """The job was deleted (its video removed) or reclaimed by another worker."""
+
+
+def _job_response(job: VideoJob) -> VideoJobResponse:
+    succeeded = job.status == VideoJobStatus.SUCCEEDED.value
+    return VideoJobResponse(
+        id=job.id,
+        source_sha256=job.source_sha256,
+        status=job.status,
+        progress=job.progress or 0.0,
+        attempts=job.attempts or 0,
+        max_attempts=settings.VIDEO_JOB_MAX_ATTEMPTS,
+        error=job.error,
+        duration_seconds=job.duration_seconds,
+        renditions=job.renditions.split(",") if job.renditions else [],
+        hls_url=job.hls_url if succeeded else None,
+        run_after=job.run_after,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+        finished_at=job.finished_at,
+    )
+
+
+@router.get("/jobs/stats")
+async def video_job_stats(db: AsyncSession = Depends(get_async_db)):
+    """Transcode jobs per status, across all workers."""
+    result = await db.execute(select(VideoJob.status, func.count()).group_by(VideoJob.status))
+    counts = {job_status.value: 0 for job_status in VideoJobStatus}
+    counts.update(dict(result.all()))
+    return counts
+
+
+@router.get("/jobs", response_model=VideoJobResponse)
+async def get_video_job_for_file(
+    file_path: str,
+    current_user: ProfileResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Transcode job of an uploaded video, by the file_path its upload returned."""
+    location = upload_location(file_path, "course-videos")
+    job = None
+    if location is not None:
+        job = await db.scalar(
+            select(VideoJob)
+            .join(StoredFile, StoredFile.blob_sha256 == VideoJob.source_sha256)
+            .where(StoredFile.bucket == location[0], StoredFile.filename == location[1])
+        )
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No transcode job for this file"
+        )
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=VideoJobResponse)
+async def get_video_job(
+    job_id: UUID,
+    current_user: ProfileResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Status and progress of a transcode job."""
+    job = await db.get(VideoJob, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Video job not found"
+        )
+    return _job_response(job)
+
+
+@router.post("/jobs/{job_id}/retry", response_model=VideoJobResponse)
+async def retry_video_job(
+    job_id: UUID,
+    current_user: ProfileResponse = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Queue a failed transcode again with a fresh set of attempts."""
+    job = await db.get(VideoJob, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Video job not found"
+        )
+
+    if current_user.role != "admin":
+        owns_upload = await db.scalar(
+            select(StoredFile.id)
+            .where(StoredFile.blob_sha256 == job.source_sha256, StoredFile.owner_id == current_user.id)
+            .limit(1)
+        )
+        if owns_upload is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to retry this job"
+            )
+
+    if job.status != VideoJobStatus.FAILED.value:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Only failed jobs can be retried (job is {job.status})"
+        )
+
+    job.status = VideoJobStatus.QUEUED.value
+    job.attempts = 0
+    job.progress = 0.0
+    job.error = None
+    job.run_after = func.now()
+    job.finished_at = None
+    await db.commit()
+    await db.refresh(job)
+    return _job_response(job)
+
+
+# Worker side (video_worker.py). Jobs are claimed with a lease that the
+# worker extends as ffmpeg reports progress, so the jobs of a crashed
+# worker become claimable again once their lease runs out.
+
+async def claim_video_job(worker_id: str) -> Optional[Tuple[UUID, str]]:
+    """Take the next due job, returning (job id, source sha256), or None."""
+    now = datetime.now(timezone.utc)
+    lease_expired = and_(VideoJob.status == VideoJobStatus.RUNNING.value, VideoJob.locked_until < now)
+    async with AsyncSessionLocal() as db:
+        # Jobs whose worker died on their last attempt are not picked up again
+        await db.execute(
+            update(VideoJob)
+            .where(lease_expired, VideoJob.attempts >= settings.VIDEO_JOB_MAX_ATTEMPTS)
+            .values(
+                status=VideoJobStatus.FAILED.value,
+                error="Worker stopped responding",
+                locked_until=None,
+                finished_at=now,
+            )
+        )
+        # SKIP LOCKED lets concurrent workers claim different jobs without waiting
+        job = await db.scalar(
+            select(VideoJob)
+            .where(or_(
+                and_(VideoJob.status == VideoJobStatus.QUEUED.value, VideoJob.run_after <= now),
+                lease_expired,
+            ))
+            .order_by(VideoJob.run_after)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        if job is None:
+            await db.commit()
+            return None
+        job.status = VideoJobStatus.RUNNING.value
+        job.attempts = (job.attempts or 0) + 1
+        job.progress = 0.0
+        job.error = None
+        job.worker_id = worker_id
+        job.locked_until = now + timedelta(seconds=settings.VIDEO_JOB_LEASE_SECONDS)
+        claimed = (job.id, job.source_sha256)
+        await db.commit()
+        return claimed
+
+
+async def _update_owned_job(job_id: UUID, worker_id: str, **values) -> bool:
+    """Update a job this worker still holds; False once it was deleted or lost."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(VideoJob)
+            .where(
+                VideoJob.id == job_id,
+                VideoJob.worker_id == worker_id,
+                VideoJob.status == VideoJobStatus.RUNNING.value,
+            )
+            .values(**values)
+        )
+        await db.commit()
+        return result.rowcount > 0
+
+
+async def _transcode_with_heartbeat(job_id: UUID, worker_id: str, **transcode_args) -> None:
+    """Run the transcode while renewing the lease; abort if the job is lost."""
+    progress = {"value": 0.0}
+    transcode_args["on_progress"] = lambda value: progress.update(value=value)
+    transcode = asyncio.create_task(transcode_hls(**transcode_args))
+    interval = max(1.0, settings.VIDEO_JOB_LEASE_SECONDS / 3)
+    try:
+        while True:
+            done, _ = await asyncio.wait({transcode}, timeout=interval)
+            if done:
+                return transcode.result()
+            still_owned = await _update_owned_job(
+                job_id,
+                worker_id,
+                progress=round(progress["value"], 4),
+                locked_until=datetime.now(timezone.utc) + timedelta(seconds=settings.VIDEO_JOB_LEASE_SECONDS),
+            )
+            if not still_owned:
+                raise JobLost()
+    finally:
+        if not transcode.done():
+            transcode.cancel()
+            await asyncio.gather(transcode, return_exceptions=True)
+
+
+async def process_video_job(job_id: UUID, sha256: str, worker_id: str) -> None:
+    """Probe and transcode a claimed job, store its HLS output and update lessons."""
+    work_dir = Path(tempfile.mkdtemp(dir=BLOBS_TMP_DIR))
+    prefix = f"{VIDEO_HLS_BUCKET}/{sha256}/"
+    try:
+        if storage.is_local:
+            source = storage.path(blob_key(sha256))
+        else:
+            source = work_dir / "source"
+            async with aiofiles.open(source, 'wb') as f:
+                async for data in storage.stream(blob_key(sha256), settings.UPLOAD_CHUNK_SIZE):
+                    await f.write(data)
+
+        info = await probe(source)
+        renditions = select_renditions(parse_ladder(settings.VIDEO_HLS_LADDER), info["height"])
+        out_dir = work_dir / "hls"
+        await _transcode_with_heartbeat(
+            job_id,
+            worker_id,
+            source=source,
+            out_dir=out_dir,
+            renditions=renditions,
+            has_audio=info["has_audio"],
+            duration=info["duration"],
+        )
+
+        # Segments, then rendition playlists, then master.m3u8: a readable
+        # master playlist means the whole ladder is in place
+        outputs = sorted(
+            (path for path in out_dir.rglob("*") if path.is_file()),
+            key=lambda path: (path.suffix != ".ts", path.name == "master.m3u8"),
+        )
+        output_size = sum(path.stat().st_size for path in outputs)
+        for path in outputs:
+            await storage.put(
+                prefix + path.relative_to(out_dir).as_posix(),
+                path,
+                HLS_MEDIA_TYPES.get(path.suffix),
+            )
+
+        finished = await _update_owned_job(
+            job_id,
+            worker_id,
+            status=VideoJobStatus.SUCCEEDED.value,
+            progress=1.0,
+            duration_seconds=info["duration"],
+            renditions=",".join(f"{height}p" for height, _ in renditions),
+            output_size=output_size,
+            locked_until=None,
+            finished_at=datetime.now(timezone.utc),
+        )
+        if not finished:
+            # The video was deleted while transcoding
+            await storage.delete_prefix(prefix)
+            return
+        async with AsyncSessionLocal() as db:
+            await adjust_storage_usage(db, VIDEO_HLS_BUCKET, 1, output_size)
+            await db.commit()
+            await refresh_lesson_videos(db, sha256)
+        logger.info("Video job %s: transcoded %s into %d renditions", job_id, sha256, len(renditions))
+    except JobLost:
+        logger.info("Video job %s was deleted or reclaimed; abandoning it", job_id)
+    except Exception as e:
+        logger.exception("Video job %s failed", job_id)
+        await storage.delete_prefix(prefix)
+        await _record_failure(job_id, worker_id, e)
+    finally:
+        await run_in_threadpool(shutil.rmtree, work_dir, True)
+
+
+async def _record_failure(job_id: UUID, worker_id: str, error: Exception) -> None:
+    """Schedule a retry with exponential backoff, or fail the job for good."""
+    async with AsyncSessionLocal() as db:
+        job = await db.get(VideoJob, job_id)
+        if job is None or job.worker_id != worker_id or job.status != VideoJobStatus.RUNNING.value:
+            return
+        message = str(error)[-2000:] or error.__class__.__name__
+        # A file ffmpeg cannot read will not get better on retry
+        retryable = not (isinstance(error, TranscodeError) and "no video stream" in message.lower())
+        now = datetime.now(timezone.utc)
+        if retryable and job.attempts < settings.VIDEO_JOB_MAX_ATTEMPTS:
+            job.status = VideoJobStatus.QUEUED.value
+            job.run_after = now + timedelta(
+                seconds=settings.VIDEO_JOB_RETRY_DELAY_SECONDS * 2 ** (job.attempts - 1)
+            )
+        else:
+            job.status = VideoJobStatus.FAILED.value
+            job.finished_at = now
+        job.error = message
+        job.locked_until = None
+        await db.commit()
+
+
+async def run_video_worker(concurrency: Optional[int] = None) -> None:
+    """Claim and process jobs forever, ``concurrency`` at a time."""
+    concurrency = concurrency or settings.VIDEO_WORKER_CONCURRENCY
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    async def work():
+        while True:
+            try:
+                claimed = await claim_video_job(worker_id)
+            except Exception:
+                logger.exception("Claiming a video job failed")
+                claimed = None
+            if claimed is None:
+                await asyncio.sleep(settings.VIDEO_WORKER_POLL_SECONDS)
+                continue
+            await process_video_job(*claimed, worker_id)
+
+    logger.info("Video worker %s started with %d slot(s)", worker_id, concurrency)
+    await asyncio.gather(*(work() for _ in range(concurrency)))
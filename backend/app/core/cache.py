@@ -0,0 +1,209 @@
+from abc import ABC, abstractmethod
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.core.config import settings
+
+
+class LRUCache:
+    """Bounded in-process LRU map whose entries expire after a TTL."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheBackend(ABC):
+    """Storage interface for the response cache.
+
+    Values are rendered response bodies (bytes). ``incr`` backs namespace
+    generations and must not be subject to eviction.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        ...
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    async def get_counter(self, key: str) -> int:
+        ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU backend (per worker)."""
+
+    def __init__(self, max_entries: int, ttl: int):
+        self._entries = LRUCache(max_entries, ttl)
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._entries.set(key, value, ttl)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.delete(key)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Backend for a Redis-compatible async client (``redis.asyncio`` API).
+
+    Shared across workers, so invalidation is visible everywhere. Any client
+    exposing ``get``/``set(ex=)``/``delete``/``incr`` works, e.g. a local
+    fakeredis instance in development.
+    """
+
+    def __init__(self, client, prefix: str = "vlms:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self.client.set(self.prefix + key, value, ex=ttl)
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(self.prefix + key)
+
+    async def get_counter(self, key: str) -> int:
+        value = await self.client.get(self.prefix + key)
+        return int(value) if value is not None else 0
+
+
+class ResponseCache:
+    """Read-through cache of rendered JSON bodies with hit/miss counters.
+
+    Individual entries are invalidated by key; families of keys (e.g. every
+    catalog query) live under a namespace whose generation is bumped to drop
+    them all at once.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        value = await self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        await self.backend.set(key, value, self.ttl)
+
+    async def invalidate(self, *keys: str) -> None:
+        await self.backend.delete(*keys)
+
+    async def namespace(self, name: str) -> str:
+        """Current key prefix for a namespace."""
+        generation = await self.backend.get_counter(f"ns:{name}")
+        return f"{name}:{generation}"
+
+    async def bump(self, name: str) -> None:
+        """Invalidate every key under a namespace."""
+        await self.backend.incr(f"ns:{name}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def create_response_cache() -> ResponseCache:
+    """Build the response cache configured by ``CACHE_BACKEND``."""
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+        backend = RedisCacheBackend(redis.from_url(settings.REDIS_URL))
+    else:
+        backend = MemoryCacheBackend(settings.CACHE_MAX_ENTRIES, settings.CACHE_TTL_SECONDS)
+    return ResponseCache(backend, settings.CACHE_TTL_SECONDS)
+
+
+response_cache = create_response_cache()
+
+
+async def cached_json(
+    key: str,
+    build: Callable[[], Awaitable[Any]],
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Serve ``key`` from the response cache, rendering ``build()`` on a miss."""
+    body = await response_cache.get(key)
+    if body is None:
+        body = JSONResponse(content=jsonable_encoder(await build())).body
+        await response_cache.set(key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
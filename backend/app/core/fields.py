@@ -0,0 +1,65 @@
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+
+def parse_fields(fields: Optional[str], schema) -> Optional[List[str]]:
+    """Validate a comma-separated ``?fields=`` selection against a response schema.
+
+    Returns the selected field names in schema order (``id`` is always
+    included), or None when no selection was requested.
+    """
+    if not fields:
+        return None
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - schema.__fields__.keys()
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+
+    requested.add("id")
+    return [name for name in schema.__fields__ if name in requested]
+
+
+def load_fields(model, fields: Iterable[str], *extra):
+    """``load_only`` option restricting a select to the columns behind ``fields``.
+
+    ``extra`` columns are loaded too (e.g. pagination keys) without being
+    serialized. Deferred columns named in ``fields`` are loaded as well.
+    """
+    columns = inspect(model).column_attrs.keys()
+    return load_only(*(getattr(model, name) for name in fields if name in columns), *extra)
+
+
+@lru_cache(maxsize=None)
+def _field_adapter(schema, name: str) -> TypeAdapter:
+    return TypeAdapter(schema.model_fields[name].annotation)
+
+
+def pick_fields(obj, fields: Iterable[str], schema) -> Dict:
+    """Serialize only the selected attributes of a loaded row.
+
+    Each value goes through the schema's own field type, so a sparse
+    response carries the same JSON types as the full representation. The
+    schema cannot validate the row as a whole: its other columns are not
+    loaded.
+    """
+    picked = {}
+    for name in fields:
+        adapter = _field_adapter(schema, name)
+        value = adapter.validate_python(getattr(obj, name), from_attributes=True)
+        picked[name] = adapter.dump_python(value, mode="json")
+    return picked
+
+
+def sparse_json(content, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    """Render a sparse (field-selected) payload, bypassing the response model."""
+    return JSONResponse(content=jsonable_encoder(content), headers=headers)
@@ -0,0 +1,33 @@
+import hashlib
+from typing import Dict, Iterable, Optional
+from fastapi import Response
+from app.core.config import settings
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag from the identity/version parts of a resource."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def make_collection_etag(kind: str, rows: Iterable) -> str:
+    """Strong ETag for a collection from its (id, version) rows."""
+    return make_etag(kind, *sorted(f"{id}:{version}" for id, version in rows))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches ``etag`` (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    return {"ETag": etag, "Cache-Control": settings.HTTP_CACHE_CONTROL}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
@@ -0,0 +1,170 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Sequence
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Pillow format name and media type per variant format
+VARIANT_FORMATS = {
+    "webp": ("WEBP", "image/webp"),
+    "avif": ("AVIF", "image/avif"),
+}
+
+
+def _avif_supported() -> bool:
+    from PIL import Image
+    if "AVIF" not in Image.SAVE:
+        try:
+            # Pillow < 11.3 needs the optional pillow-avif-plugin package
+            import pillow_avif  # noqa: F401
+        except ImportError:
+            return False
+    return "AVIF" in Image.SAVE
+
+
+def render_variants(
+    source: str,
+    out_dir: str,
+    widths: Sequence[int],
+    formats: Sequence[str],
+    quality: int,
+) -> List[dict]:
+    """Write resized, metadata-free copies of an image; runs in a worker process.
+
+    Produces ``<width>.<format>`` files in ``out_dir`` for each requested
+    width no larger than the original (which is always included when
+    smaller than every width). EXIF orientation is applied, and the image
+    is converted to sRGB so dropping its ICC profile keeps colours right.
+    Formats this Pillow build cannot write are skipped.
+    """
+    from PIL import Image, ImageCms, ImageOps
+
+    formats = [fmt for fmt in formats if fmt != "avif" or _avif_supported()]
+
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        icc_profile = image.info.get("icc_profile")
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+        if icc_profile:
+            try:
+                image = ImageCms.profileToProfile(
+                    image,
+                    ImageCms.ImageCmsProfile(io.BytesIO(icc_profile)),
+                    ImageCms.createProfile("sRGB"),
+                    outputMode=image.mode,
+                )
+            except (ImageCms.PyCMSError, OSError, ValueError):
+                pass
+        # Nothing from the upload's metadata (EXIF, GPS, XMP, ICC) is carried over
+        image.info = {}
+
+        variants = []
+        for width in sorted({min(width, image.width) for width in widths}):
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            for fmt in formats:
+                path = os.path.join(out_dir, f"{width}.{fmt}")
+                options = {"quality": quality}
+                if fmt == "webp":
+                    options["method"] = 6
+                resized.save(path, format=VARIANT_FORMATS[fmt][0], **options)
+                variants.append({
+                    "path": path,
+                    "width": width,
+                    "height": height,
+                    "format": fmt,
+                    "size": os.path.getsize(path),
+                })
+        return variants
+
+
+class ImageJobQueue:
+    """Runs image jobs in the background, with pixel work on a process pool.
+
+    Jobs are coroutines queued by key; a key already queued or running is
+    not queued twice. ``concurrency`` consumer tasks take jobs off the
+    queue, and jobs hand CPU-bound rendering to ``render`` so resizing and
+    encoding neither block the event loop nor contend for the GIL.
+    """
+
+    def __init__(self, workers: int, concurrency: int):
+        self.workers = workers
+        self.concurrency = concurrency
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._consumers: List[asyncio.Task] = []
+        self._pending: Dict[Hashable, Callable[[], Awaitable[None]]] = {}
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+
+    def _start(self) -> None:
+        # Spawned, not forked: forking a process with a running event loop
+        # and threads can deadlock the children
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self._queue = asyncio.Queue()
+        self._consumers = [asyncio.create_task(self._consume()) for _ in range(self.concurrency)]
+
+    def submit(self, key: Hashable, job: Callable[[], Awaitable[None]]) -> None:
+        """Queue ``job()`` unless a job for ``key`` is already pending."""
+        if self._queue is None:
+            self._start()
+        if key in self._pending:
+            return
+        self._pending[key] = job
+        self._queue.put_nowait(key)
+
+    async def render(self, fn, *args):
+        """Run a picklable function on the process pool."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def _consume(self) -> None:
+        while True:
+            key = await self._queue.get()
+            job = self._pending[key]
+            self.running += 1
+            try:
+                await job()
+                self.completed += 1
+            except Exception:
+                self.failed += 1
+                logger.exception("Image job %s failed", key)
+            finally:
+                self.running -= 1
+                self._pending.pop(key, None)
+                self._queue.task_done()
+
+    async def join(self) -> None:
+        """Wait until every queued job has finished."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def shutdown(self) -> None:
+        for task in self._consumers:
+            task.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._queue = None
+        self._consumers = []
+        self._pending.clear()
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queued": len(self._pending) - self.running,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+image_jobs = ImageJobQueue(settings.IMAGE_WORKERS, settings.IMAGE_JOB_CONCURRENCY)
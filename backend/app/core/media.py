@@ -0,0 +1,162 @@
+import uuid
+from typing import List, Optional, Tuple
+import anyio
+from fastapi import Response
+from starlette.types import Receive, Scope, Send
+
+
+class RangeNotSatisfiable(Exception):
+    """No requested byte range overlaps the file."""
+
+
+def parse_range_header(header: Optional[str], size: int, max_ranges: int) -> Optional[List[Tuple[int, int]]]:
+    """Parse a ``Range: bytes=...`` header into sorted, merged inclusive ranges.
+
+    Returns None when the whole file should be sent instead: no header, a
+    unit other than bytes, a malformed spec, or more ranges than
+    ``max_ranges`` after merging. Raises RangeNotSatisfiable when every
+    range starts past the end of the file.
+    """
+    if not header or not header.strip().lower().startswith("bytes="):
+        return None
+
+    ranges = []
+    for spec in header.strip()[6:].split(","):
+        spec = spec.strip()
+        if not spec:
+            continue
+        first, sep, last = spec.partition("-")
+        if not sep:
+            return None
+        try:
+            if first == "":
+                # Suffix range: the final N bytes
+                suffix = int(last)
+                if suffix <= 0:
+                    continue
+                start, end = max(0, size - suffix), size - 1
+            else:
+                start = int(first)
+                end = int(last) if last else max(start, size - 1)
+                if end < start:
+                    return None
+                if start >= size:
+                    continue
+                end = min(end, size - 1)
+        except ValueError:
+            return None
+        ranges.append((start, end))
+
+    if not ranges:
+        raise RangeNotSatisfiable()
+
+    # Overlapping or adjacent ranges are served as one
+    ranges.sort()
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+
+    if len(merged) > max_ranges:
+        return None
+    return merged
+
+
+class MediaFileResponse(Response):
+    """File response supporting single and multipart byte ranges.
+
+    When the server offers the ``http.response.zerocopysend`` ASGI
+    extension the file is handed to it (sendfile); otherwise it is
+    streamed in ``chunk_size`` pieces from a worker thread.
+    """
+
+    chunk_size = 1024 * 1024
+
+    def __init__(
+        self,
+        path,
+        size: int,
+        media_type: str,
+        ranges: Optional[List[Tuple[int, int]]] = None,
+        headers: Optional[dict] = None,
+        send_body: bool = True,
+    ):
+        self.path = path
+        self.background = None
+        self.send_body = send_body
+        self.media_type = media_type
+        self.init_headers(headers)
+
+        # Body layout: (prefix bytes, (start, end) or None) per segment
+        self.segments: List[Tuple[bytes, Optional[Tuple[int, int]]]] = []
+        if not ranges:
+            self.status_code = 200
+            content_type = media_type
+            self.segments.append((b"", (0, size - 1) if size else None))
+        elif len(ranges) == 1:
+            start, end = ranges[0]
+            self.status_code = 206
+            content_type = media_type
+            self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+            self.segments.append((b"", (start, end)))
+        else:
+            boundary = uuid.uuid4().hex
+            self.status_code = 206
+            content_type = f"multipart/byteranges; boundary={boundary}"
+            for start, end in ranges:
+                part_headers = (
+                    f"--{boundary}\r\n"
+                    f"Content-Type: {media_type}\r\n"
+                    f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+                )
+                prefix = (b"\r\n" if self.segments else b"") + part_headers.encode("latin-1")
+                self.segments.append((prefix, (start, end)))
+            self.segments.append((f"\r\n--{boundary}--\r\n".encode("latin-1"), None))
+
+        length = sum(
+            len(prefix) + (span[1] - span[0] + 1 if span else 0)
+            for prefix, span in self.segments
+        )
+        self.headers["content-type"] = content_type
+        self.headers["content-length"] = str(length)
+        self.headers["accept-ranges"] = "bytes"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if not self.send_body:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        zero_copy = "http.response.zerocopysend" in scope.get("extensions", {})
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            for prefix, span in self.segments:
+                if prefix:
+                    await send({"type": "http.response.body", "body": prefix, "more_body": True})
+                if span is None:
+                    continue
+                start, end = span
+                if zero_copy:
+                    await send({
+                        "type": "http.response.zerocopysend",
+                        "file": file.wrapped,
+                        "offset": start,
+                        "count": end - start + 1,
+                        "more_body": True,
+                    })
+                    continue
+                await file.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    data = await file.read(min(self.chunk_size, remaining))
+                    if not data:
+                        break
+                    remaining -= len(data)
+                    await send({"type": "http.response.body", "body": data, "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
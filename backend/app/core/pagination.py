@@ -0,0 +1,67 @@
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+from uuid import UUID
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, and_, func, literal, literal_column, or_, select
+from app.core.database import is_sqlite
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    """Encode a (created_at, id) keyset position as an opaque cursor."""
+    payload = json.dumps({"c": created_at.isoformat(), "i": str(id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Decode an opaque cursor back into its (created_at, id) keyset position."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["c"]), UUID(payload["i"])
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def keyset_timestamp(column):
+    """Timestamp expression to order and compare keyset positions on.
+
+    SQLite keeps server-default timestamps as text without fractional
+    seconds while bound datetimes carry microseconds, so both sides are
+    normalised to one format there.
+    """
+    if is_sqlite:
+        return func.strftime("%Y-%m-%d %H:%M:%f", column)
+    return column
+
+
+def keyset_before(created_col, id_col, created_at: datetime, id: UUID):
+    """Predicate for rows strictly before (created_at, id) in descending order."""
+    ts = keyset_timestamp(created_col)
+    bound = keyset_timestamp(literal(created_at, DateTime(timezone=True)))
+    return or_(ts < bound, and_(ts == bound, id_col < id))
+
+
+def keyset_tiebreak(model):
+    """Column ordering rows of ``model`` that share a keyset timestamp.
+
+    Ids are random UUIDs, so ordering ties on them is arbitrary. That
+    matters on SQLite, where server-default timestamps have one-second
+    resolution: ties there are broken on the rowid, which follows insert
+    order. PostgreSQL timestamps carry microseconds, so the id only has to
+    separate rows written in one transaction.
+    """
+    if is_sqlite:
+        return literal_column(f"{model.__tablename__}.rowid")
+    return model.id
+
+
+def keyset_tiebreak_of(model, id: UUID):
+    """The ``keyset_tiebreak`` value of the row with ``id``, for keyset_before."""
+    if is_sqlite:
+        return select(keyset_tiebreak(model)).where(model.id == id).scalar_subquery()
+    return id
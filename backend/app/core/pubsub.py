@@ -0,0 +1,209 @@
+from abc import ABC, abstractmethod
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+from fastapi.encoders import jsonable_encoder
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PubSubBackend(ABC):
+    """Transport for realtime events between processes.
+
+    A process subscribes to the channels its connections care about;
+    ``listen`` yields ``(channel, data)`` for every event published on one
+    of them, by this or any other process sharing the backend.
+    """
+
+    @abstractmethod
+    async def publish(self, channel: str, data: str) -> None:
+        ...
+
+    @abstractmethod
+    async def subscribe(self, channel: str) -> None:
+        ...
+
+    @abstractmethod
+    async def unsubscribe(self, channel: str) -> None:
+        ...
+
+    @abstractmethod
+    def listen(self) -> AsyncIterator[Tuple[str, str]]:
+        ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryPubSubBackend(PubSubBackend):
+    """In-process backend; events only reach connections on the same worker."""
+
+    def __init__(self):
+        self._channels: Set[str] = set()
+        self._events: "asyncio.Queue[Tuple[str, str]]" = asyncio.Queue()
+
+    async def publish(self, channel: str, data: str) -> None:
+        if channel in self._channels:
+            self._events.put_nowait((channel, data))
+
+    async def subscribe(self, channel: str) -> None:
+        self._channels.add(channel)
+
+    async def unsubscribe(self, channel: str) -> None:
+        self._channels.discard(channel)
+
+    async def listen(self) -> AsyncIterator[Tuple[str, str]]:
+        while True:
+            yield await self._events.get()
+
+
+class RedisPubSubBackend(PubSubBackend):
+    """Backend for a Redis-compatible async client (``redis.asyncio`` API).
+
+    Every worker holds one pub/sub connection, so events reach a user's
+    sockets wherever they are connected. Any client exposing ``publish``
+    and ``pubsub()`` works, e.g. a local fakeredis instance in development.
+    """
+
+    def __init__(self, client, prefix: str = "vlms:"):
+        self.client = client
+        self.prefix = prefix
+        self._pubsub = client.pubsub()
+
+    async def publish(self, channel: str, data: str) -> None:
+        await self.client.publish(self.prefix + channel, data)
+
+    async def subscribe(self, channel: str) -> None:
+        await self._pubsub.subscribe(self.prefix + channel)
+
+    async def unsubscribe(self, channel: str) -> None:
+        await self._pubsub.unsubscribe(self.prefix + channel)
+
+    async def listen(self) -> AsyncIterator[Tuple[str, str]]:
+        while True:
+            if not self._pubsub.subscribed:
+                # get_message() has nothing to read from until the first subscribe
+                await asyncio.sleep(0.5)
+                continue
+            message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            if message is None:
+                continue
+            channel, data = message["channel"], message["data"]
+            if isinstance(channel, bytes):
+                channel, data = channel.decode(), data.decode()
+            yield channel[len(self.prefix):], data
+
+    async def close(self) -> None:
+        await self._pubsub.close()
+
+
+class EventBroker:
+    """Fans events out from a pub/sub backend to local subscribers.
+
+    Each subscriber (a websocket connection) gets a bounded queue. A
+    channel is subscribed on the backend once per process, however many
+    local subscribers it has. A subscriber that falls ``queue_size``
+    events behind is cut off with a ``None`` in its queue rather than
+    buffered without bound; clients resync over the REST endpoints when
+    they reconnect.
+    """
+
+    def __init__(self, backend: PubSubBackend, queue_size: int):
+        self.backend = backend
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._reader: Optional[asyncio.Task] = None
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    async def publish(self, channel: str, event: Any) -> None:
+        """Publish a JSON-serialisable event; failures are logged, not raised.
+
+        Callers publish after committing, so a backend outage must not turn
+        a stored message into a failed request.
+        """
+        try:
+            await self.backend.publish(channel, json.dumps(jsonable_encoder(event)))
+            self.published += 1
+        except Exception:
+            logger.exception("Publishing to %s failed", channel)
+
+    async def subscribe(self, channel: str) -> asyncio.Queue:
+        """A queue receiving every event published on ``channel`` from now on."""
+        if self._reader is None:
+            self._reader = asyncio.create_task(self._read())
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        subscribers = self._subscribers.setdefault(channel, set())
+        if not subscribers:
+            await self.backend.subscribe(channel)
+        subscribers.add(queue)
+        return queue
+
+    async def unsubscribe(self, channel: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(channel)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[channel]
+            await self.backend.unsubscribe(channel)
+
+    async def _read(self) -> None:
+        while True:
+            try:
+                async for channel, data in self.backend.listen():
+                    for queue in list(self._subscribers.get(channel, ())):
+                        self._deliver(queue, data)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Realtime event reader failed; retrying")
+                await asyncio.sleep(1)
+
+    def _deliver(self, queue: asyncio.Queue, data: str) -> None:
+        if queue.full():
+            # Too far behind: replace the backlog with the disconnect marker
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+            self.dropped += 1
+            return
+        queue.put_nowait(data)
+        self.delivered += 1
+
+    async def shutdown(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            await asyncio.gather(self._reader, return_exceptions=True)
+            self._reader = None
+        self._subscribers.clear()
+        await self.backend.close()
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "channels": len(self._subscribers),
+            "subscribers": sum(len(queues) for queues in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+def create_event_broker() -> EventBroker:
+    """Build the realtime event broker configured by ``REALTIME_BACKEND``."""
+    if settings.REALTIME_BACKEND == "redis":
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("REALTIME_BACKEND=redis requires the 'redis' package")
+        backend = RedisPubSubBackend(redis.from_url(settings.REDIS_URL))
+    else:
+        backend = MemoryPubSubBackend()
+    return EventBroker(backend, settings.REALTIME_QUEUE_SIZE)
+
+
+event_broker = create_event_broker()
@@ -1,23 +1,102 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Union
+from typing import Optional, Tuple, Union
+from uuid import UUID
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.cache import LRUCache
 from app.core.config import settings
+from app.models.user import Profile
+from app.schemas.user import ProfileResponse
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes made with other schemes or rounds are upgraded on the next login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+# Authenticated profiles by user id; short TTL bounds staleness across workers
+profile_cache = LRUCache(settings.PROFILE_CACHE_MAX_ENTRIES, settings.PROFILE_CACHE_TTL_SECONDS)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
+    """Verify a password against its hash.
+    
+    Blocks for the full bcrypt cost; request handlers use ``password_hasher``.
+    """
     return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    """Hash a password."""
+    """Hash a password.
+    
+    Blocks for the full bcrypt cost; request handlers use ``password_hasher``.
+    """
     return pwd_context.hash(password)
 
 
+class PasswordHasher:
+    """Runs bcrypt on a dedicated, size-limited thread pool.
+    
+    bcrypt is deliberately slow (~250ms) and would stall the event loop if
+    called inline. It releases the GIL, so a few threads hash in parallel.
+    Work beyond the pool waits in the executor queue; once that backlog
+    reaches ``max_queue`` new requests are rejected with 503 instead of
+    piling up behind it.
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int, max_queue: int):
+        self.context = context
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def queued(self) -> int:
+        return max(0, self.in_flight - self.max_workers)
+
+    async def _run(self, fn, *args):
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent sign-ins, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password; also returns a new hash when the stored one is outdated."""
+        return await self._run(self.context.verify_and_update, password, hashed_password)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "peak_in_flight": self.peak_in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(pwd_context, settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_MAX_QUEUE)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -61,9 +140,20 @@ def get_user_from_token(token: str) -> Optional[dict]:
     return {"id": user_id, "email": payload.get("email"), "role": payload.get("role")}
 
 
+async def get_cached_profile(db: AsyncSession, user_id: str) -> Optional[ProfileResponse]:
+    """Profile for an authenticated user id, served from ``profile_cache`` when fresh."""
+    key = str(user_id)
+    profile = profile_cache.get(key)
+    if profile is None:
+        result = await db.execute(select(Profile).where(Profile.id == UUID(key)))
+        row = result.scalar_one_or_none()
+        if row is None:
+            return None
+        profile = ProfileResponse.from_orm(row)
+        profile_cache.set(key, profile)
+    return profile
 
 
-
-
-
-
+def invalidate_cached_profile(user_id) -> None:
+    """Drop a user's cached profile after it changes."""
+    profile_cache.delete(str(user_id))
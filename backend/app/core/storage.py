@@ -0,0 +1,371 @@
+from abc import ABC, abstractmethod
+import base64
+import hashlib
+import hmac
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path, PurePosixPath
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import quote, urlencode
+import aiofiles
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+
+
+class PresignedRequest:
+    """An HTTP request a client may make directly against the store."""
+
+    def __init__(self, url: str, method: str = "GET", headers: Optional[Dict[str, str]] = None):
+        self.url = url
+        self.method = method
+        self.headers = headers or {}
+
+    def to_dict(self) -> dict:
+        return {"url": self.url, "method": self.method, "headers": self.headers}
+
+
+class StorageBackend(ABC):
+    """Object storage interface for uploaded content.
+
+    Keys are "/"-separated paths such as ``course-images/<uuid>.png`` or
+    ``.blobs/ab/<sha256>``. ``put`` takes ownership of a fully written
+    local file, so callers stage uploads on local scratch space first.
+    """
+
+    # True when keys are plain files under UPLOAD_DIR
+    is_local = False
+
+    @abstractmethod
+    async def put(self, key: str, source: Path, content_type: Optional[str] = None) -> None:
+        ...
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        ...
+
+    @abstractmethod
+    def stream(self, key: str, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str) -> None:
+        """Delete every object whose key starts with ``prefix`` (a "directory/")."""
+
+    @abstractmethod
+    async def size(self, key: str) -> Optional[int]:
+        """Size of an object in bytes, or None when it does not exist."""
+
+    async def exists(self, key: str) -> bool:
+        return await self.size(key) is not None
+
+    async def stored_sha256(self, key: str) -> Optional[str]:
+        """Hex SHA-256 the store verified on upload, if it keeps one."""
+        return None
+
+    @abstractmethod
+    def presign_put(
+        self,
+        key: str,
+        size: int,
+        sha256: str,
+        content_type: Optional[str] = None,
+        expires: Optional[int] = None,
+    ) -> PresignedRequest:
+        """A PUT the client can send itself; the store rejects other sizes or content."""
+
+    @abstractmethod
+    def presign_get(
+        self,
+        key: str,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+        expires: Optional[int] = None,
+    ) -> str:
+        ...
+
+
+class LocalStorageBackend(StorageBackend):
+    """Files under ``root`` (UPLOAD_DIR), the layout used before S3 support.
+
+    Presigned URLs point at the API's own /storage/local route and carry an
+    HMAC signature instead of credentials, standing in for an object store
+    in development.
+    """
+
+    is_local = True
+
+    def __init__(self, root: Path, url_prefix: str, secret: str):
+        self.root = Path(root)
+        self.url_prefix = url_prefix.rstrip("/")
+        self.secret = secret.encode()
+
+    def path(self, key: str) -> Path:
+        parts = PurePosixPath(key).parts
+        if not parts or key.startswith("/") or ".." in parts:
+            raise ValueError(f"Invalid storage key: {key!r}")
+        return self.root.joinpath(*parts)
+
+    async def put(self, key: str, source: Path, content_type: Optional[str] = None) -> None:
+        target = self.path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, target)
+
+    async def get(self, key: str) -> bytes:
+        async with aiofiles.open(self.path(key), "rb") as f:
+            return await f.read()
+
+    async def stream(self, key: str, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+        async with aiofiles.open(self.path(key), "rb") as f:
+            while data := await f.read(chunk_size):
+                yield data
+
+    async def delete(self, key: str) -> None:
+        self.path(key).unlink(missing_ok=True)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        await run_in_threadpool(shutil.rmtree, self.path(prefix.rstrip("/")), True)
+
+    async def size(self, key: str) -> Optional[int]:
+        try:
+            return (await run_in_threadpool(os.stat, self.path(key))).st_size
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+
+    async def link(self, source: str, target: str) -> None:
+        """Make ``target`` a hard link to ``source`` (a copy where links are unsupported)."""
+        source_path, target_path = self.path(source), self.path(target)
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(source_path, target_path)
+        except OSError:
+            shutil.copyfile(source_path, target_path)
+
+    async def receive(self, key: str, chunks: AsyncIterator[bytes], size: int, sha256: str) -> None:
+        """Write a presigned PUT body, enforcing its signed size and SHA-256.
+
+        Raises ValueError, leaving nothing behind, when the body differs.
+        """
+        target = self.path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Dot-prefixed, so never served while incomplete
+        partial = target.with_name(f".{uuid.uuid4().hex}.part")
+        digest = hashlib.sha256()
+        received = 0
+        try:
+            async with aiofiles.open(partial, "wb") as f:
+                async for data in chunks:
+                    received += len(data)
+                    if received > size:
+                        raise ValueError(f"Body exceeds the signed size of {size} bytes")
+                    digest.update(data)
+                    await f.write(data)
+            if received != size:
+                raise ValueError(f"Body must be {size} bytes, got {received}")
+            if digest.hexdigest() != sha256:
+                raise ValueError("Body does not match the signed sha256")
+            os.replace(partial, target)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+
+    def _signature(self, method: str, key: str, params: Dict[str, str]) -> str:
+        message = "\n".join([method, key] + [f"{name}={params[name]}" for name in sorted(params)])
+        return hmac.new(self.secret, message.encode(), hashlib.sha256).hexdigest()
+
+    def _signed_url(self, method: str, key: str, params: Dict[str, str], expires: Optional[int]) -> str:
+        params = {**params, "expires": str(int(time.time()) + (expires or settings.STORAGE_PRESIGN_EXPIRE_SECONDS))}
+        params["signature"] = self._signature(method, key, params)
+        return f"{self.url_prefix}/{quote(key)}?{urlencode(params)}"
+
+    def verify(self, method: str, key: str, params: Dict[str, str]) -> bool:
+        """Check a presigned URL's signature and expiry."""
+        params = dict(params)
+        signature = params.pop("signature", "")
+        try:
+            if int(params.get("expires", "0")) < time.time():
+                return False
+        except ValueError:
+            return False
+        return hmac.compare_digest(signature, self._signature(method, key, params))
+
+    def presign_put(
+        self,
+        key: str,
+        size: int,
+        sha256: str,
+        content_type: Optional[str] = None,
+        expires: Optional[int] = None,
+    ) -> PresignedRequest:
+        url = self._signed_url("PUT", key, {"size": str(size), "sha256": sha256}, expires)
+        headers = {"Content-Type": content_type} if content_type else {}
+        return PresignedRequest(url, "PUT", headers)
+
+    def presign_get(
+        self,
+        key: str,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+        expires: Optional[int] = None,
+    ) -> str:
+        params = {}
+        if filename:
+            params["filename"] = filename
+        if content_type:
+            params["content_type"] = content_type
+        return self._signed_url("GET", key, params, expires)
+
+
+class S3StorageBackend(StorageBackend):
+    """Objects in an S3-compatible bucket (AWS, MinIO, or moto in tests).
+
+    Takes a boto3 S3 client; boto3 is blocking, so calls run in the
+    threadpool. Presigned PUTs sign Content-Length and the SHA-256
+    checksum header, so the store itself refuses any other body.
+    """
+
+    def __init__(self, client, bucket: str, prefix: str = ""):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return self.prefix + key
+
+    @staticmethod
+    def _is_missing(error) -> bool:
+        return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    async def put(self, key: str, source: Path, content_type: Optional[str] = None) -> None:
+        extra_args = {"ContentType": content_type} if content_type else None
+        # upload_file switches to parallel multipart uploads for large files
+        await run_in_threadpool(
+            self.client.upload_file, str(source), self.bucket, self._key(key), ExtraArgs=extra_args
+        )
+        Path(source).unlink(missing_ok=True)
+
+    async def get(self, key: str) -> bytes:
+        response = await run_in_threadpool(self.client.get_object, Bucket=self.bucket, Key=self._key(key))
+        return await run_in_threadpool(response["Body"].read)
+
+    async def stream(self, key: str, chunk_size: int = 1024 * 1024) -> AsyncIterator[bytes]:
+        response = await run_in_threadpool(self.client.get_object, Bucket=self.bucket, Key=self._key(key))
+        body = response["Body"]
+        try:
+            while data := await run_in_threadpool(body.read, chunk_size):
+                yield data
+        finally:
+            body.close()
+
+    async def delete(self, key: str) -> None:
+        await run_in_threadpool(self.client.delete_object, Bucket=self.bucket, Key=self._key(key))
+
+    async def delete_prefix(self, prefix: str) -> None:
+        paginator = self.client.get_paginator("list_objects_v2")
+        pages = await run_in_threadpool(
+            lambda: list(paginator.paginate(Bucket=self.bucket, Prefix=self._key(prefix)))
+        )
+        for page in pages:
+            # Listing pages hold at most 1000 keys, delete_objects' limit
+            objects = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+            if objects:
+                await run_in_threadpool(
+                    self.client.delete_objects, Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True}
+                )
+
+    async def _head(self, key: str) -> Optional[dict]:
+        from botocore.exceptions import ClientError
+        try:
+            return await run_in_threadpool(
+                self.client.head_object, Bucket=self.bucket, Key=self._key(key), ChecksumMode="ENABLED"
+            )
+        except ClientError as e:
+            if self._is_missing(e):
+                return None
+            raise
+
+    async def size(self, key: str) -> Optional[int]:
+        head = await self._head(key)
+        return head["ContentLength"] if head is not None else None
+
+    async def stored_sha256(self, key: str) -> Optional[str]:
+        head = await self._head(key)
+        checksum = head.get("ChecksumSHA256") if head is not None else None
+        # Multipart objects carry a checksum of part checksums ("...-N")
+        if not checksum or "-" in checksum:
+            return None
+        return base64.b64decode(checksum).hex()
+
+    def presign_put(
+        self,
+        key: str,
+        size: int,
+        sha256: str,
+        content_type: Optional[str] = None,
+        expires: Optional[int] = None,
+    ) -> PresignedRequest:
+        checksum = base64.b64encode(bytes.fromhex(sha256)).decode()
+        params = {
+            "Bucket": self.bucket,
+            "Key": self._key(key),
+            "ContentLength": size,
+            "ChecksumSHA256": checksum,
+        }
+        headers = {"x-amz-checksum-sha256": checksum}
+        if content_type:
+            params["ContentType"] = content_type
+            headers["Content-Type"] = content_type
+        url = self.client.generate_presigned_url(
+            "put_object", Params=params, ExpiresIn=expires or settings.STORAGE_PRESIGN_EXPIRE_SECONDS
+        )
+        return PresignedRequest(url, "PUT", headers)
+
+    def presign_get(
+        self,
+        key: str,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+        expires: Optional[int] = None,
+    ) -> str:
+        params = {"Bucket": self.bucket, "Key": self._key(key)}
+        if filename:
+            params["ResponseContentDisposition"] = f"inline; filename*=UTF-8''{quote(filename)}"
+        if content_type:
+            params["ResponseContentType"] = content_type
+        return self.client.generate_presigned_url(
+            "get_object", Params=params, ExpiresIn=expires or settings.STORAGE_PRESIGN_EXPIRE_SECONDS
+        )
+
+
+def create_storage() -> StorageBackend:
+    """Build the storage backend selected by ``USE_S3``."""
+    if settings.USE_S3:
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError:
+            raise RuntimeError("USE_S3=true requires the 'boto3' package")
+        if not settings.AWS_BUCKET_NAME:
+            raise RuntimeError("USE_S3=true requires AWS_BUCKET_NAME")
+        client = boto3.client(
+            "s3",
+            endpoint_url=settings.AWS_ENDPOINT_URL,
+            region_name=settings.AWS_REGION,
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            # SigV4 so presigned PUTs can sign Content-Length and the checksum
+            config=Config(
+                signature_version="s3v4",
+                s3={"addressing_style": "path" if settings.AWS_ENDPOINT_URL else "auto"},
+            ),
+        )
+        return S3StorageBackend(client, settings.AWS_BUCKET_NAME, settings.AWS_S3_PREFIX)
+    return LocalStorageBackend(Path(settings.UPLOAD_DIR), settings.STORAGE_LOCAL_URL_PREFIX, settings.SECRET_KEY)
+
+
+storage = create_storage()
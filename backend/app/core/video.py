@@ -0,0 +1,168 @@
+import asyncio
+import json
+from collections import deque
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+from app.core.config import settings
+
+# Media types for HLS output; the platform's mimetypes tables often map
+# .ts to TypeScript or Qt translation files
+HLS_MEDIA_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+}
+
+
+class TranscodeError(Exception):
+    """ffprobe/ffmpeg failed or the input is not a usable video."""
+
+
+async def probe(path: Path) -> dict:
+    """Duration (seconds), dimensions and audio presence of a video, via ffprobe."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            settings.FFPROBE_PATH, "-v", "error", "-print_format", "json",
+            "-show_format", "-show_streams", str(path),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except FileNotFoundError:
+        raise TranscodeError(f"ffprobe not found at {settings.FFPROBE_PATH!r}")
+    stdout, stderr = await process.communicate()
+    if process.returncode:
+        raise TranscodeError(stderr.decode(errors="replace").strip()[-2000:] or "ffprobe failed")
+
+    info = json.loads(stdout or b"{}")
+    streams = info.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    if video is None:
+        raise TranscodeError("File has no video stream")
+    duration = info.get("format", {}).get("duration") or video.get("duration") or 0
+    return {
+        "duration": float(duration),
+        "width": int(video.get("width") or 0),
+        "height": int(video.get("height") or 0),
+        "has_audio": any(s.get("codec_type") == "audio" for s in streams),
+    }
+
+
+def parse_ladder(spec: str) -> List[Tuple[int, int]]:
+    """``"1080:5000,720:2800"`` -> [(height, video kbps), ...], tallest first."""
+    ladder = []
+    for rung in spec.split(","):
+        if rung.strip():
+            height, kbps = rung.split(":")
+            ladder.append((int(height), int(kbps)))
+    return sorted(ladder, reverse=True)
+
+
+def select_renditions(ladder: List[Tuple[int, int]], source_height: int) -> List[Tuple[int, int]]:
+    """Rungs no taller than the source; a smaller source gets one rung at its own height."""
+    renditions = [(height, kbps) for height, kbps in ladder if height <= source_height]
+    if not renditions:
+        lowest_kbps = ladder[-1][1]
+        # Even height, as libx264 requires
+        renditions = [(max(2, source_height - source_height % 2), lowest_kbps)]
+    return renditions
+
+
+def hls_command(
+    source: Path,
+    out_dir: Path,
+    renditions: List[Tuple[int, int]],
+    has_audio: bool,
+    segment_seconds: int,
+) -> List[str]:
+    """One ffmpeg run producing every rendition plus master.m3u8.
+
+    Keyframes are forced on segment boundaries so renditions switch
+    cleanly. Each rendition lands in ``<height>p/index.m3u8``.
+    """
+    count = len(renditions)
+    splits = "".join(f"[v{i}]" for i in range(count))
+    filters = [f"[0:v]split={count}{splits}"]
+    filters += [f"[v{i}]scale=-2:{height}[v{i}out]" for i, (height, _) in enumerate(renditions)]
+
+    command = [
+        settings.FFMPEG_PATH, "-hide_banner", "-nostats", "-y",
+        "-progress", "pipe:1",
+        "-i", str(source),
+        "-filter_complex", ";".join(filters),
+    ]
+    stream_map = []
+    for i, (height, kbps) in enumerate(renditions):
+        command += [
+            "-map", f"[v{i}out]",
+            f"-c:v:{i}", "libx264",
+            f"-b:v:{i}", f"{kbps}k",
+            f"-maxrate:v:{i}", f"{int(kbps * 1.07)}k",
+            f"-bufsize:v:{i}", f"{int(kbps * 1.5)}k",
+        ]
+        entry = f"v:{i},name:{height}p"
+        if has_audio:
+            command += ["-map", "0:a:0", f"-c:a:{i}", "aac", f"-b:a:{i}", "128k", "-ac", "2"]
+            entry = f"v:{i},a:{i},name:{height}p"
+        stream_map.append(entry)
+
+    command += [
+        "-preset", settings.VIDEO_X264_PRESET,
+        "-pix_fmt", "yuv420p",
+        "-sc_threshold", "0",
+        "-force_key_frames", f"expr:gte(t,n_forced*{segment_seconds})",
+        "-f", "hls",
+        "-hls_time", str(segment_seconds),
+        "-hls_playlist_type", "vod",
+        "-hls_flags", "independent_segments",
+        "-hls_segment_filename", str(out_dir / "%v" / "segment_%05d.ts"),
+        "-master_pl_name", "master.m3u8",
+        "-var_stream_map", " ".join(stream_map),
+        str(out_dir / "%v" / "index.m3u8"),
+    ]
+    return command
+
+
+async def transcode_hls(
+    source: Path,
+    out_dir: Path,
+    renditions: List[Tuple[int, int]],
+    has_audio: bool,
+    duration: float,
+    on_progress: Optional[Callable[[float], None]] = None,
+) -> None:
+    """Run ffmpeg, reporting progress (0..1) from its ``-progress`` output."""
+    command = hls_command(source, out_dir, renditions, has_audio, settings.VIDEO_HLS_SEGMENT_SECONDS)
+    for height, _ in renditions:
+        (out_dir / f"{height}p").mkdir(parents=True, exist_ok=True)
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except FileNotFoundError:
+        raise TranscodeError(f"ffmpeg not found at {settings.FFMPEG_PATH!r}")
+
+    # Drained concurrently so a chatty ffmpeg cannot fill the pipe and stall
+    stderr_tail: deque = deque(maxlen=40)
+
+    async def read_stderr():
+        async for line in process.stderr:
+            stderr_tail.append(line.decode(errors="replace").rstrip())
+
+    stderr_task = asyncio.create_task(read_stderr())
+    try:
+        async for line in process.stdout:
+            key, _, value = line.decode(errors="replace").strip().partition("=")
+            if key == "out_time_us" and duration > 0 and on_progress and value.isdigit():
+                on_progress(min(1.0, int(value) / 1_000_000 / duration))
+        returncode = await process.wait()
+        await stderr_task
+    except BaseException:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        stderr_task.cancel()
+        raise
+
+    if returncode:
+        raise TranscodeError("\n".join(stderr_tail) or f"ffmpeg exited with status {returncode}")
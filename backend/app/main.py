@@ -1,11 +1,18 @@
 from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
+from app.core.cache import response_cache
+from app.core.images import image_jobs
+from app.core.pubsub import event_broker
 from app.core.database import get_db
 from app.core.security import get_user_from_token
 from app.api.v1.api import api_router
+from app.api.v1.endpoints import media
+from app.api.v1.endpoints.files import file_too_large, max_upload_size
 import uvicorn
 import os
 
@@ -17,7 +24,66 @@ app = FastAPI(
     redoc_url="/redoc" if settings.DEBUG else None,
 )
 
-# CORS middleware
+# Multipart upload routes and the bucket whose size limit applies to them
+UPLOAD_ROUTE_BUCKETS = {
+    "/api/v1/files/upload/course-image": "course-images",
+    "/api/v1/files/upload/course-video": "course-videos",
+    "/api/v1/files/upload/course-content": "course-content",
+}
+# Allowance for multipart boundaries and part headers
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class UploadSizeLimitMiddleware:
+    """Refuse uploads over their bucket's size limit before they are spooled.
+    
+    Starlette's form parser writes the whole multipart body to a temporary
+    file before the endpoint runs, so the limit has to be enforced here.
+    A declared Content-Length over it is answered before any of the body is
+    read; otherwise (chunked, or an understated length) the body is counted
+    as it arrives and the request fails with 413 as soon as it passes the
+    limit. Plain ASGI so that other (e.g. streamed media) responses pass
+    through untouched.
+    """
+    
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        bucket = UPLOAD_ROUTE_BUCKETS.get(scope["path"]) if scope["type"] == "http" else None
+        if not bucket:
+            await self.app(scope, receive, send)
+            return
+        
+        limit = max_upload_size(bucket) + MULTIPART_OVERHEAD
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            response = JSONResponse(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                content={"detail": file_too_large(bucket).detail},
+            )
+            await response(scope, receive, send)
+            return
+        
+        received = 0
+        
+        async def receive_within_limit():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside the form parser; FastAPI passes HTTPException through
+                    raise file_too_large(bucket)
+            return message
+        
+        await self.app(scope, receive_within_limit, send)
+
+
+app.add_middleware(UploadSizeLimitMiddleware)
+
+# CORS middleware; added last so it is the outermost layer, and responses
+# from the middleware above (e.g. an early 413) carry CORS headers too
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.allowed_origins_list,
@@ -26,12 +92,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
-# Mount static files for uploaded content
-if os.path.exists(settings.UPLOAD_DIR):
-    app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
+# Uploaded content (ranges, conditional requests, sendfile); replaces the
+# StaticFiles mount, which also exposed the internal .blobs/.upload-sessions
+app.include_router(media.router, prefix="/uploads", tags=["media"])
+
+# Background image jobs: stop the consumers and worker processes
+@app.on_event("shutdown")
+async def stop_image_jobs():
+    await image_jobs.shutdown()
+
+# Realtime message events: stop the reader and close the pub/sub connection
+@app.on_event("shutdown")
+async def stop_event_broker():
+    await event_broker.shutdown()
 
 # Security scheme
 security = HTTPBearer()
@@ -42,6 +119,18 @@ async def health_check():
     return {"status": "healthy", "environment": settings.ENVIRONMENT}
 
 
+# Response cache hit/miss counters (per process for the memory backend)
+@app.get("/cache/stats")
+async def cache_stats():
+    return response_cache.stats()
+
+
+# Realtime event counters and open message sockets (per process)
+@app.get("/realtime/stats")
+async def realtime_stats():
+    return event_broker.stats()
+
+
 # Protected endpoint example
 @app.get("/protected")
 def protected_route(credentials: HTTPAuthorizationCredentials = Depends(security)):
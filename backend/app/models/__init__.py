@@ -5,14 +5,16 @@ from .assignment import Assignment, Submission
 from .discussion import Discussion, DiscussionPost
 from .certificate import Certificate
 from .notification import Notification
-from .message import Message, InstructorMessage
+from .message import Message, Conversation, InstructorMessage
+from .file import FileBlob, StoredFile, ImageVariant, VideoJob, FileReference, StorageUsage
 
 __all__ = [
     "User", "Profile", "Course", "Module", "Lesson", "Enrollment", 
     "LessonProgress", "UserProgress", "Lecture", "LectureProgress", "Quiz", "Question", "Answer", 
     "QuizAttempt", "QuizResponse", "Assignment", "Submission",
     "Discussion", "DiscussionPost", "Certificate", "Notification",
-    "Message", "InstructorMessage"
+    "Message", "Conversation", "InstructorMessage", "FileBlob", "StoredFile", "ImageVariant", "VideoJob",
+    "FileReference", "StorageUsage"
 ]
 
 
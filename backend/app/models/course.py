@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, DateTime, Integer, Boolean, Text, ForeignKey, Float
-from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy import Column, String, DateTime, Integer, Boolean, Text, ForeignKey, Float, Index, JSON
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.sql import func, text
 from app.core.types import UUID
 import uuid
 import enum
@@ -42,10 +42,19 @@ class Course(Base):
     long_description = Column(Text, nullable=True)
     status = Column(String, nullable=True)  # Using string for flexibility
     image_url = Column(String, nullable=True)
+    # Responsive copies of image_url ([{url, width, height, format}]), kept
+    # in step by the image pipeline so catalog reads need no join
+    image_variants = Column(JSON, nullable=True)
     category = Column(String, nullable=True)
     level = Column(String, nullable=True)
     is_featured = Column(Boolean, default=False)
     author_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id"), nullable=True)
+    # Denormalized counters, maintained by the module/lesson write endpoints
+    # (repair with tools/backfill_course_counters.py)
+    module_count = Column(Integer, nullable=False, default=0, server_default="0")
+    lesson_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped on every UPDATE; feeds the ETag of course responses
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -54,6 +63,14 @@ class Course(Base):
     modules = relationship("Module", back_populates="course", cascade="all, delete-orphan")
     enrollments = relationship("Enrollment", back_populates="course")
     discussions = relationship("Discussion", back_populates="course")
+    
+    # Keyset pagination indexes: catalog is ordered by (created_at, id),
+    # optionally filtered by category or featured flag
+    __table_args__ = (
+        Index("ix_courses_created_at_id", "created_at", "id"),
+        Index("ix_courses_category_created_at_id", "category", "created_at", "id"),
+        Index("ix_courses_is_featured_created_at_id", "is_featured", "created_at", "id"),
+    )
 
 
 class Module(Base):
@@ -64,6 +81,7 @@ class Module(Base):
     description = Column(Text, nullable=True)
     sequence_order = Column(Integer, nullable=True)
     course_id = Column(UUID(as_uuid=True), ForeignKey("courses.id"), nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -82,6 +100,8 @@ class Lesson(Base):
     
     # Content URLs and files
     video_url = Column(String, nullable=True)
+    # Adaptive-bitrate stream of video_url, set once its transcode finishes
+    hls_url = Column(String, nullable=True)
     pdf_url = Column(String, nullable=True)
     slides_url = Column(String, nullable=True)
     audio_url = Column(String, nullable=True)
@@ -90,10 +110,11 @@ class Lesson(Base):
     # Column is named 'download_url' in DB, expose as 'downloadable_url' in ORM
     downloadable_url = Column('download_url', String, nullable=True)
     
-    # Content metadata
-    content = Column(Text, nullable=True)  # For document/text content
-    transcript = Column(Text, nullable=True)  # For video/audio transcripts
-    notes = Column(Text, nullable=True)
+    # Content metadata. Large text bodies are deferred (group "body") so
+    # listings don't pull them; undefer_group("body") loads them on demand.
+    content = deferred(Column(Text, nullable=True), group="body")  # For document/text content
+    transcript = deferred(Column(Text, nullable=True), group="body")  # For video/audio transcripts
+    notes = deferred(Column(Text, nullable=True), group="body")
     
     # Content properties
     duration = Column(Integer, nullable=True)  # Duration in minutes
@@ -102,7 +123,7 @@ class Lesson(Base):
     reading_time = Column(Integer, nullable=True)  # For text content in minutes
     file_size = Column(String, nullable=True)  # For downloadable files
     file_type = Column(String, nullable=True)  # File extension/type
-    completion_criteria = Column(Text, nullable=True)  # For interactive content
+    completion_criteria = deferred(Column(Text, nullable=True), group="body")  # For interactive content
     
     # Lesson settings
     sequence_order = Column(Integer, nullable=True)
@@ -110,6 +131,7 @@ class Lesson(Base):
     
     # Relationships
     module_id = Column(UUID(as_uuid=True), ForeignKey("modules.id"), nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=text("version + 1"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -123,6 +145,10 @@ class Lesson(Base):
 
 class Enrollment(Base):
     __tablename__ = "enrollments"
+    __table_args__ = (
+        # A course's enrollees (broadcasts, cohort listings)
+        Index("ix_enrollments_course_id_user_id", "course_id", "user_id"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id"), nullable=True)
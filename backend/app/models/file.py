@@ -0,0 +1,168 @@
+from sqlalchemy import Column, String, DateTime, Integer, BigInteger, Float, Text, ForeignKey, UniqueConstraint, Index
+from app.core.types import UUID
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+import enum
+import uuid
+from app.core.database import Base
+
+
+class FileBlob(Base):
+    """Unique upload content, stored once under its SHA-256."""
+    __tablename__ = "file_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(BigInteger, nullable=False)
+    # Number of stored files pointing at this blob; the blob is removed at zero
+    ref_count = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    files = relationship("StoredFile", back_populates="blob")
+    variants = relationship("ImageVariant", back_populates="source")
+    video_job = relationship("VideoJob", back_populates="source", uselist=False)
+
+
+class StoredFile(Base):
+    """A logical uploaded file (/uploads/<bucket>/<filename>) backed by a blob."""
+    __tablename__ = "stored_files"
+    __table_args__ = (
+        UniqueConstraint("bucket", "filename", name="uq_stored_files_bucket_filename"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    bucket = Column(String, nullable=False)
+    filename = Column(String, nullable=False)
+    blob_sha256 = Column(String(64), ForeignKey("file_blobs.sha256"), nullable=False, index=True)
+    original_filename = Column(String, nullable=True)
+    content_type = Column(String, nullable=True)
+    owner_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    blob = relationship("FileBlob", back_populates="files")
+    references = relationship("FileReference", back_populates="file", passive_deletes=True)
+
+
+class FileReference(Base):
+    """A course or lesson field pointing at an uploaded file.
+
+    Maintained by the course/lesson write endpoints (repair with
+    tools/rebuild_file_index.py). Files nothing references are what the
+    storage garbage collector removes.
+    """
+    __tablename__ = "file_references"
+    __table_args__ = (
+        UniqueConstraint("stored_file_id", "referrer_id", "field", name="uq_file_references_file_referrer_field"),
+        Index("ix_file_references_referrer_id", "referrer_id"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    stored_file_id = Column(UUID(as_uuid=True), ForeignKey("stored_files.id", ondelete="CASCADE"), nullable=False)
+    referrer_type = Column(String(16), nullable=False)  # "course" or "lesson"
+    referrer_id = Column(UUID(as_uuid=True), nullable=False)
+    field = Column(String(32), nullable=False)  # e.g. "image_url", "video_url"
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    file = relationship("StoredFile", back_populates="references")
+
+    def to_dict(self) -> dict:
+        return {"type": self.referrer_type, "id": str(self.referrer_id), "field": self.field}
+
+
+class StorageUsage(Base):
+    """Running file count and byte total per bucket, kept at write time.
+
+    Besides the upload buckets there are rows for the derived buckets and
+    for ".blobs", the bytes actually stored once deduplicated. In
+    course-video-hls a "file" is one video's whole ladder.
+    """
+    __tablename__ = "storage_usage"
+
+    bucket = Column(String, primary_key=True)
+    file_count = Column(BigInteger, nullable=False, default=0, server_default="0")
+    total_bytes = Column(BigInteger, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class ImageVariant(Base):
+    """A resized, re-encoded copy of an uploaded image blob.
+
+    Stored at course-image-variants/<source sha256>-<width>.<format>, so
+    every file sharing the blob shares its variants.
+    """
+    __tablename__ = "image_variants"
+    __table_args__ = (
+        UniqueConstraint("source_sha256", "width", "format", name="uq_image_variants_source_width_format"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    source_sha256 = Column(String(64), ForeignKey("file_blobs.sha256"), nullable=False, index=True)
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    format = Column(String(16), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    source = relationship("FileBlob", back_populates="variants")
+
+    @property
+    def filename(self) -> str:
+        return f"{self.source_sha256}-{self.width}.{self.format}"
+
+    def to_dict(self) -> dict:
+        return {
+            "url": f"/uploads/course-image-variants/{self.filename}",
+            "width": self.width,
+            "height": self.height,
+            "format": self.format,
+        }
+
+
+class VideoJobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class VideoJob(Base):
+    """HLS transcode of an uploaded video blob, run by video_worker.py.
+
+    Output goes to course-video-hls/<source sha256>/ (master.m3u8 plus one
+    directory per rendition). A worker owns a running job until
+    ``locked_until``; an expired lease (crashed worker) makes it claimable
+    again, and failures are retried after ``run_after`` until
+    VIDEO_JOB_MAX_ATTEMPTS is reached.
+    """
+    __tablename__ = "video_jobs"
+    __table_args__ = (
+        Index("ix_video_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    source_sha256 = Column(String(64), ForeignKey("file_blobs.sha256"), nullable=False, unique=True)
+    status = Column(String(16), nullable=False, default=VideoJobStatus.QUEUED.value, server_default="queued")
+    progress = Column(Float, nullable=False, default=0.0, server_default="0")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(Text, nullable=True)
+    # Filled in on success
+    duration_seconds = Column(Float, nullable=True)
+    renditions = Column(String, nullable=True)  # e.g. "1080p,720p,480p"
+    output_size = Column(BigInteger, nullable=True)  # Bytes of HLS output
+    # Scheduling
+    run_after = Column(DateTime(timezone=True), server_default=func.now())
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    worker_id = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    source = relationship("FileBlob", back_populates="video_job")
+
+    @property
+    def hls_url(self) -> str:
+        return f"/uploads/course-video-hls/{self.source_sha256}/master.m3u8"
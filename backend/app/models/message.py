@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Column, DDL, String, DateTime, Boolean, Integer, Text, ForeignKey, Index, UniqueConstraint, event, text
 from app.core.types import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -8,6 +8,12 @@ from app.core.database import Base
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # One direction of a conversation in keyset order (history pages);
+        # received messages and unread counts
+        Index("ix_messages_sender_recipient_created_at_id", "sender_id", "recipient_id", "created_at", "id"),
+        Index("ix_messages_recipient_is_read", "recipient_id", "is_read"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     sender_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id"), nullable=False)
@@ -22,6 +28,80 @@ class Message(Base):
     recipient = relationship("Profile", foreign_keys=[recipient_id], back_populates="messages_received")
 
 
+
+# Full-text search over message content. PostgreSQL indexes the tsvector
+# expression with GIN; SQLite keeps an FTS5 table in step through triggers.
+# Both are maintained by the database as messages are written.
+MESSAGE_SEARCH_CONFIG = "english"
+
+
+def search_config():
+    """The text search configuration as an inline constant.
+    
+    Queries must repeat the index expression exactly, so it cannot be a
+    bound parameter.
+    """
+    return text(f"'{MESSAGE_SEARCH_CONFIG}'")
+
+
+Index(
+    "ix_messages_content_search",
+    func.to_tsvector(search_config(), Message.__table__.c.content),
+    postgresql_using="gin",
+).ddl_if(dialect="postgresql")
+
+MESSAGE_SEARCH_SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5("
+    "content, content='messages', content_rowid='rowid', tokenize='porter unicode61')",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN "
+    "INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content); END",
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN "
+    "INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.rowid, old.content); END",
+    # Only content changes touch the index; marking messages read does not
+    "CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE OF content ON messages BEGIN "
+    "INSERT INTO messages_fts(messages_fts, rowid, content) VALUES ('delete', old.rowid, old.content); "
+    "INSERT INTO messages_fts(rowid, content) VALUES (new.rowid, new.content); END",
+]
+
+for statement in MESSAGE_SEARCH_SQLITE_DDL:
+    event.listen(Message.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+event.listen(Message.__table__, "before_drop", DDL("DROP TABLE IF EXISTS messages_fts").execute_if(dialect="sqlite"))
+
+class Conversation(Base):
+    """Inbox summary of the messages between two users, one row per pair.
+
+    ``user_a_id`` is the smaller of the two ids. Maintained by the message
+    endpoints in the same transaction as the messages themselves (rebuild
+    with tools/rebuild_conversations.py), so the inbox is read from here
+    rather than aggregated over ``messages``.
+    """
+    __tablename__ = "conversations"
+    __table_args__ = (
+        UniqueConstraint("user_a_id", "user_b_id", name="uq_conversations_pair"),
+        # Inbox order for either participant
+        Index("ix_conversations_user_a_last_message", "user_a_id", "last_message_at", "id"),
+        Index("ix_conversations_user_b_last_message", "user_b_id", "last_message_at", "id"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_a_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id"), nullable=False)
+    user_b_id = Column(UUID(as_uuid=True), ForeignKey("profiles.id"), nullable=False)
+    last_message_id = Column(UUID(as_uuid=True), ForeignKey("messages.id", ondelete="SET NULL"), nullable=True)
+    last_message_preview = Column(String, nullable=True)
+    last_message_at = Column(DateTime(timezone=True), nullable=True)
+    last_sender_id = Column(UUID(as_uuid=True), nullable=True)
+    # Messages each participant has not read yet
+    unread_a = Column(Integer, nullable=False, default=0, server_default="0")
+    unread_b = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    @staticmethod
+    def pair(user_id, other_id):
+        """(user_a_id, user_b_id) for two users, in stored order."""
+        return (user_id, other_id) if user_id <= other_id else (other_id, user_id)
+
+
 class InstructorMessage(Base):
     __tablename__ = "instructor_messages"
     
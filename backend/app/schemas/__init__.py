@@ -1,7 +1,7 @@
 from .user import UserCreate, UserLogin, UserResponse, ProfileCreate, ProfileUpdate, ProfileResponse
 from .course import (
     CourseCreate, CourseUpdate, CourseResponse, ModuleCreate, ModuleUpdate, ModuleResponse,
-    LessonCreate, LessonUpdate, LessonResponse, EnrollmentCreate, EnrollmentResponse
+    LessonCreate, LessonUpdate, LessonResponse, LessonSummary, EnrollmentCreate, EnrollmentResponse
 )
 from .quiz import (
     QuizCreate, QuizUpdate, QuizResponse, QuestionCreate, QuestionUpdate, QuestionResponse,
@@ -11,7 +11,7 @@ from .quiz import (
 __all__ = [
     "UserCreate", "UserLogin", "UserResponse", "ProfileCreate", "ProfileUpdate", "ProfileResponse",
     "CourseCreate", "CourseUpdate", "CourseResponse", "ModuleCreate", "ModuleUpdate", "ModuleResponse",
-    "LessonCreate", "LessonUpdate", "LessonResponse", "EnrollmentCreate", "EnrollmentResponse",
+    "LessonCreate", "LessonUpdate", "LessonResponse", "LessonSummary", "EnrollmentCreate", "EnrollmentResponse",
     "QuizCreate", "QuizUpdate", "QuizResponse", "QuestionCreate", "QuestionUpdate", "QuestionResponse",
     "AnswerCreate", "AnswerUpdate", "AnswerResponse", "QuizAttemptCreate", "QuizAttemptResponse"
 ]
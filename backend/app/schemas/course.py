@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Union
 from datetime import datetime
 from uuid import UUID
 
@@ -24,6 +24,13 @@ class CourseUpdate(BaseModel):
     is_featured: Optional[bool] = None
 
 
+class ImageVariantResponse(BaseModel):
+    url: str
+    width: int
+    height: int
+    format: str  # "avif" or "webp"
+
+
 class CourseResponse(BaseModel):
     id: UUID
     title: str
@@ -31,6 +38,8 @@ class CourseResponse(BaseModel):
     long_description: Optional[str]
     status: Optional[str]
     image_url: Optional[str]
+    # Resized copies of image_url for srcset, once generated
+    image_variants: Optional[List[ImageVariantResponse]] = None
     category: Optional[str]
     level: Optional[str]
     is_featured: bool
@@ -45,6 +54,12 @@ class CourseResponse(BaseModel):
         from_attributes = True
 
 
+class CoursePage(BaseModel):
+    items: List[CourseResponse]
+    # Opaque cursor for the next page; None when this is the last page
+    next_cursor: Optional[str] = None
+
+
 class ModuleCreate(BaseModel):
     title: str
     description: Optional[str] = None
@@ -130,22 +145,22 @@ class LessonUpdate(BaseModel):
     completion_criteria: Optional[str] = None
 
 
-class LessonResponse(BaseModel):
+class LessonSummary(BaseModel):
+    """Lesson without its large text bodies (content, transcript, notes, criteria)."""
     id: UUID
     title: Optional[str]
     description: Optional[str]
     content_type: Optional[str]
     # Content URLs for different types
     video_url: Optional[str]
+    # HLS master playlist for video_url, once transcoded
+    hls_url: Optional[str] = None
     pdf_url: Optional[str]
     slides_url: Optional[str]
     audio_url: Optional[str]
     document_url: Optional[str]
     interactive_url: Optional[str]
     downloadable_url: Optional[str]
-    # Content metadata
-    content: Optional[str]
-    transcript: Optional[str]
     # Content properties
     duration: Optional[int]
     page_count: Optional[int]
@@ -156,8 +171,6 @@ class LessonResponse(BaseModel):
     # Lesson properties
     sequence_order: Optional[int]
     is_preview: bool
-    notes: Optional[str]
-    completion_criteria: Optional[str]
     module_id: Optional[UUID]
     created_at: datetime
     updated_at: Optional[datetime]
@@ -166,6 +179,30 @@ class LessonResponse(BaseModel):
         from_attributes = True
 
 
+class LessonResponse(LessonSummary):
+    # Content metadata
+    content: Optional[str]
+    transcript: Optional[str]
+    notes: Optional[str]
+    completion_criteria: Optional[str]
+
+
+# Full course tree (course -> ordered modules -> ordered lessons)
+class ModuleTreeResponse(ModuleResponse):
+    lessons: List[Union[LessonResponse, LessonSummary]] = []
+
+
+class CourseTreeResponse(CourseResponse):
+    modules: List[ModuleTreeResponse] = []
+
+
+# Bulk import: a course document with nested modules and lessons
+class ModuleImport(ModuleCreate):
+    lessons: List[LessonCreate] = []
+
+
+class CourseImport(CourseCreate):
+    modules: List[ModuleImport] = []
 
 
 class EnrollmentCreate(BaseModel):
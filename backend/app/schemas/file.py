@@ -0,0 +1,115 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import datetime
+from uuid import UUID
+
+
+# Resumable (chunked) uploads
+class UploadSessionCreate(BaseModel):
+    filename: str
+    size: int  # Total file size in bytes
+    bucket: str = "course-videos"
+    content_type: Optional[str] = None
+    chunk_size: Optional[int] = None  # Defaults to UPLOAD_SESSION_CHUNK_SIZE
+    sha256: Optional[str] = None  # Expected hex digest of the whole file
+
+
+class UploadSessionResponse(BaseModel):
+    upload_id: str
+    filename: str
+    bucket: str
+    size: int
+    chunk_size: int
+    total_chunks: int
+    received_chunks: List[int]
+    # Contiguous [start, end) byte ranges already stored
+    received_ranges: List[List[int]]
+    missing_chunks: List[int]
+    created_at: datetime
+
+
+class UploadComplete(BaseModel):
+    sha256: Optional[str] = None
+
+
+# Deduplicated upload of content the server already stores
+class UploadByHash(BaseModel):
+    sha256: str
+    filename: str
+    bucket: str = "course-content"
+    content_type: Optional[str] = None
+
+
+# Direct uploads to the object store through a presigned URL
+class DirectUploadCreate(BaseModel):
+    filename: str
+    size: int  # Total file size in bytes
+    sha256: str  # Hex digest of the whole file; the store checks it
+    bucket: str = "course-videos"
+    content_type: Optional[str] = None
+
+
+class DirectUploadResponse(BaseModel):
+    # Set when the user already uploaded this content: nothing to upload
+    file_path: Optional[str] = None
+    # Otherwise send the file as described, then POST the token to complete
+    upload_token: Optional[str] = None
+    url: Optional[str] = None
+    method: Optional[str] = None
+    headers: Dict[str, str] = {}
+    expires_in: Optional[int] = None
+
+
+class DirectUploadComplete(BaseModel):
+    upload_token: str
+
+
+# HLS transcode of an uploaded video
+class VideoJobResponse(BaseModel):
+    id: UUID
+    source_sha256: str
+    status: str  # queued, running, succeeded or failed
+    progress: float  # 0..1 within the current attempt
+    attempts: int
+    max_attempts: int
+    error: Optional[str] = None
+    duration_seconds: Optional[float] = None
+    renditions: List[str] = []
+    # Master playlist, once the job has succeeded
+    hls_url: Optional[str] = None
+    run_after: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+# File index: uploaded files with their size, content hash, owner and the
+# courses/lessons that use them
+class FileReferenceResponse(BaseModel):
+    type: str  # "course" or "lesson"
+    id: UUID
+    field: str
+
+
+class StoredFileResponse(BaseModel):
+    id: UUID
+    path: str  # /uploads/<bucket>/<filename>
+    bucket: str
+    filename: str
+    original_filename: Optional[str] = None
+    content_type: Optional[str] = None
+    size: int
+    sha256: str
+    owner_id: Optional[UUID] = None
+    created_at: Optional[datetime] = None
+    referenced_by: List[FileReferenceResponse] = []
+
+
+class StoredFilePage(BaseModel):
+    items: List[StoredFileResponse]
+    next_cursor: Optional[str] = None
+
+
+class BucketUsage(BaseModel):
+    files: int
+    bytes: int
@@ -30,5 +30,44 @@ class ContactResponse(BaseModel):
     unread_count: int = 0
 
 
+class ContactPage(BaseModel):
+    items: List[ContactResponse]
+    next_cursor: Optional[str] = None
+
+
+class MessageSearchPage(BaseModel):
+    items: List[MessageResponse]
+    # Pass back as ``skip`` for the next page of results
+    next_skip: Optional[int] = None
+
+
 class ConversationResponse(BaseModel):
-    messages: List[MessageResponse]
\ No newline at end of file
+    messages: List[MessageResponse]
+    next_cursor: Optional[str] = None
+
+
+class BroadcastCreate(BaseModel):
+    course_id: UUID
+    content: str
+    # With a title the broadcast is also stored as a course InstructorMessage
+    title: Optional[str] = None
+    is_announcement: bool = True
+
+
+class BroadcastResponse(BaseModel):
+    recipients: int
+    queued: bool
+    announcement_id: Optional[UUID] = None
+
+
+class InstructorMessageResponse(BaseModel):
+    id: UUID
+    instructor_id: UUID
+    course_id: UUID
+    title: str
+    content: str
+    is_announcement: bool
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
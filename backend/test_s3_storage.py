@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+S3StorageBackend and the direct-upload flow against moto's in-process S3.
+
+Usage:
+    pytest test_s3_storage.py
+    python test_s3_storage.py
+"""
+import asyncio
+import hashlib
+import os
+import sys
+import tempfile
+import uuid
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Configured before the app is imported: SQLite scratch database, S3 storage
+WORK_DIR = tempfile.mkdtemp()
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{WORK_DIR}/test.db",
+    UPLOAD_DIR=f"{WORK_DIR}/uploads",
+    USE_S3="true",
+    AWS_BUCKET_NAME="vlms-test",
+    AWS_ACCESS_KEY_ID="testing",
+    AWS_SECRET_ACCESS_KEY="testing",
+    AWS_S3_PREFIX="uploads/",
+    DEBUG="false",
+)
+
+import httpx
+import requests
+from moto import mock_aws
+from sqlalchemy.orm import Session
+
+s3_mock = mock_aws()
+s3_mock.start()
+
+from app.core.database import Base, engine
+from app.core.storage import S3StorageBackend, storage
+from app.main import app
+from app.models.file import FileBlob, StoredFile
+from app.models.user import Profile
+from app.api.v1.endpoints.files import blob_key
+from app.api.v1.endpoints.simple_auth import get_current_user
+
+storage.client.create_bucket(Bucket="vlms-test")
+Base.metadata.create_all(engine)
+
+USER_ID, OTHER_USER_ID = uuid.uuid4(), uuid.uuid4()
+with Session(engine) as db:
+    db.add(Profile(id=USER_ID, email="s3-test@example.com", name="S3 Test", role="creator"))
+    db.add(Profile(id=OTHER_USER_ID, email="s3-other@example.com", name="S3 Other", role="creator"))
+    db.commit()
+
+
+class CurrentUser:
+    id = USER_ID
+    role = "creator"
+
+
+app.dependency_overrides[get_current_user] = lambda: CurrentUser()
+
+
+class acting_as:
+    """Make requests as another user for the duration of a with block."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+
+    def __enter__(self):
+        CurrentUser.id = self.user_id
+
+    def __exit__(self, *exc_info):
+        CurrentUser.id = USER_ID
+
+
+def object_keys(prefix: str = "") -> list:
+    listing = storage.client.list_objects_v2(Bucket="vlms-test", Prefix="uploads/" + prefix)
+    return sorted(item["Key"] for item in listing.get("Contents", []))
+
+
+def staged(data: bytes) -> Path:
+    path = Path(WORK_DIR) / uuid.uuid4().hex
+    path.write_bytes(data)
+    return path
+
+
+def test_backend_is_s3():
+    assert isinstance(storage, S3StorageBackend)
+
+
+def test_put_get_stream_delete():
+    data = os.urandom(3 * 1024 * 1024 + 7)
+    source = staged(data)
+    asyncio.run(storage.put("course-content/a.bin", source, "application/octet-stream"))
+
+    assert not source.exists()
+    assert asyncio.run(storage.size("course-content/a.bin")) == len(data)
+    assert asyncio.run(storage.exists("course-content/a.bin"))
+    assert asyncio.run(storage.get("course-content/a.bin")) == data
+
+    async def read_stream():
+        return b"".join([chunk async for chunk in storage.stream("course-content/a.bin", 1024 * 1024)])
+    assert asyncio.run(read_stream()) == data
+
+    asyncio.run(storage.delete("course-content/a.bin"))
+    assert asyncio.run(storage.size("course-content/a.bin")) is None
+    assert not asyncio.run(storage.exists("course-content/a.bin"))
+
+
+def test_stored_sha256_without_checksum():
+    # moto keeps no checksum for objects put without one
+    asyncio.run(storage.put("course-content/plain.txt", staged(b"plain"), "text/plain"))
+    assert asyncio.run(storage.stored_sha256("course-content/plain.txt")) is None
+    assert asyncio.run(storage.stored_sha256("course-content/missing.txt")) is None
+
+
+def test_delete_prefix():
+    for name in ("hls/abc/index.m3u8", "hls/abc/720p/0.ts", "hls/abc/720p/1.ts", "hls/abd/index.m3u8"):
+        asyncio.run(storage.put(name, staged(name.encode())))
+    asyncio.run(storage.delete_prefix("hls/abc/"))
+    assert object_keys("hls/") == ["uploads/hls/abd/index.m3u8"]
+
+
+def test_presign_get():
+    asyncio.run(storage.put("course-images/p.png", staged(b"png bytes"), "image/png"))
+    url = storage.presign_get("course-images/p.png", filename="photo one.png", content_type="image/png")
+    response = requests.get(url)
+    assert response.status_code == 200
+    assert response.content == b"png bytes"
+    assert response.headers["Content-Type"] == "image/png"
+
+
+def test_presign_put_signs_size_and_checksum():
+    data = b"presigned body"
+    sha256 = hashlib.sha256(data).hexdigest()
+    request = storage.presign_put("course-content/put.txt", len(data), sha256, "text/plain")
+
+    assert request.method == "PUT"
+    assert request.headers["Content-Type"] == "text/plain"
+    assert "x-amz-checksum-sha256" in request.headers
+    assert "content-length" in request.url.lower()
+    response = requests.put(request.url, data=data, headers=request.headers)
+    assert response.status_code == 200
+    assert asyncio.run(storage.get("course-content/put.txt")) == data
+
+
+async def direct_upload(client: httpx.AsyncClient, data: bytes, sha256: str, filename: str = "lecture.mp4"):
+    response = await client.post("/api/v1/files/direct-uploads", json={
+        "filename": filename,
+        "size": len(data),
+        "sha256": sha256,
+        "bucket": "course-videos",
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_direct_upload_flow():
+    data = os.urandom(256 * 1024)
+    sha256 = hashlib.sha256(data).hexdigest()
+
+    async def flow():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            upload = await direct_upload(client, data, sha256)
+            assert upload["file_path"] is None
+            assert upload["method"] == "PUT"
+
+            response = await client.post("/api/v1/files/direct-uploads/complete",
+                                         json={"upload_token": upload["upload_token"]})
+            assert response.status_code == 409, response.text
+
+            # The client sends the bytes straight to the store
+            put = requests.put(upload["url"], data=data, headers=upload["headers"])
+            assert put.status_code == 200
+
+            response = await client.post("/api/v1/files/direct-uploads/complete",
+                                         json={"upload_token": upload["upload_token"]})
+            assert response.status_code == 200, response.text
+            return response.json()
+
+    completed = asyncio.run(flow())
+    assert completed["sha256"] == sha256
+    assert completed["size"] == len(data)
+    assert completed["file_path"].startswith("/uploads/course-videos/")
+    assert asyncio.run(storage.get(blob_key(sha256))) == data
+    with Session(engine) as db:
+        assert db.get(FileBlob, sha256).ref_count == 1
+        stored = db.query(StoredFile).filter_by(blob_sha256=sha256).one()
+        assert stored.owner_id == USER_ID
+
+
+def test_hash_dedup_is_limited_to_own_uploads():
+    data = os.urandom(32 * 1024)
+    sha256 = hashlib.sha256(data).hexdigest()
+
+    async def flow():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            upload = await direct_upload(client, data, sha256)
+            assert requests.put(upload["url"], data=data, headers=upload["headers"]).status_code == 200
+            response = await client.post("/api/v1/files/direct-uploads/complete",
+                                         json={"upload_token": upload["upload_token"]})
+            assert response.status_code == 200, response.text
+
+            # The uploader re-uses their content by hash, without sending it
+            again = await direct_upload(client, data, sha256, "again.mp4")
+            assert again["file_path"] is not None and again["upload_token"] is None
+            by_hash = await client.post("/api/v1/files/upload/by-hash",
+                                        json={"sha256": sha256, "filename": "notes.pdf"})
+            assert by_hash.status_code == 200, by_hash.text
+
+            # Anyone else knowing the hash learns nothing and has to send the bytes
+            with acting_as(OTHER_USER_ID):
+                by_hash = await client.post("/api/v1/files/upload/by-hash",
+                                            json={"sha256": sha256, "filename": "notes.pdf"})
+                assert by_hash.status_code == 404
+                upload = await direct_upload(client, data, sha256)
+                assert upload["file_path"] is None and upload["upload_token"]
+                assert requests.put(upload["url"], data=data, headers=upload["headers"]).status_code == 200
+                response = await client.post("/api/v1/files/direct-uploads/complete",
+                                             json={"upload_token": upload["upload_token"]})
+                assert response.status_code == 200, response.text
+
+    asyncio.run(flow())
+    with Session(engine) as db:
+        # Still one blob, referenced by all four files
+        assert db.get(FileBlob, sha256).ref_count == 4
+        owners = [file.owner_id for file in db.query(StoredFile).filter_by(blob_sha256=sha256)]
+        assert sorted(map(str, owners)) == sorted(map(str, [USER_ID] * 3 + [OTHER_USER_ID]))
+
+
+def test_direct_upload_rejects_other_content():
+    data = os.urandom(64 * 1024)
+    sha256 = hashlib.sha256(data).hexdigest()
+
+    async def flow():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            upload = await direct_upload(client, data, sha256)
+            # moto does not enforce the signed checksum, so completion has to
+            put = requests.put(upload["url"], data=os.urandom(len(data)), headers=upload["headers"])
+            assert put.status_code == 200
+            return await client.post("/api/v1/files/direct-uploads/complete",
+                                     json={"upload_token": upload["upload_token"]})
+
+    response = asyncio.run(flow())
+    assert response.status_code == 422, response.text
+    assert asyncio.run(storage.size(blob_key(sha256))) is None
+    with Session(engine) as db:
+        assert db.get(FileBlob, sha256) is None
+
+
+if __name__ == "__main__":
+    tests = [(name, test) for name, test in list(globals().items()) if name.startswith("test_")]
+    for name, test in tests:
+        test()
+        print(f"ok  {name}")
+    print(f"\n{len(tests)} passed")
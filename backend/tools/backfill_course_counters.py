@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Recompute courses.module_count / courses.lesson_count from modules and lessons.
+
+The counters are maintained by the module/lesson write endpoints; run this to
+repair drift (e.g. after manual SQL edits) or to backfill existing rows.
+
+Usage:
+    python tools/backfill_course_counters.py [--dry-run]
+"""
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func, or_, select, update
+
+from app.core.database import SessionLocal
+from app.models.course import Course, Module, Lesson
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute course module/lesson counters")
+    parser.add_argument("--dry-run", action="store_true", help="Report drifted courses without updating them")
+    args = parser.parse_args()
+
+    actual_modules = (
+        select(func.count(Module.id))
+        .where(Module.course_id == Course.id)
+        .scalar_subquery()
+    )
+    actual_lessons = (
+        select(func.count(Lesson.id))
+        .join(Module, Lesson.module_id == Module.id)
+        .where(Module.course_id == Course.id)
+        .scalar_subquery()
+    )
+    drifted = or_(Course.module_count != actual_modules, Course.lesson_count != actual_lessons)
+
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(Course.id, Course.module_count, Course.lesson_count, actual_modules, actual_lessons)
+            .where(drifted)
+        ).all()
+        for course_id, module_count, lesson_count, real_modules, real_lessons in rows:
+            print(f"{course_id}: modules {module_count} -> {real_modules}, lessons {lesson_count} -> {real_lessons}")
+
+        if args.dry_run:
+            print(f"{len(rows)} course(s) drifted (dry run, nothing updated)")
+            return
+
+        db.execute(
+            update(Course)
+            .where(drifted)
+            .values(module_count=actual_modules, lesson_count=actual_lessons)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        print(f"{len(rows)} course(s) repaired")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
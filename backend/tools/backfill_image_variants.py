@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Generate WebP/AVIF variants for course images uploaded before the image
+pipeline existed (or whose job failed), and copy them onto their courses.
+
+New uploads are queued automatically; this walks stored course images
+whose blob has no variants yet and runs the same job for each.
+
+Usage:
+    python tools/backfill_image_variants.py [--dry-run]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.core.images import image_jobs
+from app.models.file import ImageVariant, StoredFile
+from app.api.v1.endpoints.files import submit_image_variants
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Generate missing course image variants")
+    parser.add_argument("--dry-run", action="store_true", help="List images without variants and exit")
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as db:
+        pending = (await db.scalars(
+            select(StoredFile.blob_sha256)
+            .where(StoredFile.bucket == "course-images")
+            .where(~select(ImageVariant.id).where(ImageVariant.source_sha256 == StoredFile.blob_sha256).exists())
+            .distinct()
+        )).all()
+
+    print(f"{len(pending)} course image(s) without variants")
+    if args.dry_run or not pending:
+        return
+
+    for sha256 in pending:
+        submit_image_variants(sha256)
+    await image_jobs.join()
+    stats = image_jobs.stats()
+    await image_jobs.shutdown()
+    print(f"Done: {stats['completed']} completed, {stats['failed']} failed")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
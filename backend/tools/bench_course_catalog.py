@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: query count and latency of GET /api/v1/courses/ as `limit` grows.
+
+Runs against a throwaway SQLite database (requires aiosqlite), seeds a
+catalog and reports how many SQL statements each catalog page executes.
+The query count should stay constant regardless of page size. The response
+cache is invalidated before each request, so every page is built from SQL.
+
+Usage:
+    python tools/bench_course_catalog.py [--courses 200] [--modules 5] [--lessons 8]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="bench_catalog_"), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["DEBUG"] = "false"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from sqlalchemy import event
+
+from app.core.cache import response_cache
+from app.core.database import Base, SessionLocal, engine, async_engine
+from app.main import app
+from app.api.v1.endpoints.courses import CATALOG_NAMESPACE
+from app.models import *  # Import all models
+
+
+def seed(courses: int, modules: int, lessons: int):
+    db = SessionLocal()
+    try:
+        for c in range(courses):
+            course = Course(
+                title=f"Course {c}",
+                category="medicine",
+                module_count=modules,
+                lesson_count=modules * lessons,
+            )
+            db.add(course)
+            for m in range(modules):
+                module = Module(title=f"Module {m}", sequence_order=m, course=course)
+                db.add(module)
+                for n in range(lessons):
+                    db.add(Lesson(
+                        title=f"Lesson {n}",
+                        sequence_order=n,
+                        content="x" * 2000,
+                        module=module,
+                    ))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def run(limits):
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up connection pool and statement caches
+        await client.get("/api/v1/courses/", params={"limit": 1})
+
+        print(f"{'limit':>6} {'rows':>6} {'queries':>8} {'ms':>9}")
+        for limit in limits:
+            # Measure the SQL path, not a response cache hit
+            await response_cache.bump(CATALOG_NAMESPACE)
+            statements.clear()
+            started = time.perf_counter()
+            response = await client.get("/api/v1/courses/", params={"limit": limit})
+            elapsed = (time.perf_counter() - started) * 1000
+            response.raise_for_status()
+            print(f"{limit:>6} {len(response.json()):>6} {len(statements):>8} {elapsed:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--modules", type=int, default=5)
+    parser.add_argument("--lessons", type=int, default=8)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    seed(args.courses, args.modules, args.lessons)
+    asyncio.run(run([1, 10, 50, 100, args.courses]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latency of unrelated endpoints during a login storm.
+
+Runs against a throwaway SQLite database (requires aiosqlite). Seeds users,
+then measures GET /health latency while idle and while `--logins`
+concurrent sign-ins are in flight. With bcrypt on the hashing pool the
+storm p99 should stay close to idle; inline bcrypt pushes it to
+roughly logins x hash time.
+
+Usage:
+    python tools/bench_login_storm.py [--users 50] [--logins 200] [--probes 200]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="bench_login_"), "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["DEBUG"] = "false"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from app.core.database import Base, SessionLocal, engine
+from app.core.security import get_password_hash, password_hasher
+from app.main import app
+from app.models import *  # Import all models
+
+PASSWORD = "semester-start-2026"
+
+
+def seed(users: int):
+    hashed = get_password_hash(PASSWORD)
+    db = SessionLocal()
+    try:
+        for n in range(users):
+            user = User(email=f"student{n}@example.com", hashed_password=hashed)
+            db.add(user)
+            db.flush()
+            db.add(Profile(id=user.id, name=f"Student {n}", email=user.email, role="student"))
+        db.commit()
+    finally:
+        db.close()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def probe(client, count):
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        response = await client.get("/health")
+        latencies.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        await asyncio.sleep(0.005)
+    return latencies
+
+
+async def login(client, n, users):
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={"email": f"student{n % users}@example.com", "password": PASSWORD},
+    )
+    return response.status_code
+
+
+def report(label, latencies):
+    print(
+        f"{label:<8} p50={percentile(latencies, 50):8.1f}ms "
+        f"p99={percentile(latencies, 99):8.1f}ms max={max(latencies):8.1f}ms"
+    )
+
+
+async def run(users, logins, probes):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        report("idle", await probe(client, probes))
+
+        started = time.perf_counter()
+        storm = asyncio.gather(*(login(client, n, users) for n in range(logins)))
+        latencies = await probe(client, probes)
+        statuses = await storm
+        elapsed = time.perf_counter() - started
+        report("storm", latencies)
+
+        ok = statuses.count(200)
+        print(f"logins: {ok}/{logins} ok in {elapsed:.1f}s ({ok / elapsed:.1f}/s), statuses={sorted(set(statuses))}")
+        print(f"hasher: {password_hasher.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--probes", type=int, default=200)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    seed(args.users)
+    asyncio.run(run(args.users, args.logins, args.probes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /uploads media route vs the previous StaticFiles mount.
+
+Writes a test video into a throwaway UPLOAD_DIR and measures, for both
+handlers, full-download throughput and the cost of the seek pattern a
+video player produces (many 1MB ranges at random offsets). It also
+reports how many bytes each handler sends for those range requests.
+
+Usage:
+    python tools/bench_media.py [--size-mb 200] [--downloads 5] [--seeks 100]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+WORK_DIR = tempfile.mkdtemp(prefix="bench_media_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(WORK_DIR, 'bench.db')}"
+os.environ["UPLOAD_DIR"] = os.path.join(WORK_DIR, "uploads")
+os.environ["DEBUG"] = "false"
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+
+from app.core.config import settings
+from app.core.database import Base, engine
+from app.main import app
+from app.models import *  # Import all models
+
+SEEK_BYTES = 1024 * 1024
+
+
+def write_video(size_mb: int) -> str:
+    path = os.path.join(settings.UPLOAD_DIR, "course-videos", "bench.mp4")
+    block = os.urandom(1024 * 1024)
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(block)
+    return "/uploads/course-videos/bench.mp4"
+
+
+def static_app() -> FastAPI:
+    legacy = FastAPI()
+    legacy.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
+    return legacy
+
+
+async def measure(label, asgi_app, url, size, downloads, seeks):
+    transport = httpx.ASGITransport(app=asgi_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        for _ in range(downloads):
+            async with client.stream("GET", url) as response:
+                async for _ in response.aiter_raw():
+                    pass
+        full = time.perf_counter() - started
+
+        rng = random.Random(42)
+        transferred = 0
+        partial = 0
+        started = time.perf_counter()
+        for _ in range(seeks):
+            offset = rng.randrange(0, size - SEEK_BYTES)
+            response = await client.get(url, headers={"Range": f"bytes={offset}-{offset + SEEK_BYTES - 1}"})
+            transferred += len(response.content)
+            partial += response.status_code == 206
+        seek = time.perf_counter() - started
+
+    print(
+        f"{label:<12} full {downloads * size / full / 1e6:8.1f} MB/s | "
+        f"seeks {seeks / seek:8.1f} req/s, {partial}/{seeks} partial, "
+        f"{transferred / 1e6:10.1f} MB sent"
+    )
+
+
+async def run(size_mb, downloads, seeks):
+    url = write_video(size_mb)
+    size = size_mb * 1024 * 1024
+    await measure("media route", app, url, size, downloads, seeks)
+    await measure("StaticFiles", static_app(), url, size, downloads, seeks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=int, default=200)
+    parser.add_argument("--downloads", type=int, default=5)
+    parser.add_argument("--seeks", type=int, default=100)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    asyncio.run(run(args.size_mb, args.downloads, args.seeks))
+
+
+if __name__ == "__main__":
+    main()
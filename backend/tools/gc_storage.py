@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Delete uploaded files that no course or lesson references, and resumable
+upload sessions idle past UPLOAD_SESSION_EXPIRE_HOURS (run from cron).
+
+Candidates come from the file index (file_references), so neither the upload
+directories nor the course tables are walked; run rebuild_file_index.py first
+if the index may have drifted.
+Files younger than STORAGE_GC_GRACE_HOURS are left alone, since uploads are
+made before the lesson that uses them is saved. Each run handles at most
+STORAGE_GC_BATCH_SIZE files, oldest first.
+
+Usage:
+    python tools/gc_storage.py [--dry-run] [--grace-hours N] [--limit N]
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import AsyncSessionLocal
+from app.api.v1.endpoints.files import collect_unreferenced_files, purge_expired_upload_sessions
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Garbage-collect unreferenced uploads")
+    parser.add_argument("--dry-run", action="store_true", help="List what would be deleted")
+    parser.add_argument("--grace-hours", type=int, help="Minimum age (default STORAGE_GC_GRACE_HOURS)")
+    parser.add_argument("--limit", type=int, help="Files per run (default STORAGE_GC_BATCH_SIZE)")
+    args = parser.parse_args()
+
+    grace = timedelta(hours=args.grace_hours) if args.grace_hours is not None else None
+    async with AsyncSessionLocal() as db:
+        report = await collect_unreferenced_files(db, grace=grace, limit=args.limit, dry_run=args.dry_run)
+
+    for path in report["deleted"]:
+        print(("would delete " if args.dry_run else "deleted ") + path)
+    print(f"{len(report['deleted'])} of {report['candidates']} candidate(s) {'eligible' if args.dry_run else 'deleted'}")
+
+    sessions = purge_expired_upload_sessions(dry_run=args.dry_run)
+    for upload_id in sessions:
+        print(("would expire " if args.dry_run else "expired ") + f"upload session {upload_id}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Rebuild the conversations inbox summary from the messages table.
+
+The summary is maintained by the message endpoints and backfilled by the
+migration that creates it (same query); run this to repair drift.
+
+Usage:
+    python tools/rebuild_conversations.py [--dry-run]
+"""
+import argparse
+import os
+import sys
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import and_, case, delete, func, insert, select
+
+from app.core.database import SessionLocal
+from app.models.message import Conversation, Message
+from app.api.v1.endpoints.messages import PREVIEW_LENGTH
+
+BATCH_SIZE = 1000
+
+
+def conversations_query():
+    """Per pair: newest message and each participant's unread count."""
+    user_a = case((Message.sender_id <= Message.recipient_id, Message.sender_id), else_=Message.recipient_id)
+    user_b = case((Message.sender_id <= Message.recipient_id, Message.recipient_id), else_=Message.sender_id)
+    pair = (user_a, user_b)
+
+    def unread_for(user):
+        return func.sum(case(
+            (and_(Message.recipient_id == user, Message.sender_id != Message.recipient_id, Message.is_read == False), 1),
+            else_=0,
+        )).over(partition_by=pair)
+
+    ranked = select(
+        user_a.label("user_a_id"),
+        user_b.label("user_b_id"),
+        Message.id.label("last_message_id"),
+        func.substr(Message.content, 1, PREVIEW_LENGTH).label("last_message_preview"),
+        Message.created_at.label("last_message_at"),
+        Message.sender_id.label("last_sender_id"),
+        unread_for(user_a).label("unread_a"),
+        unread_for(user_b).label("unread_b"),
+        func.row_number().over(
+            partition_by=pair, order_by=(Message.created_at.desc(), Message.id.desc())
+        ).label("rank"),
+    ).subquery()
+    return select(*(column for column in ranked.c if column.name != "rank")).where(ranked.c.rank == 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the conversations table from messages")
+    parser.add_argument("--dry-run", action="store_true", help="Count conversations without writing them")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rows = [dict(row._mapping) for row in db.execute(conversations_query()).all()]
+        existing = db.scalar(select(func.count()).select_from(Conversation))
+        print(f"{len(rows)} conversation(s) in messages, {existing} in the summary table")
+        if args.dry_run:
+            print("Dry run, nothing updated")
+            return
+
+        db.execute(delete(Conversation))
+        for start in range(0, len(rows), BATCH_SIZE):
+            db.execute(
+                insert(Conversation),
+                [{"id": uuid.uuid4(), **row} for row in rows[start:start + BATCH_SIZE]],
+            )
+        db.commit()
+        print(f"Rebuilt {len(rows)} conversation(s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Rebuild the file index: file_references from course/lesson URL columns, and
+the storage_usage counters from stored_files, file_blobs and derived files.
+
+Both are maintained at write time; run this once after upgrading (to index
+existing courses) or to repair drift, e.g. after manual SQL edits.
+
+Usage:
+    python tools/rebuild_file_index.py [--dry-run]
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, func, select
+
+from app.core.database import AsyncSessionLocal
+from app.models.course import Course, Lesson
+from app.models.file import FileBlob, FileReference, ImageVariant, StorageUsage, StoredFile, VideoJob
+from app.api.v1.endpoints.courses import COURSE_FILE_FIELDS, LESSON_FILE_FIELDS, sync_file_references
+from app.api.v1.endpoints.files import BLOBS_USAGE_KEY, IMAGE_VARIANTS_BUCKET, VIDEO_HLS_BUCKET
+
+BATCH_SIZE = 500
+
+
+async def actual_usage(db) -> dict:
+    usage = {}
+    rows = await db.execute(
+        select(StoredFile.bucket, func.count(), func.coalesce(func.sum(FileBlob.size), 0))
+        .join(FileBlob, FileBlob.sha256 == StoredFile.blob_sha256)
+        .group_by(StoredFile.bucket)
+    )
+    for bucket, count, size in rows.all():
+        usage[bucket] = (count, size)
+    for bucket, model, size_column in (
+        (BLOBS_USAGE_KEY, FileBlob, FileBlob.size),
+        (IMAGE_VARIANTS_BUCKET, ImageVariant, ImageVariant.size),
+        (VIDEO_HLS_BUCKET, VideoJob, VideoJob.output_size),
+    ):
+        count, size = (await db.execute(
+            select(func.count(), func.coalesce(func.sum(size_column), 0))
+            .select_from(model)
+            .where(size_column.isnot(None))
+        )).one()
+        usage[bucket] = (count, size)
+    return usage
+
+
+async def rebuild_references(db, model, referrer_type: str, fields) -> int:
+    columns = [getattr(model, field) for field in fields]
+    rows = (await db.execute(select(model.id, *columns))).all()
+    for start in range(0, len(rows), BATCH_SIZE):
+        await sync_file_references(db, referrer_type, (
+            (row[0], dict(zip(fields, row[1:]))) for row in rows[start:start + BATCH_SIZE]
+        ))
+    return len(rows)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Rebuild file references and storage usage counters")
+    parser.add_argument("--dry-run", action="store_true", help="Report counter drift without writing anything")
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as db:
+        usage = await actual_usage(db)
+        current = {
+            row.bucket: (row.file_count, row.total_bytes)
+            for row in (await db.scalars(select(StorageUsage))).all()
+        }
+        for bucket in sorted(set(usage) | set(current)):
+            before, after = current.get(bucket, (0, 0)), usage.get(bucket, (0, 0))
+            marker = "" if before == after else "  (drifted)"
+            print(f"{bucket}: {before[0]} files / {before[1]} bytes -> {after[0]} / {after[1]}{marker}")
+
+        if args.dry_run:
+            references = await db.scalar(select(func.count()).select_from(FileReference))
+            print(f"{references} file reference(s) indexed (dry run, nothing updated)")
+            return
+
+        await db.execute(delete(StorageUsage))
+        db.add_all(
+            StorageUsage(bucket=bucket, file_count=count, total_bytes=size)
+            for bucket, (count, size) in usage.items()
+        )
+        courses = await rebuild_references(db, Course, "course", COURSE_FILE_FIELDS)
+        lessons = await rebuild_references(db, Lesson, "lesson", LESSON_FILE_FIELDS)
+        await db.commit()
+        references = await db.scalar(select(func.count()).select_from(FileReference))
+        print(f"Indexed {courses} course(s) and {lessons} lesson(s): {references} file reference(s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Rebuild the message full-text search index.
+
+On SQLite this creates the FTS5 table and its triggers if the database
+predates them, then reindexes every message. On PostgreSQL the GIN index
+is maintained by the database; this reindexes it, e.g. after a bulk load.
+
+Usage:
+    python tools/rebuild_message_search.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import engine, is_sqlite
+from app.models.message import MESSAGE_SEARCH_SQLITE_DDL
+
+
+def main():
+    with engine.begin() as connection:
+        if is_sqlite:
+            for statement in MESSAGE_SEARCH_SQLITE_DDL:
+                connection.exec_driver_sql(statement)
+            connection.exec_driver_sql("INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')")
+        else:
+            connection.exec_driver_sql("REINDEX INDEX ix_messages_content_search")
+        count = connection.exec_driver_sql("SELECT count(*) FROM messages").scalar()
+    print(f"Reindexed {count} message(s)")
+
+
+if __name__ == "__main__":
+    main()
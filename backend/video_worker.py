@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Video transcoding worker: turns uploaded course videos into HLS ladders.
+
+Uploads queue a job in the video_jobs table; this process claims due jobs,
+runs ffmpeg (FFMPEG_PATH) and updates the lessons using each video. Run as
+many copies as the machine allows; VIDEO_WORKER_CONCURRENCY sets the jobs
+each copy runs at once.
+
+Usage:
+    python video_worker.py [--concurrency N] [--backfill]
+"""
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal
+from app.models.file import StoredFile, VideoJob
+from app.api.v1.endpoints.videos import run_video_worker
+
+
+async def backfill() -> int:
+    """Queue jobs for videos uploaded before transcoding existed."""
+    async with AsyncSessionLocal() as db:
+        pending = (await db.scalars(
+            select(StoredFile.blob_sha256)
+            .where(StoredFile.bucket == "course-videos")
+            .where(~select(VideoJob.id).where(VideoJob.source_sha256 == StoredFile.blob_sha256).exists())
+            .distinct()
+        )).all()
+        db.add_all(VideoJob(source_sha256=sha256) for sha256 in pending)
+        await db.commit()
+    return len(pending)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Transcode uploaded videos to HLS")
+    parser.add_argument("--concurrency", type=int, help="Jobs to run at once (default VIDEO_WORKER_CONCURRENCY)")
+    parser.add_argument("--backfill", action="store_true", help="First queue videos that have no job yet")
+    args = parser.parse_args()
+
+    if args.backfill:
+        print(f"Queued {await backfill()} video(s) without a transcode job")
+    await run_video_worker(args.concurrency)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main())
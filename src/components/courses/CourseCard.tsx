@@ -5,7 +5,10 @@ import { Card, CardContent } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { BadgeCheck, Clock, Star } from "lucide-react";
 import { CourseType } from "@/types/course";
-import { getPlaceholderImage, formatDate } from "@/lib/utils";
+import { getPlaceholderImage, formatDate, variantSrcSet } from "@/lib/utils";
+
+// Cards span the full width on phones, half on tablets, a third on desktop
+const CARD_IMAGE_SIZES = "(max-width: 640px) 100vw, (max-width: 1024px) 50vw, 33vw";
 
 interface CourseCardProps {
   course: CourseType;
@@ -19,16 +22,23 @@ export const CourseCard: React.FC<CourseCardProps> = ({ course, isAuthenticated
   return (
     <Link to={`/courses/${course.id}`}>
       <Card className="overflow-hidden h-full transition-transform hover:shadow-md hover:-translate-y-1">
-        <img 
-          src={courseImage}
-          alt={course.title}
-          className="w-full h-40 object-cover"
-          onError={(e) => {
-            // If image fails to load, use a fallback
-            const target = e.target as HTMLImageElement;
-            target.src = "https://images.unsplash.com/photo-1532938911079-1b06ac7ceec7?auto=format&fit=crop&w=500&h=300&q=80";
-          }}
-        />
+        <picture>
+          {/* Resized variants so the catalog never downloads full-size uploads */}
+          <source type="image/avif" srcSet={variantSrcSet(course.image_variants, "avif")} sizes={CARD_IMAGE_SIZES} />
+          <source type="image/webp" srcSet={variantSrcSet(course.image_variants, "webp")} sizes={CARD_IMAGE_SIZES} />
+          <img 
+            src={courseImage}
+            alt={course.title}
+            className="w-full h-40 object-cover"
+            loading="lazy"
+            decoding="async"
+            onError={(e) => {
+              // If image fails to load, use a fallback
+              const target = e.target as HTMLImageElement;
+              target.src = "https://images.unsplash.com/photo-1532938911079-1b06ac7ceec7?auto=format&fit=crop&w=500&h=300&q=80";
+            }}
+          />
+        </picture>
         <CardContent className="p-4">
           <h3 className="font-bold text-lg line-clamp-2 mb-2 font-nunito-sans">{course.title}</h3>
           <p className="text-gray-600 text-sm line-clamp-2 mb-3 font-exo2">{course.description}</p>
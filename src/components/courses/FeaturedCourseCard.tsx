@@ -5,6 +5,9 @@ import { Card, CardContent } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { BadgeCheck, Clock, Star } from "lucide-react";
 import { CourseType } from "@/types/course";
+import { variantSrcSet } from "@/lib/utils";
+
+const CARD_IMAGE_SIZES = "(max-width: 640px) 100vw, (max-width: 1024px) 50vw, 33vw";
 
 interface FeaturedCourseCardProps {
   course: CourseType;
@@ -26,11 +29,17 @@ export const FeaturedCourseCard: React.FC<FeaturedCourseCardProps> = ({ course,
     <Link to={`/courses/${course.id}`}>
       <Card className="overflow-hidden h-full transition-transform hover:shadow-lg hover:-translate-y-1">
         <div className="relative">
-          <img 
-            src={course.image_url || `https://picsum.photos/500/300?random=${course.id}`}
-            alt={course.title}
-            className="w-full h-48 object-cover"
-          />
+          <picture>
+            <source type="image/avif" srcSet={variantSrcSet(course.image_variants, "avif")} sizes={CARD_IMAGE_SIZES} />
+            <source type="image/webp" srcSet={variantSrcSet(course.image_variants, "webp")} sizes={CARD_IMAGE_SIZES} />
+            <img 
+              src={course.image_url || `https://picsum.photos/500/300?random=${course.id}`}
+              alt={course.title}
+              className="w-full h-48 object-cover"
+              loading="lazy"
+              decoding="async"
+            />
+          </picture>
           <div className="absolute top-3 right-3 bg-yellow-500 text-white px-2 py-1 rounded-full text-xs font-medium font-exo2">
             Featured
           </div>
@@ -46,7 +46,10 @@ const StudentMessaging: React.FC = () => {
   const [searchTerm, setSearchTerm] = useState("");
   const [isLoading, setIsLoading] = useState(true);
   const [isSending, setIsSending] = useState(false);
+  const [olderCursor, setOlderCursor] = useState<string | null>(null);
+  const [isLoadingOlder, setIsLoadingOlder] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  const selectedContactIdRef = useRef<string | undefined>(undefined);
   const { user, isAuthenticated } = useAuth();
   const { toast } = useToast();
 
@@ -74,6 +77,7 @@ const StudentMessaging: React.FC = () => {
 
   // Fetch messages when a contact is selected via FastAPI
   useEffect(() => {
+    selectedContactIdRef.current = selectedContact?.id;
     const fetchMessages = async () => {
       if (!selectedContact) return;
       setIsLoading(true);
@@ -86,6 +90,7 @@ const StudentMessaging: React.FC = () => {
       }
       const msgs = (data?.messages || []) as Message[];
       setMessages(msgs);
+      setOlderCursor(data?.next_cursor ?? null);
       // Mark messages as read
       await apiClient.markRead(selectedContact.id);
       // Update unread count in contacts
@@ -95,10 +100,30 @@ const StudentMessaging: React.FC = () => {
     fetchMessages();
   }, [selectedContact, toast]);
 
-  // Scroll to bottom when messages change
+  // Scroll to bottom when a newer message arrives (not when older ones are prepended)
+  const lastMessageId = messages[messages.length - 1]?.id;
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
-  }, [messages]);
+  }, [lastMessageId]);
+
+  // Prepend the page of messages before the oldest one shown
+  const loadOlderMessages = async () => {
+    if (!selectedContact || !olderCursor || isLoadingOlder) return;
+    const contactId = selectedContact.id;
+    setIsLoadingOlder(true);
+    const { data, error } = await apiClient.getConversation(contactId, olderCursor);
+    setIsLoadingOlder(false);
+    if (error) {
+      console.error('Error fetching older messages:', error);
+      toast({ title: 'Error', description: 'Failed to load older messages', variant: 'destructive' });
+      return;
+    }
+    // Ignore a page that arrives after switching to another contact
+    if (selectedContactIdRef.current !== contactId) return;
+    const older = (data?.messages || []) as Message[];
+    setMessages(prev => [...older, ...prev]);
+    setOlderCursor(data?.next_cursor ?? null);
+  };
 
   const sendMessage = async () => {
     if (!isAuthenticated || !selectedContact || !newMessage.trim()) return;
@@ -266,6 +291,19 @@ const StudentMessaging: React.FC = () => {
                   </div>
                 ) : messages.length > 0 ? (
                   <div className="space-y-4">
+                    {olderCursor && (
+                      <div className="flex justify-center">
+                        <Button
+                          variant="ghost"
+                          size="sm"
+                          onClick={loadOlderMessages}
+                          disabled={isLoadingOlder}
+                          className="font-exo2 text-slate-500"
+                        >
+                          {isLoadingOlder ? 'Loading...' : 'Load older messages'}
+                        </Button>
+                      </div>
+                    )}
                     {messages.map((message, index) => {
                       const isMe = message.sender_id === user?.id;
                       const showAvatar = index === 0 || messages[index - 1].sender_id !== message.sender_id;
@@ -31,6 +31,7 @@ export function useCoursesQuery(
         description: course.description,
         status: (course.status as "draft" | "published" | "archived") || "draft",
         image_url: course.image_url,
+        image_variants: course.image_variants,
         modules: course.module_count || 0,
         lessons: course.lesson_count || 0,
         author_id: course.author_id,
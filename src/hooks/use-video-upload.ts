@@ -23,6 +23,29 @@ export interface UseVideoUploadReturn {
   uploadStatuses: Record<string, UploadStatus>;
 }
 
+// Resumable upload tuning: chunks in flight at once and retries per chunk
+const CHUNK_CONCURRENCY = 3;
+const MAX_CHUNK_RETRIES = 3;
+
+interface UploadSession {
+  upload_id: string;
+  size: number;
+  chunk_size: number;
+  total_chunks: number;
+  missing_chunks: number[];
+}
+
+// Remembers the session for a file so a reload or dropped connection resumes it
+const resumeKey = (file: File) => `video-upload:${file.name}:${file.size}:${file.lastModified}`;
+
+const sha256Hex = async (data: ArrayBuffer): Promise<string | null> => {
+  if (!globalThis.crypto?.subtle) return null;
+  const digest = await crypto.subtle.digest('SHA-256', data);
+  return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+};
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
 const formatDuration = (totalSeconds: number): string => {
   if (isNaN(totalSeconds) || totalSeconds < 0) return '0:00';
   const minutes = Math.floor(totalSeconds / 60);
@@ -109,6 +132,87 @@ export const useVideoUpload = (): UseVideoUploadReturn => {
     return headers;
   };
 
+  const uploadRequest = async (path: string, init: RequestInit = {}): Promise<any> => {
+    const response = await fetch(`${API_BASE_URL}/api/v1/files${path}`, {
+      ...init,
+      headers: { ...getAuthHeaders(), ...(init.headers || {}) },
+    });
+    if (!response.ok) {
+      const errData = await response.json().catch(() => ({}));
+      const detail = errData?.detail;
+      const error = new Error((typeof detail === 'string' ? detail : detail?.message) || response.statusText || 'Upload failed');
+      (error as any).status = response.status;
+      throw error;
+    }
+    return response.json();
+  };
+
+  // Upload a file through the resumable chunked API, resuming a previous session if one exists
+  const uploadResumable = async (
+    file: File,
+    onProgress: (progress: number) => void
+  ): Promise<{ file_path: string }> => {
+    const key = resumeKey(file);
+    let session: UploadSession | null = null;
+
+    const savedId = localStorage.getItem(key);
+    if (savedId) {
+      session = await uploadRequest(`/uploads/${savedId}`).catch(() => null);
+    }
+    if (!session) {
+      session = await uploadRequest('/uploads', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          filename: file.name,
+          size: file.size,
+          bucket: 'course-videos',
+          content_type: file.type || undefined,
+        }),
+      });
+      localStorage.setItem(key, session!.upload_id);
+    }
+
+    const { upload_id: uploadId, chunk_size: chunkSize } = session!;
+    const pending = [...session!.missing_chunks];
+    let uploadedBytes = file.size - pending.reduce(
+      (sum, index) => sum + Math.min(chunkSize, file.size - index * chunkSize), 0
+    );
+    onProgress(file.size ? Math.round((uploadedBytes / file.size) * 100) : 0);
+
+    const sendChunk = async (index: number) => {
+      const blob = file.slice(index * chunkSize, Math.min(file.size, (index + 1) * chunkSize));
+      const body = await blob.arrayBuffer();
+      const checksum = await sha256Hex(body);
+      for (let attempt = 0; ; attempt++) {
+        try {
+          await uploadRequest(`/uploads/${uploadId}/chunks/${index}`, {
+            method: 'PUT',
+            headers: checksum ? { 'X-Chunk-SHA256': checksum } : {},
+            body,
+          });
+          break;
+        } catch (error) {
+          if (attempt >= MAX_CHUNK_RETRIES) throw error;
+          await sleep(500 * 2 ** attempt);
+        }
+      }
+      uploadedBytes += blob.size;
+      onProgress(Math.round((uploadedBytes / file.size) * 100));
+    };
+
+    const worker = async () => {
+      while (pending.length) {
+        await sendChunk(pending.shift()!);
+      }
+    };
+    await Promise.all(Array.from({ length: CHUNK_CONCURRENCY }, worker));
+
+    const result = await uploadRequest(`/uploads/${uploadId}/complete`, { method: 'POST' });
+    localStorage.removeItem(key);
+    return result;
+  };
+
   const uploadVideo = useCallback(async (
     file: File,
     moduleId: string,
@@ -157,22 +261,13 @@ export const useVideoUpload = (): UseVideoUploadReturn => {
         return;
       }
 
-      // Upload via FastAPI
-      const formData = new FormData();
-      formData.append('file', file);
-      const uploadResponse = await fetch(`${API_BASE_URL}/api/v1/files/upload/course-video`, {
-        method: 'POST',
-        headers: getAuthHeaders(),
-        body: formData,
+      // Upload via FastAPI in resumable chunks
+      const data = await uploadResumable(file, (progress) => {
+        setUploadStatuses(prev => ({
+          ...prev,
+          [lessonId]: { isUploading: true, progress, error: null }
+        }));
       });
-
-      if (!uploadResponse.ok) {
-        const errData = await uploadResponse.json().catch(() => ({}));
-        const message = errData?.detail || uploadResponse.statusText || 'Upload failed';
-        throw new Error(message);
-      }
-
-      const data = await uploadResponse.json();
       const publicUrl = `${API_BASE_URL}${data.file_path}`;
 
       // Get duration for the uploaded video
@@ -34,15 +34,36 @@ export const createCourse = async (values: CourseFormValues) => {
       // For now, we'll skip this and rely on the backend to handle it
     }
     
-    // Create course in FastAPI backend
-    const courseResponse = await apiClient.post('/api/v1/courses/', {
+    // Create the course with all modules and lessons in one request/transaction
+    const modules = (values.modules || []).map((module, moduleIndex) => ({
+      title: module.title,
+      description: module.description || '',
+      sequence_order: moduleIndex,
+      // Use new lessons shape only
+      lessons: ((module as any).lessons || []).map((lesson: any, lessonIndex: number) => ({
+        title: lesson.title,
+        description: lesson.description || '',
+        video_url: lesson.videoUrl || lesson.video_url,
+        pdf_url: lesson.pdfUrl || lesson.pdf_url,
+        slides_url: lesson.slidesUrl || lesson.slides_url,
+        audio_url: lesson.audioUrl || lesson.audio_url,
+        document_url: lesson.documentUrl || lesson.document_url,
+        interactive_url: lesson.interactiveUrl || lesson.interactive_url,
+        downloadable_url: lesson.downloadableUrl || lesson.download_url || lesson.downloadable_url,
+        content_type: lesson.contentType || lesson.content_type || 'video',
+        duration: lesson.duration,
+        sequence_order: lessonIndex
+      }))
+    }));
+    
+    const courseResponse = await apiClient.post('/api/v1/courses/import', {
       title: values.title,
       description: values.description,
       long_description: values.longDescription,
       category: values.category,
       level: values.level,
       image_url: imageUrl,
-      status: 'draft'
+      modules
     });
     
     // apiClient.post returns parsed JSON directly (no { data, error } wrapper)
@@ -52,54 +73,6 @@ export const createCourse = async (values: CourseFormValues) => {
     }
     console.log("Course record created:", courseData);
     
-    // Create modules and lessons if provided
-    if (values.modules && values.modules.length > 0) {
-      console.log(`Creating ${values.modules.length} modules for course ${courseData.id}`);
-      
-      for (let moduleIndex = 0; moduleIndex < values.modules.length; moduleIndex++) {
-        const module = values.modules[moduleIndex];
-        
-        // Create module
-        const moduleResponse = await apiClient.post(`/api/v1/courses/${courseData.id}/modules`, {
-          title: module.title,
-          description: module.description || '',
-          sequence_order: moduleIndex
-        });
-        
-        // moduleResponse is the module JSON
-        const moduleData = moduleResponse as any;
-        console.log(`Created module ${moduleData.id} for course ${courseData.id}`);
-        
-        // Create lessons for this module (use new lessons shape only)
-        const lessons = (module as any).lessons || [];
-        if (lessons && lessons.length > 0) {
-          console.log(`Creating ${lessons.length} lessons for module ${moduleData.id}`);
-          
-          for (let lessonIndex = 0; lessonIndex < lessons.length; lessonIndex++) {
-            const lesson = lessons[lessonIndex];
-            
-            // Create lesson
-            const lessonResponse = await apiClient.post(`/api/v1/courses/modules/${moduleData.id}/lessons`, {
-              title: lesson.title,
-              description: lesson.description || '',
-              video_url: (lesson as any).videoUrl || lesson.video_url,
-              pdf_url: (lesson as any).pdfUrl || lesson.pdf_url,
-              slides_url: (lesson as any).slidesUrl || lesson.slides_url,
-              audio_url: (lesson as any).audioUrl || lesson.audio_url,
-              document_url: (lesson as any).documentUrl || lesson.document_url,
-              interactive_url: (lesson as any).interactiveUrl || lesson.interactive_url,
-              downloadable_url: (lesson as any).downloadableUrl || (lesson as any).download_url || lesson.downloadable_url,
-              content_type: (lesson as any).contentType || lesson.content_type || 'video',
-              duration: lesson.duration,
-              sequence_order: lessonIndex
-            });
-            
-            console.log(`Created lesson for module ${moduleData.id}`);
-          }
-        }
-      }
-    }
-    
     console.log("Course creation completed successfully!");
     return { success: true, course: courseData };
   } catch (error) {
@@ -1,5 +1,7 @@
 // FastAPI client for backend services and data access
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL ?? 'http://localhost:8000';
+// Larger files are uploaded through the API rather than hashed in memory
+const DIRECT_UPLOAD_MAX_HASH_BYTES = 100 * 1024 * 1024;
 
 interface ApiResponse<T> {
   data?: T;
@@ -134,6 +136,19 @@ class ApiClient {
       }
     }
 
+    // Small enough to hash in memory: send it straight to storage
+    if (file.size <= DIRECT_UPLOAD_MAX_HASH_BYTES && globalThis.crypto?.subtle) {
+      const route = endpoint.replace('/api/v1/files/upload/', '');
+      const storageBucket =
+        route === 'course-video' ? 'course-videos' :
+        route === 'course-image' ? 'course-images' :
+        route;
+      const direct = await this.uploadFileDirect(file, storageBucket);
+      if (direct) {
+        return direct;
+      }
+    }
+
     try {
       const response = await fetch(`${this.baseUrl}${endpoint}`, {
         method: 'POST',
@@ -159,6 +174,51 @@ class ApiClient {
     }
   }
 
+  // Upload through a presigned URL so the bytes bypass the API. Returns
+  // null when the caller should fall back to a regular upload.
+  private async uploadFileDirect(file: File, bucket: string): Promise<ApiResponse<{ url: string }> | null> {
+    try {
+      const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+      const sha256 = Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, '0')).join('');
+
+      const created = await this.request<any>('/api/v1/files/direct-uploads', {
+        method: 'POST',
+        body: JSON.stringify({
+          filename: file.name,
+          size: file.size,
+          sha256,
+          bucket,
+          content_type: file.type || undefined,
+        }),
+      });
+      if (!created.data) {
+        return null;
+      }
+      if (created.data.file_path) {
+        // Content already stored; nothing to send
+        return { data: { url: created.data.file_path } };
+      }
+
+      const target = created.data.url.startsWith('/') ? `${this.baseUrl}${created.data.url}` : created.data.url;
+      const put = await fetch(target, {
+        method: created.data.method,
+        headers: created.data.headers,
+        body: file,
+      });
+      if (!put.ok) {
+        return null;
+      }
+
+      const completed = await this.request<any>('/api/v1/files/direct-uploads/complete', {
+        method: 'POST',
+        body: JSON.stringify({ upload_token: created.data.upload_token }),
+      });
+      return completed.data ? { data: { url: completed.data.file_path } } : null;
+    } catch {
+      return null;
+    }
+  }
+
   // Course methods (to be implemented when backend endpoints are ready)
   async getCourses(): Promise<ApiResponse<any[]>> {
     return this.request<any[]>('/api/v1/courses/');
@@ -233,8 +293,10 @@ class ApiClient {
   // Legacy lecture methods removed; use lesson methods below
 
   // Lesson methods (preferred)
-  async getModuleLessons(moduleId: string): Promise<ApiResponse<any[]>> {
-    return this.request<any[]>(`/api/v1/courses/modules/${moduleId}/lessons`);
+  // Lesson listings are summaries; pass includeContent to also get content/transcript/notes
+  async getModuleLessons(moduleId: string, options?: { includeContent?: boolean }): Promise<ApiResponse<any[]>> {
+    const query = options?.includeContent ? '?include_content=true' : '';
+    return this.request<any[]>(`/api/v1/courses/modules/${moduleId}/lessons${query}`);
   }
 
   async createModuleLesson(moduleId: string, lessonData: any): Promise<ApiResponse<any>> {
@@ -307,8 +369,31 @@ class ApiClient {
     return this.request<any[]>(`/api/v1/messages/contacts`);
   }
 
-  async getConversation(contactId: string): Promise<ApiResponse<{ messages: any[] }>> {
-    return this.request<{ messages: any[] }>(`/api/v1/messages/conversation/${contactId}`);
+  async getConversation(
+    contactId: string,
+    before?: string,
+    limit?: number
+  ): Promise<ApiResponse<{ messages: any[]; next_cursor: string | null }>> {
+    const params = new URLSearchParams();
+    if (before) params.set('before', before);
+    if (limit) params.set('limit', String(limit));
+    const query = params.toString() ? `?${params.toString()}` : '';
+    return this.request<{ messages: any[]; next_cursor: string | null }>(
+      `/api/v1/messages/conversation/${contactId}${query}`
+    );
+  }
+
+  async searchMessages(
+    q: string,
+    contactId?: string,
+    skip?: number
+  ): Promise<ApiResponse<{ items: any[]; next_skip: number | null }>> {
+    const params = new URLSearchParams({ q });
+    if (contactId) params.set('contact_id', contactId);
+    if (skip) params.set('skip', String(skip));
+    return this.request<{ items: any[]; next_skip: number | null }>(
+      `/api/v1/messages/search?${params.toString()}`
+    );
   }
 
   async sendMessage(recipientId: string, content: string): Promise<ApiResponse<any>> {
@@ -318,6 +403,20 @@ class ApiClient {
     });
   }
 
+  async broadcastMessage(
+    courseId: string,
+    content: string,
+    title?: string
+  ): Promise<ApiResponse<{ recipients: number; queued: boolean; announcement_id: string | null }>> {
+    return this.request<{ recipients: number; queued: boolean; announcement_id: string | null }>(
+      `/api/v1/messages/broadcast`,
+      {
+        method: 'POST',
+        body: JSON.stringify({ course_id: courseId, content, ...(title ? { title } : {}) }),
+      }
+    );
+  }
+
   async markRead(contactId: string): Promise<ApiResponse<{ status: string }>> {
     // POST with contact_id as query or body; backend expects parameter path body
     // We'll send as JSON body and fetch will handle it
@@ -70,6 +70,20 @@ export function getPlaceholderImage(seed: string, width = 800, height = 600): st
   return `https://images.unsplash.com/${imageIds[index]}?auto=format&fit=crop&w=${width}&h=${height}&q=80`;
 }
 
+/**
+ * Build a srcset from server-generated image variants of one format
+ * (variant URLs are relative to the API)
+ */
+export function variantSrcSet(
+  variants: { url: string; width: number; format: string }[] | null | undefined,
+  format: string
+): string | undefined {
+  const apiBaseUrl = (import.meta.env.VITE_API_BASE_URL ?? 'http://localhost:8000').replace(/\/+$/, '');
+  const matching = (variants || []).filter((variant) => variant.format === format);
+  if (!matching.length) return undefined;
+  return matching.map((variant) => `${apiBaseUrl}${variant.url} ${variant.width}w`).join(', ');
+}
+
 /**
  * Format bytes to a human-readable format (KB, MB, GB)
  */
@@ -108,7 +108,7 @@ const CourseBuilder = () => {
         // Process each module
         for (const module of modulesData || []) {
           // Get lessons for this module via FastAPI
-          const { data: lessonsData, error: lessonsError } = await apiClient.getModuleLessons(module.id);
+          const { data: lessonsData, error: lessonsError } = await apiClient.getModuleLessons(module.id, { includeContent: true });
           if (lessonsError) {
             console.error(`Failed to load lessons for module ${module.id}:`, lessonsError);
           }
@@ -164,7 +164,7 @@ const CourseEditor = () => {
             const assembledModules: CourseModule[] = [];
             for (const m of modulesData) {
               // Fetch lessons for each module
-              const lessonsResp = await apiClient.getModuleLessons(m.id);
+              const lessonsResp = await apiClient.getModuleLessons(m.id, { includeContent: true });
               const lessonsData = lessonsResp.data || [];
 
               const mappedLessons: LessonUpload[] = (lessonsData || []).map((l: any) => ({
@@ -50,6 +50,13 @@ export interface LearningPointItem {
   text: string;
 }
 
+export interface ImageVariant {
+  url: string;
+  width: number;
+  height: number;
+  format: 'avif' | 'webp';
+}
+
 export interface Course {
   id: string;
   title: string;
@@ -72,6 +79,7 @@ export interface CourseType {
   description: string;
   status: 'draft' | 'published' | 'archived';
   image_url?: string;
+  image_variants?: ImageVariant[];
   author_id?: string;
   created_at?: string;
   updated_at?: string;